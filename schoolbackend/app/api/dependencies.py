@@ -2,34 +2,72 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.db.session import get_db, get_async_db
 from app.crud import crud_user
-from app.core import security
+from app.core import security, auth_cache
 from app.models.user import User
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login/access-token")
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme) 
-):
-    credentials_exception = HTTPException(
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No se pudieron validar las credenciales",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+def _decode_token(token: str) -> dict:
+    # La firma y la expiración se validan siempre, también con caché
     try:
         payload = jwt.decode(token, security.SECRET_KEY, algorithms=[security.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception # Token falso o expirado
-    
-    user = crud_user.get_user_by_email(db, email=email)
+        raise _credentials_exception() # Token falso o expirado
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+def get_current_user(
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+):
+    payload = _decode_token(token)
+
+    # Si el token ya se verificó hace poco, no se consulta la BD
+    cached = auth_cache.get_user(token)
+    if cached is not None:
+        return cached
+
+    user = crud_user.get_user_by_email(db, email=payload["sub"])
     if user is None:
-        raise credentials_exception
-        
-    return user
\ No newline at end of file
+        raise _credentials_exception()
+
+    return auth_cache.set_user(token, user, expires_at=payload.get("exp"))
+
+# Solo la usan los routers de app/api/v1_async: la capa async (y greenlet) se
+# importa aquí para que la instalación síncrona no la necesite
+async def get_current_user_async(
+    db=Depends(get_async_db),
+    token: str = Depends(oauth2_scheme)
+):
+    from app.crud import crud_user_async
+
+    payload = _decode_token(token)
+
+    cached = auth_cache.get_user(token)
+    if cached is not None:
+        return cached
+
+    user = await crud_user_async.get_user_by_email(db, email=payload["sub"])
+    if user is None:
+        raise _credentials_exception()
+
+    return auth_cache.set_user(token, user, expires_at=payload.get("exp"))
+
+def require_admin(current_user: User = Depends(get_current_user)):
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Este endpoint es solo para administradores"
+        )
+    return current_user
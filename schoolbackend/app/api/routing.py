@@ -0,0 +1,23 @@
+from fastapi import APIRouter
+from fastapi.routing import APIRoute
+
+
+def add_sync_fallback(router: APIRouter, sync_router: APIRouter) -> APIRouter:
+    """
+    Completa un router asíncrono con las rutas del router síncrono que todavía
+    no tienen versión async (mismo path y método), para que al activar
+    USE_ASYNC_DB no desaparezca ningún endpoint.
+    """
+    async_routes = {
+        (route.path, method)
+        for route in router.routes
+        if isinstance(route, APIRoute)
+        for method in route.methods
+    }
+    for route in sync_router.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        if any((route.path, method) in async_routes for method in route.methods):
+            continue
+        router.routes.append(route)
+    return router
@@ -0,0 +1,75 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app.api import dependencies
+from app.core import config, export_writers
+from app.crud import crud_export, crud_subject
+from app.db.session import SessionLocal, get_db
+from app.models.user import User
+
+# Exportaciones completas (calificaciones e inscripciones) en CSV o XLSX.
+# Las filas se leen por lotes y se escriben en la respuesta a medida que llegan,
+# así que la memoria no crece con el tamaño de la escuela. No tienen versión
+# async: StreamingResponse recorre el generador síncrono en el threadpool.
+
+router = APIRouter()
+
+_FORMATS = {
+    "csv": (export_writers.csv_chunks, export_writers.CSV_MEDIA_TYPE),
+    "xlsx": (export_writers.xlsx_chunks, export_writers.XLSX_MEDIA_TYPE),
+}
+
+
+def _export_response(query, header, filename: str, format: str) -> StreamingResponse:
+    write, media_type = _FORMATS[format]
+
+    # La sesión se abre dentro del generador: la de get_db se cierra al terminar
+    # la dependencia, que puede ser antes de que se envíe el cuerpo
+    def body():
+        db = SessionLocal()
+        try:
+            yield from write(header, crud_export.stream_rows(db, query, config.EXPORT_BATCH_SIZE))
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'},
+    )
+
+
+def _check_subject(db: Session, subject_id: Optional[int]):
+    if subject_id is not None and not crud_subject.subject_exists(db, subject_id=subject_id):
+        raise HTTPException(status_code=404, detail="Materia no encontrada")
+
+
+@router.get("/grades")
+def export_grades(
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    subject_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(dependencies.require_admin)
+):
+    """Todas las calificaciones (o las de una materia) con alumno y materia"""
+    _check_subject(db, subject_id)
+    filename = "calificaciones" if subject_id is None else f"calificaciones_materia_{subject_id}"
+    return _export_response(
+        crud_export.grades_export_query(subject_id), crud_export.GRADE_COLUMNS, filename, format
+    )
+
+
+@router.get("/enrollments")
+def export_enrollments(
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    subject_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(dependencies.require_admin)
+):
+    """Inscripciones alumno-materia (listas de clase) con el profesor de cada materia"""
+    _check_subject(db, subject_id)
+    filename = "inscripciones" if subject_id is None else f"inscripciones_materia_{subject_id}"
+    return _export_response(
+        crud_export.enrollments_export_query(subject_id), crud_export.ENROLLMENT_COLUMNS, filename, format
+    )
@@ -1,5 +1,5 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
@@ -7,7 +7,7 @@ from app.schemas.grade import GradeCreate, GradeResponse
 from app.crud import crud_grade, crud_student, crud_subject
 from app.models.user import User
 from app.api import dependencies
-from app.schemas.grade import GradeUpdate
+from app.schemas.grade import GradeUpdate, GradeBulkCreate, GradeBulkResponse
 
 
 router = APIRouter()
@@ -19,16 +19,60 @@ def create_grade(
     current_user: User = Depends(dependencies.get_current_user)
 ):
     
-    student = crud_student.get_student(db, student_id=grade.student_id)
-    if not student:
+    if not crud_student.student_exists(db, student_id=grade.student_id):
         raise HTTPException(status_code=404, detail="El alumno no existe")
 
-    subject = crud_subject.get_subject(db, subject_id=grade.subject_id)
-    if not subject:
+    if not crud_subject.subject_exists(db, subject_id=grade.subject_id):
         raise HTTPException(status_code=404, detail="La materia no existe")
 
     return crud_grade.create_grade(db=db, grade=grade)
 
+# ---------------------------------------------------------
+# CARGA MASIVA DE CALIFICACIONES DE UNA MATERIA
+# ---------------------------------------------------------
+@router.post("/bulk", response_model=GradeBulkResponse)
+def create_grades_bulk(
+    payload: GradeBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(dependencies.get_current_user)
+):
+    """
+    Registra (o actualiza) las calificaciones de todo un grupo en una sola transacción.
+    Las filas con errores se reportan sin impedir que se guarden las demás.
+    """
+    if not crud_subject.subject_exists(db, subject_id=payload.subject_id):
+        raise HTTPException(status_code=404, detail="La materia no existe")
+
+    results = crud_grade.bulk_upsert_grades(db, subject_id=payload.subject_id, items=payload.grades)
+
+    return {
+        "subject_id": payload.subject_id,
+        "created": sum(1 for r in results if r["status"] == "created"),
+        "updated": sum(1 for r in results if r["status"] == "updated"),
+        "errors": sum(1 for r in results if r["status"] == "error"),
+        "results": results,
+    }
+
+# ---------------------------------------------------------
+# LISTADO GENERAL DE CALIFICACIONES (paginado por cursor)
+# ---------------------------------------------------------
+@router.get("/", response_model=List[GradeResponse])
+def read_grades(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(dependencies.get_current_user)
+):
+    """Si hay más resultados, el header X-Next-Cursor trae el cursor de la siguiente página"""
+    try:
+        grades, next_cursor = crud_grade.get_grades_page(db, cursor=cursor, limit=limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return grades
+
 @router.get("/student/{student_id}", response_model=List[GradeResponse])
 def read_student_grades(
     student_id: int,
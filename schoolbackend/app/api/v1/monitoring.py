@@ -0,0 +1,80 @@
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from app.api import dependencies
+from app.core import auth_cache, config, request_metrics, security, stats_cache, student_index
+from app.db import session
+from app.models.user import User
+
+router = APIRouter()
+
+# /metrics para Prometheus: se monta en la raíz y no usa el JWT de la API, sino
+# METRICS_TOKEN. Sin token configurado no se expone (responde 404)
+prometheus_router = APIRouter()
+
+
+# ---------------------------------------------------------
+# MÉTRICAS DEL POOL DE CONEXIONES
+# ---------------------------------------------------------
+@router.get("/db-pool")
+def read_db_pool_metrics(current_user: User = Depends(dependencies.require_admin)):
+    """
+    Estado del pool (conexiones prestadas, overflow) y contadores acumulados
+    (esperas por conexión, timeouts, invalidaciones) de este proceso worker
+    """
+    data = {"sync": session.pool_metrics.snapshot(session.engine.pool)}
+    if session.async_engine is not None:
+        data["async"] = session.async_pool_metrics.snapshot(session.async_engine.sync_engine.pool)
+    return data
+
+
+# ---------------------------------------------------------
+# CACHÉ DE AUTENTICACIÓN
+# ---------------------------------------------------------
+@router.get("/auth-cache")
+def read_auth_cache_stats(current_user: User = Depends(dependencies.require_admin)):
+    return auth_cache.stats()
+
+
+# ---------------------------------------------------------
+# POOL DE HASHING (BCRYPT)
+# ---------------------------------------------------------
+@router.get("/hashing")
+def read_hashing_pool_stats(current_user: User = Depends(dependencies.require_admin)):
+    return security.hash_pool.stats()
+
+
+# ---------------------------------------------------------
+# ÍNDICE DE PREFIJOS DE ALUMNOS (AUTOCOMPLETADO)
+# ---------------------------------------------------------
+@router.get("/student-index")
+def read_student_index_stats(current_user: User = Depends(dependencies.require_admin)):
+    """Tamaño del índice en memoria de este proceso (alumnos, llaves y bytes aproximados)"""
+    return student_index.stats()
+
+
+# ---------------------------------------------------------
+# CACHÉ DE CONTADORES DEL DASHBOARD
+# ---------------------------------------------------------
+@router.get("/stats-cache")
+def read_stats_cache_stats(current_user: User = Depends(dependencies.require_admin)):
+    return stats_cache.stats()
+
+
+# ---------------------------------------------------------
+# MÉTRICAS POR ENDPOINT (PROMETHEUS)
+# ---------------------------------------------------------
+@prometheus_router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def read_prometheus_metrics(authorization: Optional[str] = Header(None)):
+    """Peticiones, sentencias SQL y tiempos por ruta de este proceso worker"""
+    if not config.REQUEST_METRICS:
+        raise HTTPException(status_code=404, detail="Métricas deshabilitadas (REQUEST_METRICS=false)")
+    if not config.METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Métricas deshabilitadas (falta METRICS_TOKEN)")
+    if not secrets.compare_digest(authorization or "", f"Bearer {config.METRICS_TOKEN}"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token de métricas inválido")
+    return PlainTextResponse(
+        request_metrics.registry.render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
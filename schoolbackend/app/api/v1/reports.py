@@ -1,12 +1,14 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session, joinedload
 from app.db.session import get_db
 from app.models.grade import Grade
 from app.models.student import Student
 from app.api import dependencies
+from app.crud import crud_grade, crud_stats, crud_student, crud_subject
+from app.core import config, stats_cache
 from app.models.user import User
 from app.models.subject import Subject
-from sqlalchemy import func, select, or_
 
 router = APIRouter()
 
@@ -28,15 +30,8 @@ def get_student_full_report(
     if not student:
         raise HTTPException(status_code=404, detail="Alumno no encontrado")
 
-    # Obtener calificaciones
-    grades = db.query(Grade).filter(Grade.student_id == student_id).all()
-
-    # Calcular promedio
-    if not grades:
-        average = 0
-    else:
-        total_score = sum([grade.score for grade in grades])
-        average = round(total_score / len(grades), 2)
+    # Calificaciones, promedio general y desglose por materia en una sola consulta
+    summary = crud_grade.get_student_grade_summary(db, student_id)
 
     # Formatear materias inscritas (con información del profesor)
     subjects_data = []
@@ -50,15 +45,6 @@ def get_student_full_report(
             }
         })
 
-    # Formatear calificaciones
-    grades_data = []
-    for grade in grades:
-        grades_data.append({
-            "id": grade.id,
-            "subject_id": grade.subject_id,
-            "score": grade.score
-        })
-
     return {
         "student": {
             "id": student.id,
@@ -68,8 +54,9 @@ def get_student_full_report(
             "email": student.email
         },
         "subjects": subjects_data,
-        "grades": grades_data,
-        "total_average": average
+        "grades": summary["grades"],
+        "subject_averages": summary["subject_averages"],
+        "total_average": summary["total_average"]
     }
 
 @router.get("/student/{student_id}")
@@ -83,50 +70,79 @@ def get_student_report(
     if not student:
         raise HTTPException(status_code=404, detail="Alumno no encontrado")
 
-    grades = db.query(Grade).filter(Grade.student_id == student_id).all()
-
-    if not grades:
-        average = 0
-    else:
-     
-        total_score = sum([grade.score for grade in grades])
-        average = round(total_score / len(grades), 2)
-
-   
-    subjects_data = []
-    for grade in grades:
-        subjects_data.append({
-            "subject": grade.subject.name, 
-            "score": grade.score
-        })
+    # Calificaciones con su materia y promedio general (de grade_aggregates) en
+    # una sola consulta: sin N+1 por grade.subject ni suma en Python
+    report = crud_grade.get_student_grade_list(db, student_id)
 
-    
     return {
         "student_name": f"{student.first_name} {student.last_name} {student.last_name2}",
         
-        "total_average": average,
-        "grades": subjects_data
+        "total_average": report["total_average"],
+        "grades": report["grades"]
     }
 
 
 
 
+# Contadores del dashboard: se sirven desde stats_cache y los crud los invalidan
+@router.get("/stats")
+def get_dashboard_stats(db: Session = Depends(get_db)):
+    """Todos los contadores en una sola llamada: {"students", "subjects", "professors"}"""
+    return crud_stats.get_stats(db)
+
 @router.get("/stats/students")
 def get_total_students(db: Session = Depends(get_db)):
-    total_students = db.query(Student).count()
-    return {"total": total_students}
+    return {"total": crud_stats.get_stats(db, [stats_cache.STUDENTS])[stats_cache.STUDENTS]}
 
 @router.get("/stats/subjects")
 def get_total_subjects(db: Session = Depends(get_db)):
-    total_subjects = db.query(Subject).count()
-    return {"total": total_subjects}
+    return {"total": crud_stats.get_stats(db, [stats_cache.SUBJECTS])[stats_cache.SUBJECTS]}
 
 @router.get("/stats/professors")
 def get_total_professors(db: Session = Depends(get_db)):
-    total_professors = db.query(User).filter(User.role == "profesor").count()
-    return {"total": total_professors}
+    return {"total": crud_stats.get_stats(db, [stats_cache.PROFESSORS])[stats_cache.PROFESSORS]}
+
 
 
+# Ranking de la materia: se lee de grade_aggregates (una fila por alumno)
+@router.get("/subject-ranking/{subject_id}")
+def get_subject_ranking(
+    subject_id: int,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(dependencies.get_current_user)
+):
+    if not crud_subject.subject_exists(db, subject_id=subject_id):
+        raise HTTPException(status_code=404, detail="Materia no encontrada")
+    return crud_grade.get_subject_ranking(db, subject_id, limit=limit)
+
+
+# ---------------------------------------------------------
+# ESTADÍSTICAS DE CALIFICACIONES (media, mediana, percentiles, histograma...)
+# ---------------------------------------------------------
+@router.get("/subject-stats")
+def get_term_stats(
+    pass_score: Optional[float] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(dependencies.get_current_user)
+):
+    """Estadísticas de todas las materias a la vez (reporte de periodo)"""
+    return crud_grade.get_term_stats(db, pass_score if pass_score is not None else config.PASS_SCORE)
+
+
+@router.get("/subject-stats/{subject_id}")
+def get_subject_stats(
+    subject_id: int,
+    pass_score: Optional[float] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(dependencies.get_current_user)
+):
+    subject = db.query(Subject.name).filter(Subject.id == subject_id).first()
+    if not subject:
+        raise HTTPException(status_code=404, detail="Materia no encontrada")
+    stats = crud_grade.get_subject_stats(db, subject_id, pass_score if pass_score is not None else config.PASS_SCORE)
+    return {"subject_id": subject_id, "subject_name": subject.name, **stats}
+
 
 @router.get("/subject-grades/{subject_id}")
 def get_subject_enrollment_report(
@@ -175,47 +191,18 @@ def get_student_grades_report_by_identifier(
     current_user: User = Depends(dependencies.get_current_user)
 ):
     
-    search_term = f"%{identifier.lower()}%"
-    
-    student = db.query(Student).filter(
-        or_(
-            func.lower(Student.email) == identifier.lower(),
-            func.lower(Student.first_name).like(search_term),
-            func.lower(Student.last_name).like(search_term),
-            func.lower(Student.last_name2).like(search_term)
-        )
-    ).first() 
-    
+    # El mejor resultado de la búsqueda indexada (email exacto primero)
+    matches = crud_student.search_students(db, identifier, limit=1)
+    student = matches[0] if matches else None
+
     if not student:
         raise HTTPException(status_code=404, detail=f"Alumno no encontrado con el identificador: {identifier}")
 
-    student_id = student.id
-    
-    grades = (
-        db.query(Grade)
-        .filter(Grade.student_id == student_id)
-        .options(joinedload(Grade.subject))
-        .all()
-    )
+    report = crud_grade.get_student_grade_list(db, student.id, subject_key="subject_name")
 
-    subjects_data = []
-    for grade in grades:
-        subject = grade.subject 
-        subjects_data.append({
-            "subject_name": subject.name,
-            "score": grade.score,
-        })
-    
-    if not grades:
-        average = 0
-    else:
-        total_score = sum([grade.score for grade in grades])
-        average = round(total_score / len(grades), 2)
-        
-    
     return {
         "student_id": student.id,
         "student_name": f"{student.first_name} {student.last_name} {student.last_name2 or ''}".strip(),
-        "total_average": average,
-        "grades": subjects_data,
+        "total_average": report["total_average"],
+        "grades": report["grades"],
     }
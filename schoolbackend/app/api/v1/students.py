@@ -1,12 +1,12 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+import io
+from typing import List, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Response, UploadFile
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
 from app.db.session import get_db
-from app.schemas.student import StudentCreate, StudentResponse, StudentUpdate
-from app.crud import crud_student
+from app.schemas.student import StudentCreate, StudentImportResponse, StudentResponse, StudentUpdate
+from app.crud import crud_student, crud_student_import
+from app.core import config
 from app.models.user import User
-from app.models.student import Student
 from app.api import dependencies 
 
 router = APIRouter()
@@ -25,17 +25,58 @@ def create_student(
         raise HTTPException(status_code=400, detail="El email ya está registrado")
     return crud_student.create_student(db=db, student=student)
 
+# ---------------------------------------------------------
+# IMPORTACIÓN MASIVA DESDE CSV (inicio de periodo)
+# ---------------------------------------------------------
+@router.post("/import", response_model=StudentImportResponse)
+def import_students(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(dependencies.require_admin)
+):
+    """
+    CSV con first_name, last_name, email y opcionalmente last_name2 y
+    subject_ids (ids separados por ";"). Los emails ya registrados no se
+    duplican, pero sí se inscriben. El archivo se procesa por lotes de
+    IMPORT_BATCH_SIZE filas, cada uno en su propia transacción.
+    """
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return crud_student_import.import_students(
+            db, crud_student_import.read_csv(stream), batch_size=config.IMPORT_BATCH_SIZE
+        )
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="El archivo debe estar codificado en UTF-8")
+    except ValueError as e:
+        # Encabezado incompleto
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        stream.detach()
+
 @router.get("/", response_model=List[StudentResponse])
 def read_students(
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
   
     current_user: User = Depends(dependencies.get_current_user) 
 ):
-    
-    
-    return crud_student.get_students(db, skip=skip, limit=limit)
+    """
+    Lista alumnos por cursor: si hay más resultados, el header X-Next-Cursor trae
+    el cursor de la siguiente página. skip se mantiene por compatibilidad.
+    """
+    if skip and not cursor:
+        return crud_student.get_students(db, skip=skip, limit=limit)
+
+    try:
+        students, next_cursor = crud_student.get_students_page(db, cursor=cursor, limit=limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return students
 
 # NUEVO ENDPOINT DE BÚSQUEDA
 @router.get("/search-my-students", response_model=List[StudentResponse])
@@ -47,35 +88,11 @@ def search_my_students(
     """
     Busca solo los alumnos inscritos en las materias que imparte el profesor actual.
     """
-    from app.models.subject import Subject
-    
-    # Obtener las materias del profesor
-    teacher_subjects = db.query(Subject).filter(
-        Subject.teacher_id == current_user.id
-    ).all()
-    
-    # Obtener IDs de estudiantes de esas materias
-    student_ids = set()
-    for subject in teacher_subjects:
-        for student in subject.students:
-            student_ids.add(student.id)
-    
-    if not student_ids:
-        return []  # El profesor no tiene alumnos
-    
-    # Buscar entre esos estudiantes
-    search_term = f"%{q.lower()}%"
-    students = db.query(Student).filter(
-        Student.id.in_(student_ids),
-        or_(
-            func.lower(Student.email).like(search_term),
-            func.lower(Student.first_name).like(search_term),
-            func.lower(Student.last_name).like(search_term),
-            func.lower(Student.last_name2).like(search_term)
-        )
-    ).limit(10).all()
-    
-    return students
+    # El alcance del profesor va como subconsulta dentro de la misma búsqueda:
+    # no se cargan sus materias ni se arma una lista de ids en Python
+    return crud_student.search_students(
+        db, q, limit=10, within=crud_student.teacher_student_ids_query(current_user.id)
+    )
 
 @router.put("/{student_id}", response_model=StudentResponse)
 def update_student(
@@ -124,16 +141,7 @@ def enroll_student(
 
 @router.get("/search", response_model=List[StudentResponse])
 def search_students_suggestions(q: str, db: Session = Depends(get_db)):
-    # Lógica similar a la de reports, pero devolviendo solo el estudiante
-    search_term = f"%{q.lower()}%"
-    students = db.query(Student).filter(
-        or_(
-            func.lower(Student.email).like(search_term),
-            func.lower(Student.first_name).like(search_term),
-            func.lower(Student.last_name).like(search_term)
-        )
-    ).limit(10).all()
-    return students
+    return crud_student.suggest_students(db, q, limit=10)
 
 
 
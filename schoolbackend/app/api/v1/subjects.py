@@ -1,15 +1,12 @@
 from typing import List,Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Response
-from sqlalchemy.orm import Session, joinedload, selectinload
-from sqlalchemy import func, select,or_
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
 from app.db.session import get_db
-from app.schemas.subject import SubjectCreate, SubjectResponse, SubjectUpdate, SubjectStudentAssignment
+from app.schemas.subject import SubjectCreate, SubjectResponse, SubjectUpdate, SubjectStudentAssignment, SubjectRosterUpdateResponse
 from app.crud import crud_subject, crud_user
 from app.models.user import User
 from app.api import dependencies
-from app.models.subject import Subject, student_subject_association
-from app.models.student import Student
-from app.models.grade import Grade
 from app.schemas.student import StudentResponse
 
 router = APIRouter()
@@ -41,33 +38,11 @@ def create_subject(
 # OBTENER TODAS LAS MATERIAS
 # ---------------------------------------------------------
 @router.get("/", response_model=List[SubjectResponse])
-def read_subjects(db: Session = Depends(get_db)):
-
-    student_count_subquery = select(
-        student_subject_association.c.subject_id,
-        func.count(student_subject_association.c.student_id).label("student_count")
-    ).group_by(student_subject_association.c.subject_id).subquery()
-
-    results = (
-        db.query(Subject, student_count_subquery.c.student_count)
-        .outerjoin(student_count_subquery, Subject.id == student_count_subquery.c.subject_id)
-        .options(joinedload(Subject.teacher))
-        .options(selectinload(Subject.students))
-        .all()
-    )
-
-    
-
-
-
-    response_data = []
-    for subject, count in results:
-        subject.student_count = count or 0
-        response_data.append(
-        SubjectResponse.model_validate(subject, from_attributes=True)
-    )
-
-    return response_data
+def read_subjects(include_students: bool = False, db: Session = Depends(get_db)):
+    # Listado compacto (profesor + conteo); la lista de alumnos solo con include_students=true.
+    # Las filas ya vienen con la forma de SubjectResponse, así que se responden sin revalidarlas.
+    listing = crud_subject.get_subject_listing(db, include_students=include_students)
+    return JSONResponse(content=listing)
 
 # ---------------------------------------------------------
 # OBTENER ESTUDIANTES DE UNA MATERIA
@@ -101,48 +76,26 @@ def read_subject_students(
 def read_teacher_subjects(
     db: Session = Depends(get_db),
     current_user: User = Depends(dependencies.get_current_user),
-    teacher_id: Optional[int] = None 
+    teacher_id: Optional[int] = None,
+    include_students: bool = False
 ):
-    
-    student_count_subquery = select(
-        student_subject_association.c.subject_id,
-        func.count(student_subject_association.c.student_id).label("student_count")
-    ).group_by(student_subject_association.c.subject_id).subquery()
-
-    query = (
-        db.query(Subject, student_count_subquery.c.student_count)
-        .outerjoin(student_count_subquery, Subject.id == student_count_subquery.c.subject_id)
-        .options(joinedload(Subject.teacher))
-        .options(selectinload(Subject.students))
-    )
-    
     if current_user.role == "profesor":
         filter_id = current_user.id
     elif teacher_id is not None:
         filter_id = teacher_id
     else:
         filter_id = None
-    
-    if filter_id is not None:
-        query = query.filter(Subject.teacher_id == filter_id)
-    
 
-    results = query.all()
-    
-    response_data = []
-    for subject, count in results:
-        subject.student_count = count or 0
-        response_data.append(
-        SubjectResponse.model_validate(subject, from_attributes=True)
+    listing = crud_subject.get_subject_listing(
+        db, teacher_id=filter_id, include_students=include_students
     )
-
-    return response_data
+    return JSONResponse(content=listing)
 # ---------------------------------------------------------
 # REEMPLAZAR LISTA COMPLETA DE ESTUDIANTES
 # ---------------------------------------------------------
 @router.put(
     "/{subject_id}/students/",
-    response_model=SubjectResponse,
+    response_model=SubjectRosterUpdateResponse,
     status_code=status.HTTP_200_OK
 )
 def update_subject_students(
@@ -150,27 +103,11 @@ def update_subject_students(
     assignment: SubjectStudentAssignment,
     db: Session = Depends(get_db)
 ):
-
-    subject = db.query(Subject).filter(Subject.id == subject_id).first()
-    if not subject:
+    """Solo se insertan/borran las diferencias; added y removed indican cuántas"""
+    if not crud_subject.subject_exists(db, subject_id=subject_id):
         raise HTTPException(status_code=404, detail="Materia no encontrada")
 
-    if assignment.student_ids:
-        students_to_assign = db.query(Student).filter(Student.id.in_(assignment.student_ids)).all()
-    else:
-        students_to_assign = []
-
-    subject.students = students_to_assign
-    db.commit()
-
-    subject = (
-        db.query(Subject)
-        .filter(Subject.id == subject_id)
-        .options(joinedload(Subject.students))
-        .first()
-    )
-
-    return subject
+    return crud_subject.replace_subject_roster(db, subject_id, assignment.student_ids)
 
 
 # ---------------------------------------------------------
@@ -218,68 +155,3 @@ def delete_subject(
     if not deleted_subject:
         raise HTTPException(status_code=404, detail="Materia no encontrada")
     return Response(status_code=status.HTTP_204_NO_CONTENT)
-
-
-@router.get("/{subject_id}/students", response_model=List[StudentResponse])
-def read_subject_students(
-    subject_id: int, 
-    db: Session = Depends(get_db),
-    current_user: User = Depends(dependencies.get_current_user)
-):
-    
-    subject = crud_subject.get_subject(db, subject_id=subject_id)
-
-    if not subject:
-        raise HTTPException(status_code=404, detail="Materia no encontrada")
-        
-    if current_user.role == "profesor" and subject.teacher_id != current_user.id:
-        raise HTTPException(
-            status_code=403, 
-            detail="No tienes permiso para ver los alumnos de esta materia."
-        )
-
-   
-    return subject.students
-
-
-
-@router.get("/teacher-load/", response_model=List[SubjectResponse])
-def read_teacher_subjects(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(dependencies.get_current_user),
-    teacher_id: Optional[int] = None 
-):
-    
-    student_count_subquery = select(
-        student_subject_association.c.subject_id,
-        func.count(student_subject_association.c.student_id).label("student_count")
-    ).group_by(student_subject_association.c.subject_id).subquery()
-
-    query = (
-        db.query(Subject, student_count_subquery.c.student_count)
-        .outerjoin(student_count_subquery, Subject.id == student_count_subquery.c.subject_id)
-        .options(joinedload(Subject.teacher))
-        .options(selectinload(Subject.students))
-    )
-    
-    if current_user.role == "profesor":
-        filter_id = current_user.id
-    elif teacher_id is not None:
-        filter_id = teacher_id
-    else:
-        filter_id = None
-    
-    if filter_id is not None:
-        query = query.filter(Subject.teacher_id == filter_id)
-    
-
-    results = query.all()
-    
-    response_data = []
-    for subject, count in results:
-        subject.student_count = count or 0
-        response_data.append(
-        SubjectResponse.model_validate(subject, from_attributes=True)
-    )
-
-    return response_data
\ No newline at end of file
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Request, Response
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.schemas.user import UserCreate, UserResponse, UserUpdate
@@ -6,17 +7,15 @@ from app.schemas.teacher_profile import TeacherProfileResponse, TeacherProfileUp
 from app.crud import crud_user, crud_teacher_profile
 from app.api import dependencies
 from app.models.user import User
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile as FormFile
+from app.core import config, profile_photos
 from typing import List, Optional
-from pathlib import Path
-import uuid
-import io
-from PIL import Image
 
 router = APIRouter()
 
-# Directorio para guardar las fotos de perfil
-UPLOAD_DIR = Path("app/uploads/profiles")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+# Tope del cuerpo de PUT /profile: la foto más la descripción y el multipart
+MAX_PROFILE_BODY_BYTES = profile_photos.MAX_PHOTO_BYTES + 64 * 1024
 
 # Endpoint para REGISTRAR un nuevo usuario
 @router.post("/", response_model=UserResponse)
@@ -39,18 +38,30 @@ def read_users_me(current_user: User = Depends(dependencies.get_current_user)):
 
 @router.get("/", response_model=List[UserResponse])
 def read_users(
+    response: Response,
     db: Session = Depends(get_db),
     # Permite filtrar por rol (e.g., /api/v1/users/?role=profesor)
     role: Optional[str] = None, 
     skip: int = 0, 
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(dependencies.get_current_user)
 ):
-    return crud_user.get_users(db, skip=skip, limit=limit, role=role)
+    # Paginación por cursor (header X-Next-Cursor); skip se mantiene por compatibilidad
+    if skip and not cursor:
+        return crud_user.get_users(db, skip=skip, limit=limit, role=role)
+
+    try:
+        users, next_cursor = crud_user.get_users_page(db, cursor=cursor, limit=limit, role=role)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return users
 
 
 
-@router.put("/{user_id}", response_model=UserResponse)
+@router.put("/{user_id:int}", response_model=UserResponse)
 def update_user_route(
     user_id: int, 
     user_update: UserUpdate, 
@@ -63,7 +74,7 @@ def update_user_route(
     return updated_user
 
 
-@router.delete("/{user_id}", response_model=UserResponse)
+@router.delete("/{user_id:int}", response_model=UserResponse)
 def delete_user_route(
     user_id: int, 
     db: Session = Depends(get_db),
@@ -104,14 +115,46 @@ def get_teacher_profile(
     
     return profile
 
+def _save_teacher_profile(db: Session, user_id: int, update_data: dict):
+    """Parte síncrona de PUT /profile (consultas y commit): se ejecuta en el threadpool"""
+    previous = crud_teacher_profile.get_teacher_profile_by_user_id(db, user_id)
+
+    # Si no hay datos para actualizar, retornar el perfil actual
+    if not update_data:
+        if not previous:
+            # Crear un perfil vacío si no existe
+            previous = crud_teacher_profile.create_teacher_profile(
+                db,
+                user_id,
+                TeacherProfileCreate(description="", photo_url="")
+            )
+        return previous
+
+    old_photo_url = previous.photo_url if previous else None
+    updated_profile = crud_teacher_profile.update_teacher_profile(db, user_id, TeacherProfileUpdate(**update_data))
+    # Eliminar foto anterior una vez guardada la nueva (si ningún otro perfil la usa)
+    if (
+        "photo_url" in update_data
+        and old_photo_url
+        and old_photo_url != update_data["photo_url"]
+        and not crud_teacher_profile.photo_in_use(db, old_photo_url)
+    ):
+        profile_photos.remove_photo(old_photo_url)
+    return updated_profile
+
+
 @router.put("/profile", response_model=TeacherProfileResponse)
 async def update_teacher_profile(
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(dependencies.get_current_user)
 ):
     """
-    Actualiza el perfil del profesor (descripción y/o foto)
+    Actualiza el perfil del profesor (descripción y/o foto).
+    Es async para leer el formulario; la subida se copia a disco por trozos y
+    Pillow y la base de datos se usan desde el threadpool, fuera del event loop.
+    Las variantes reducidas de la foto se generan después de responder
     """
     if current_user.role != "profesor":
         raise HTTPException(
@@ -119,9 +162,18 @@ async def update_teacher_profile(
             detail="Este endpoint es solo para profesores"
         )
 
+    # Rechazar cuerpos demasiado grandes antes de parsear el formulario
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_PROFILE_BODY_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La imagen no puede exceder 5MB"
+        )
+
+    photo_path = None
     try:
         # Parsear el formulario multipart manualmente
-        form = await request.form()
+        form = await request.form(max_files=1)
         update_data = {}
 
         # Obtener descripción si existe
@@ -137,91 +189,43 @@ async def update_teacher_profile(
                 update_data["description"] = description
 
         # Obtener foto si existe
+        # request.form() devuelve el UploadFile de Starlette (fastapi.UploadFile es una subclase)
         photo = form.get("photo")
-        if photo and isinstance(photo, UploadFile):
+        if photo and isinstance(photo, FormFile):
+            # Validar tipo de contenido
+            if not photo.content_type or not photo.content_type.startswith("image/"):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="El archivo debe ser una imagen válida"
+                )
             try:
-                # Validar tipo de contenido
-                if not photo.content_type or not photo.content_type.startswith("image/"):
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="El archivo debe ser una imagen válida"
-                    )
-
-                # Leer el contenido de forma segura
-                contents = await photo.read()
-                
-                if not contents:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="El archivo está vacío"
-                    )
-
-                # Validar tamaño
-                if len(contents) > 5 * 1024 * 1024:  # 5MB
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="La imagen no puede exceder 5MB"
-                    )
-
+                photo_path, sha256 = await profile_photos.save_upload(photo)
                 # Validar que sea una imagen real usando Pillow
-                try:
-                    image = Image.open(io.BytesIO(contents))
-                    image.verify()  # Verifica que la imagen es válida
-                except Exception:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="El archivo no es una imagen válida"
-                    )
-
-                # Guardar la imagen
-                extension = Path(photo.filename).suffix.lower() if photo.filename else ".jpg"
-                # Asegurar que la extensión sea válida
-                valid_extensions = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
-                if extension not in valid_extensions:
-                    extension = ".jpg"
-                
-                filename = f"{uuid.uuid4()}{extension}"
-                filepath = UPLOAD_DIR / filename
-
-                with open(filepath, "wb") as f:
-                    f.write(contents)
-
-                # Eliminar foto anterior si existe
-                existing_profile = crud_teacher_profile.get_teacher_profile_by_user_id(db, current_user.id)
-                if existing_profile and existing_profile.photo_url:
-                    try:
-                        old_path = UPLOAD_DIR / Path(existing_profile.photo_url).name
-                        if old_path.exists():
-                            old_path.unlink()
-                    except Exception:
-                        pass  # Ignorar errores al eliminar archivo anterior
-
-                update_data["photo_url"] = f"/uploads/profiles/{filename}"
-
-            except HTTPException:
-                raise
-            except Exception as e:
+                await run_in_threadpool(profile_photos.verify_image, photo_path)
+            except profile_photos.PhotoError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+            except OSError:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Error al procesar la imagen"
+                    detail="Error al procesar la imagen"
                 )
-
-        # Si no hay datos para actualizar, retornar el perfil actual
-        if not update_data:
-            profile = crud_teacher_profile.get_teacher_profile_by_user_id(db, current_user.id)
-            if not profile:
-                # Crear un perfil vacío si no existe
-                profile = crud_teacher_profile.create_teacher_profile(
-                    db, 
-                    current_user.id, 
-                    TeacherProfileCreate(description="", photo_url="")
-                )
-            return profile
-
-        # Actualizar perfil
-        profile_update = TeacherProfileUpdate(**update_data)
-        updated_profile = crud_teacher_profile.update_teacher_profile(db, current_user.id, profile_update)
-        return updated_profile
+            update_data["photo_url"] = await run_in_threadpool(
+                profile_photos.store_photo, photo_path, photo.filename, sha256
+            )
+            photo_path = None
+
+        try:
+            profile = await run_in_threadpool(_save_teacher_profile, db, current_user.id, update_data)
+        except Exception:
+            # Sin perfil guardado la foto nueva quedaría huérfana
+            if "photo_url" in update_data and not await run_in_threadpool(
+                crud_teacher_profile.photo_in_use, db, update_data["photo_url"]
+            ):
+                await run_in_threadpool(profile_photos.remove_photo, update_data["photo_url"])
+            raise
+        if "photo_url" in update_data:
+            background_tasks.add_task(profile_photos.generate_variants, update_data["photo_url"])
+        return profile
 
     except HTTPException:
         raise
@@ -230,4 +234,50 @@ async def update_teacher_profile(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error al procesar la solicitud"
-        )
\ No newline at end of file
+        )
+    finally:
+        if photo_path is not None:
+            await run_in_threadpool(profile_photos.discard, photo_path)
+
+
+@router.get("/{user_id:int}/photo")
+async def get_teacher_photo(
+    user_id: int,
+    request: Request,
+    size: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Foto de perfil del profesor. Con size (uno de PHOTO_VARIANT_SIZES) devuelve
+    la variante WebP cuadrada, generándola si todavía no existe; sin size, el
+    archivo original. Pública, como /uploads
+    """
+    if size is not None and size not in config.PHOTO_VARIANT_SIZES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tamaños disponibles: {', '.join(str(s) for s in config.PHOTO_VARIANT_SIZES)}"
+        )
+
+    profile = await run_in_threadpool(crud_teacher_profile.get_teacher_profile_by_user_id, db, user_id)
+    source = profile_photos.photo_path(profile.photo_url if profile else None)
+    if source is None or not await run_in_threadpool(source.exists):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="El usuario no tiene foto de perfil")
+
+    if size is None:
+        path, media_type = source, None
+    else:
+        try:
+            path = await profile_photos.ensure_variant(source, size)
+        except Exception:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error al procesar la imagen"
+            )
+        media_type = "image/webp"
+
+    # El nombre del archivo identifica su contenido; la URL no (el profesor puede
+    # cambiar de foto), por eso se cachea un día y se revalida con ETag
+    headers = {"ETag": f'"{path.name}"', "Cache-Control": "public, max-age=86400"}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
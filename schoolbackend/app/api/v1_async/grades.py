@@ -0,0 +1,76 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_async_db
+from app.schemas.grade import GradeCreate, GradeResponse, GradeUpdate
+from app.crud import crud_grade_async, crud_student_async, crud_subject_async
+from app.models.user import User
+from app.api import dependencies
+from app.api.routing import add_sync_fallback
+from app.api.v1 import grades as sync_grades
+
+# Versión asíncrona de app/api/v1/grades.py (se monta con USE_ASYNC_DB=true)
+router = APIRouter()
+
+@router.post("/", response_model=GradeResponse)
+async def create_grade(
+    grade: GradeCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    if not await crud_student_async.student_exists(db, student_id=grade.student_id):
+        raise HTTPException(status_code=404, detail="El alumno no existe")
+
+    if not await crud_subject_async.subject_exists(db, subject_id=grade.subject_id):
+        raise HTTPException(status_code=404, detail="La materia no existe")
+
+    return await crud_grade_async.create_grade(db=db, grade=grade)
+
+@router.get("/", response_model=List[GradeResponse])
+async def read_grades(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    try:
+        grades, next_cursor = await crud_grade_async.get_grades_page(db, cursor=cursor, limit=limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return grades
+
+@router.get("/student/{student_id}", response_model=List[GradeResponse])
+async def read_student_grades(
+    student_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    return await crud_grade_async.get_grades_by_student(db, student_id=student_id)
+
+@router.get("/by-subject/{subject_id}", response_model=List[GradeResponse])
+async def read_grades_by_subject(
+    subject_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    return await crud_grade_async.get_grades_by_subject(db, subject_id=subject_id)
+
+
+@router.put("/{grade_id}", response_model=GradeResponse)
+async def update_grade(
+    grade_id: int,
+    grade_update: GradeUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    grade = await crud_grade_async.update_grade(db, grade_id=grade_id, grade_update=grade_update)
+    if not grade:
+        raise HTTPException(status_code=404, detail="Calificación no encontrada")
+    return grade
+
+
+add_sync_fallback(router, sync_grades.router)
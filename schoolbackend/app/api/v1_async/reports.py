@@ -0,0 +1,198 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from app.db.session import get_async_db
+from app.models.grade import Grade
+from app.models.student import Student
+from app.models.user import User
+from app.models.subject import Subject
+from app.api import dependencies
+from app.crud import crud_grade_async, crud_stats_async, crud_student_async, crud_subject_async
+from app.core import config, stats_cache
+from app.api.routing import add_sync_fallback
+from app.api.v1 import reports as sync_reports
+
+# Versión asíncrona de app/api/v1/reports.py (se monta con USE_ASYNC_DB=true)
+router = APIRouter()
+
+
+@router.get("/student-full/{student_id}")
+async def get_student_full_report(
+    student_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    """
+    Reporte para el profesor completo del estudiante con materias inscritas, calificaciones y promedio
+    """
+    result = await db.execute(
+        select(Student)
+        .options(joinedload(Student.subjects).joinedload(Subject.teacher))
+        .where(Student.id == student_id)
+    )
+    student = result.unique().scalars().first()
+
+    if not student:
+        raise HTTPException(status_code=404, detail="Alumno no encontrado")
+
+    summary = await crud_grade_async.get_student_grade_summary(db, student_id)
+
+    subjects_data = []
+    for subject in student.subjects:
+        subjects_data.append({
+            "id": subject.id,
+            "name": subject.name,
+            "teacher": {
+                "id": subject.teacher.id if subject.teacher else None,
+                "full_name": subject.teacher.full_name if subject.teacher else "No asignado"
+            }
+        })
+
+    return {
+        "student": {
+            "id": student.id,
+            "first_name": student.first_name,
+            "last_name": student.last_name,
+            "last_name2": student.last_name2,
+            "email": student.email
+        },
+        "subjects": subjects_data,
+        "grades": summary["grades"],
+        "subject_averages": summary["subject_averages"],
+        "total_average": summary["total_average"]
+    }
+
+@router.get("/student/{student_id}")
+async def get_student_report(
+    student_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    student = await db.get(Student, student_id)
+    if not student:
+        raise HTTPException(status_code=404, detail="Alumno no encontrado")
+
+    report = await crud_grade_async.get_student_grade_list(db, student_id)
+
+    return {
+        "student_name": f"{student.first_name} {student.last_name} {student.last_name2}",
+        "total_average": report["total_average"],
+        "grades": report["grades"]
+    }
+
+
+@router.get("/stats")
+async def get_dashboard_stats(db: AsyncSession = Depends(get_async_db)):
+    return await crud_stats_async.get_stats(db)
+
+@router.get("/stats/students")
+async def get_total_students(db: AsyncSession = Depends(get_async_db)):
+    stats = await crud_stats_async.get_stats(db, [stats_cache.STUDENTS])
+    return {"total": stats[stats_cache.STUDENTS]}
+
+@router.get("/stats/subjects")
+async def get_total_subjects(db: AsyncSession = Depends(get_async_db)):
+    stats = await crud_stats_async.get_stats(db, [stats_cache.SUBJECTS])
+    return {"total": stats[stats_cache.SUBJECTS]}
+
+@router.get("/stats/professors")
+async def get_total_professors(db: AsyncSession = Depends(get_async_db)):
+    stats = await crud_stats_async.get_stats(db, [stats_cache.PROFESSORS])
+    return {"total": stats[stats_cache.PROFESSORS]}
+
+
+@router.get("/subject-ranking/{subject_id}")
+async def get_subject_ranking(
+    subject_id: int,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    if not await crud_subject_async.subject_exists(db, subject_id=subject_id):
+        raise HTTPException(status_code=404, detail="Materia no encontrada")
+    return await crud_grade_async.get_subject_ranking(db, subject_id, limit=limit)
+
+
+@router.get("/subject-stats")
+async def get_term_stats(
+    pass_score: Optional[float] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    return await crud_grade_async.get_term_stats(db, pass_score if pass_score is not None else config.PASS_SCORE)
+
+
+@router.get("/subject-stats/{subject_id}")
+async def get_subject_stats(
+    subject_id: int,
+    pass_score: Optional[float] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    subject_name = await db.scalar(select(Subject.name).where(Subject.id == subject_id))
+    if subject_name is None:
+        raise HTTPException(status_code=404, detail="Materia no encontrada")
+    stats = await crud_grade_async.get_subject_stats(
+        db, subject_id, pass_score if pass_score is not None else config.PASS_SCORE
+    )
+    return {"subject_id": subject_id, "subject_name": subject_name, **stats}
+
+
+@router.get("/subject-grades/{subject_id}")
+async def get_subject_enrollment_report(
+    subject_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    subject = await db.get(Subject, subject_id)
+    if not subject:
+        raise HTTPException(status_code=404, detail="Materia no encontrada")
+
+    result = await db.execute(
+        select(Grade)
+        .options(selectinload(Grade.student))
+        .where(Grade.subject_id == subject_id)
+    )
+    grades = result.scalars().all()
+
+    students_with_grades = []
+    for grade in grades:
+        student = grade.student
+        students_with_grades.append({
+            "student_id": student.id,
+            "student_name": f"{student.first_name} {student.last_name} {student.last_name2 or ''}".strip(),
+            "score": grade.score,
+            "grade_id": grade.id,
+        })
+
+    return {
+        "subject_name": subject.name,
+        "students_with_grades": students_with_grades,
+    }
+
+#función para buscar el reporte de un estudiante por su nombre, apellido o email
+@router.get("/student-grades-search/{identifier}")
+async def get_student_grades_report_by_identifier(
+    identifier: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    matches = await crud_student_async.search_students(db, identifier, limit=1)
+    student = matches[0] if matches else None
+
+    if not student:
+        raise HTTPException(status_code=404, detail=f"Alumno no encontrado con el identificador: {identifier}")
+
+    report = await crud_grade_async.get_student_grade_list(db, student.id, subject_key="subject_name")
+
+    return {
+        "student_id": student.id,
+        "student_name": f"{student.first_name} {student.last_name} {student.last_name2 or ''}".strip(),
+        "total_average": report["total_average"],
+        "grades": report["grades"],
+    }
+
+
+add_sync_fallback(router, sync_reports.router)
@@ -0,0 +1,103 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db
+from app.schemas.student import StudentCreate, StudentResponse, StudentUpdate
+from app.crud import crud_student, crud_student_async
+from app.models.user import User
+from app.api import dependencies
+from app.api.routing import add_sync_fallback
+from app.api.v1 import students as sync_students
+
+# Versión asíncrona de app/api/v1/students.py (se monta con USE_ASYNC_DB=true)
+router = APIRouter()
+
+# --- RUTAS PROTEGIDAS ---
+
+@router.post("/", response_model=StudentResponse)
+async def create_student(
+    student: StudentCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    db_student = await crud_student_async.get_student_by_email(db, email=student.email)
+    if db_student:
+        raise HTTPException(status_code=400, detail="El email ya está registrado")
+    return await crud_student_async.create_student(db=db, student=student)
+
+@router.get("/", response_model=List[StudentResponse])
+async def read_students(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    if skip and not cursor:
+        return await crud_student_async.get_students(db, skip=skip, limit=limit)
+
+    try:
+        students, next_cursor = await crud_student_async.get_students_page(db, cursor=cursor, limit=limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return students
+
+@router.get("/search-my-students", response_model=List[StudentResponse])
+async def search_my_students(
+    q: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    """
+    Busca solo los alumnos inscritos en las materias que imparte el profesor actual.
+    """
+    return await crud_student_async.search_students(
+        db, q, limit=10, within=crud_student.teacher_student_ids_query(current_user.id)
+    )
+
+@router.put("/{student_id}", response_model=StudentResponse)
+async def update_student(
+    student_id: int,
+    student_update: StudentUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    updated_student = await crud_student_async.update_student(db, student_id, student_update)
+    if not updated_student:
+        raise HTTPException(status_code=404, detail="Alumno no encontrado")
+    return updated_student
+
+@router.delete("/{student_id}", response_model=StudentResponse)
+async def delete_student(
+    student_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    deleted_student = await crud_student_async.delete_student(db, student_id)
+    if not deleted_student:
+        raise HTTPException(status_code=404, detail="Alumno no encontrado")
+    return deleted_student
+
+
+@router.post("/{student_id}/enroll/{subject_id}", response_model=StudentResponse)
+async def enroll_student(
+    student_id: int,
+    subject_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    student = await crud_student_async.enroll_student_to_subject(db, student_id, subject_id)
+    if not student:
+        raise HTTPException(status_code=404, detail="Alumno o Materia no encontrados")
+    return student
+
+
+@router.get("/search", response_model=List[StudentResponse])
+async def search_students_suggestions(q: str, db: AsyncSession = Depends(get_async_db)):
+    return await crud_student_async.suggest_students(db, q, limit=10)
+
+
+add_sync_fallback(router, sync_students.router)
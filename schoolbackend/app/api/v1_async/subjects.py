@@ -0,0 +1,150 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db
+from app.schemas.subject import SubjectCreate, SubjectResponse, SubjectUpdate, SubjectStudentAssignment, SubjectRosterUpdateResponse
+from app.schemas.student import StudentResponse
+from app.crud import crud_subject_async, crud_user_async
+from app.models.user import User
+from app.api import dependencies
+from app.api.routing import add_sync_fallback
+from app.api.v1 import subjects as sync_subjects
+
+# Versión asíncrona de app/api/v1/subjects.py (se monta con USE_ASYNC_DB=true)
+router = APIRouter()
+
+
+async def _validate_teacher(db: AsyncSession, teacher_id: int):
+    teacher = await crud_user_async.get_user(db, user_id=teacher_id)
+    if not teacher:
+        raise HTTPException(status_code=404, detail="El ID del profesor no existe")
+    if teacher.role != "profesor":
+        raise HTTPException(
+            status_code=400,
+            detail=f"El usuario '{teacher.full_name}' es '{teacher.role}', no es profesor."
+        )
+
+
+# ---------------------------------------------------------
+# CREAR MATERIA
+# ---------------------------------------------------------
+@router.post("/", response_model=SubjectResponse)
+async def create_subject(
+    subject: SubjectCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    await _validate_teacher(db, subject.teacher_id)
+    return await crud_subject_async.create_subject(db=db, subject=subject)
+
+
+# ---------------------------------------------------------
+# OBTENER TODAS LAS MATERIAS
+# ---------------------------------------------------------
+@router.get("/", response_model=List[SubjectResponse])
+async def read_subjects(include_students: bool = False, db: AsyncSession = Depends(get_async_db)):
+    listing = await crud_subject_async.get_subject_listing(db, include_students=include_students)
+    return JSONResponse(content=listing)
+
+
+# ---------------------------------------------------------
+# OBTENER ESTUDIANTES DE UNA MATERIA
+# ---------------------------------------------------------
+@router.get("/{subject_id}/students", response_model=List[StudentResponse])
+async def read_subject_students(
+    subject_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    subject = await crud_subject_async.get_subject(db, subject_id=subject_id)
+
+    if not subject:
+        raise HTTPException(status_code=404, detail="Materia no encontrada")
+
+    if current_user.role == "profesor" and subject.teacher_id != current_user.id:
+        raise HTTPException(
+            status_code=403,
+            detail="No tienes permiso para ver los alumnos de esta materia."
+        )
+
+    return subject.students
+
+
+# ---------------------------------------------------------
+# OBTENER CARGA ACADÉMICA DEL PROFESOR
+# ---------------------------------------------------------
+@router.get("/teacher-load/", response_model=List[SubjectResponse])
+async def read_teacher_subjects(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async),
+    teacher_id: Optional[int] = None,
+    include_students: bool = False
+):
+    if current_user.role == "profesor":
+        filter_id = current_user.id
+    else:
+        filter_id = teacher_id
+
+    listing = await crud_subject_async.get_subject_listing(
+        db, teacher_id=filter_id, include_students=include_students
+    )
+    return JSONResponse(content=listing)
+
+
+# ---------------------------------------------------------
+# REEMPLAZAR LISTA COMPLETA DE ESTUDIANTES
+# ---------------------------------------------------------
+@router.put(
+    "/{subject_id}/students/",
+    response_model=SubjectRosterUpdateResponse,
+    status_code=status.HTTP_200_OK
+)
+async def update_subject_students(
+    subject_id: int,
+    assignment: SubjectStudentAssignment,
+    db: AsyncSession = Depends(get_async_db)
+):
+    if not await crud_subject_async.subject_exists(db, subject_id=subject_id):
+        raise HTTPException(status_code=404, detail="Materia no encontrada")
+
+    return await crud_subject_async.replace_subject_roster(db, subject_id, assignment.student_ids)
+
+
+# ---------------------------------------------------------
+# ELIMINAR UN ALUMNO DE UNA MATERIA
+# ---------------------------------------------------------
+@router.delete("/{subject_id}/students/{student_id}", response_model=SubjectResponse)
+async def remove_student(subject_id: int, student_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await crud_subject_async.remove_student_from_subject(db, subject_id, student_id)
+
+
+@router.put("/{subject_id}", response_model=SubjectResponse)
+async def update_subject(
+    subject_id: int,
+    subject_update: SubjectUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    update_data = subject_update.model_dump(exclude_unset=True)
+    if "teacher_id" in update_data:
+        await _validate_teacher(db, update_data["teacher_id"])
+
+    updated_subject = await crud_subject_async.update_subject(db, subject_id, subject_update)
+    if not updated_subject:
+        raise HTTPException(status_code=404, detail="Materia no encontrada")
+    return updated_subject
+
+@router.delete("/{subject_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_subject(
+    subject_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    deleted_subject = await crud_subject_async.delete_subject(db, subject_id)
+    if not deleted_subject:
+        raise HTTPException(status_code=404, detail="Materia no encontrada")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+add_sync_fallback(router, sync_subjects.router)
@@ -0,0 +1,78 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db
+from app.schemas.user import UserCreate, UserResponse, UserUpdate
+from app.crud import crud_user_async
+from app.api import dependencies
+from app.api.routing import add_sync_fallback
+from app.api.v1 import users as sync_users
+from app.models.user import User
+
+# Versión asíncrona de app/api/v1/users.py (se monta con USE_ASYNC_DB=true).
+# Los endpoints de perfil (subida de foto) siguen atendiéndose por el router síncrono.
+router = APIRouter()
+
+# Endpoint para REGISTRAR un nuevo usuario
+@router.post("/", response_model=UserResponse)
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = await crud_user_async.get_user_by_email(db, email=user.email)
+    if db_user:
+        raise HTTPException(status_code=400, detail="El email ya está registrado")
+
+    return await crud_user_async.create_user(db=db, user=user)
+
+
+@router.get("/me", response_model=UserResponse)
+async def read_users_me(current_user: User = Depends(dependencies.get_current_user_async)):
+    return current_user
+
+
+@router.get("/", response_model=List[UserResponse])
+async def read_users(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    role: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    if skip and not cursor:
+        return await crud_user_async.get_users(db, skip=skip, limit=limit, role=role)
+
+    try:
+        users, next_cursor = await crud_user_async.get_users_page(db, cursor=cursor, limit=limit, role=role)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return users
+
+
+@router.put("/{user_id:int}", response_model=UserResponse)
+async def update_user_route(
+    user_id: int,
+    user_update: UserUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    updated_user = await crud_user_async.update_user(db, user_id, user_update)
+    if not updated_user:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    return updated_user
+
+
+@router.delete("/{user_id:int}", response_model=UserResponse)
+async def delete_user_route(
+    user_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(dependencies.get_current_user_async)
+):
+    deleted_user = await crud_user_async.delete_user(db, user_id)
+    if not deleted_user:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    return deleted_user
+
+
+add_sync_fallback(router, sync_users.router)
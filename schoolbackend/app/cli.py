@@ -0,0 +1,159 @@
+"""
+Comandos de mantenimiento. Ejecutar desde schoolbackend/:
+
+    python -m app.cli init-db
+    python -m app.cli rebuild-aggregates
+    python -m app.cli import-students alumnos.csv [--batch-size 500]
+    python -m app.cli startup-benchmark [--runs 5]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+from app.db.session import SessionLocal
+from app.models import load_all
+
+
+def init_db(args) -> int:
+    """Crea/verifica las tablas, índices de búsqueda y agregados (antes lo hacía cada worker al arrancar)"""
+    from app.db.init_db import init_db as run_init_db
+    from app.db.session import get_engine
+
+    run_init_db(get_engine())
+    return 0
+
+
+def rebuild_aggregates(args) -> int:
+    """Recalcula grade_aggregates completa a partir de grades"""
+    from app.crud import crud_grade
+
+    load_all()
+    db = SessionLocal()
+    try:
+        total = crud_grade.rebuild_aggregates(db)
+    finally:
+        db.close()
+    print(f"✅ Agregados reconstruidos: {total} pares alumno/materia")
+    return 0
+
+
+def import_students(args) -> int:
+    """Crea alumnos e inscripciones desde un CSV (mismo formato que POST /students/import)"""
+    from app.core import config
+    from app.crud import crud_student_import
+
+    load_all()
+    batch_size = args.batch_size or config.IMPORT_BATCH_SIZE
+    db = SessionLocal()
+    try:
+        with open(args.path, encoding="utf-8-sig", newline="") as stream:
+            report = crud_student_import.import_students(
+                db, crud_student_import.read_csv(stream), batch_size=batch_size
+            )
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+
+    for error in report["error_rows"]:
+        print(f"  línea {error['line']} ({error['email'] or '-'}): {error['detail']}", file=sys.stderr)
+    print(
+        f"✅ {report['total']} filas en {report['elapsed_seconds']} s ({report['rows_per_second']} filas/s): "
+        f"{report['created']} creados, {report['existing']} ya existentes, "
+        f"{report['enrollments']} inscripciones, {report['errors']} errores"
+    )
+    return 0 if report["errors"] == 0 else 2
+
+
+# Se ejecuta en un proceso nuevo por corrida (importar en el mismo proceso mediría
+# módulos ya cargados). Mide la importación de app.main y la primera petición
+# GET / completa, con el arranque (lifespan) incluido, sin servidor ni red
+_STARTUP_PROBE = """
+import asyncio, json, time
+start = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+
+async def first_request():
+    lifespan_in, lifespan_out = asyncio.Queue(), asyncio.Queue()
+    lifespan = asyncio.create_task(app({"type": "lifespan", "asgi": {"version": "3.0"}}, lifespan_in.get, lifespan_out.put))
+    await lifespan_in.put({"type": "lifespan.startup"})
+    await lifespan_out.get()
+
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": "/", "raw_path": b"/", "root_path": "", "query_string": b"",
+             "headers": [(b"host", b"localhost")], "client": ("127.0.0.1", 0), "server": ("localhost", 80)}
+    await app(scope, receive, send)
+    await lifespan_in.put({"type": "lifespan.shutdown"})
+    await lifespan
+    return sent[0]["status"]
+
+
+status = asyncio.run(first_request())
+done = time.perf_counter()
+print(json.dumps({"import_ms": (imported - start) * 1000, "first_request_ms": (done - start) * 1000, "status": status}))
+"""
+
+
+def startup_benchmark(args) -> int:
+    """Mide cuánto tarda un worker nuevo: importar app.main y atender la primera petición"""
+    results = []
+    for run in range(args.runs):
+        command = [sys.executable, "-c", _STARTUP_PROBE]
+        if args.importtime and run == 0:
+            command[1:1] = ["-X", "importtime"]
+        output = subprocess.run(command, capture_output=True, text=True)
+        if output.returncode != 0:
+            print(output.stderr, file=sys.stderr)
+            return 1
+        results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+        if args.importtime and run == 0:
+            # Los 15 módulos que más tardan en importarse (tiempo acumulado, en µs)
+            rows = [line.split("|") for line in output.stderr.splitlines() if line.startswith("import time:")]
+            rows = [(int(r[1]), r[2].rstrip()) for r in rows if r[1].strip().isdigit()]
+            for cumulative, module in sorted(rows, reverse=True)[:15]:
+                print(f"  {cumulative / 1000:8.1f} ms {module}")
+
+    import_ms = statistics.median(r["import_ms"] for r in results)
+    first_ms = statistics.median(r["first_request_ms"] for r in results)
+    print(f"✅ {args.runs} arranques (mediana): importar app.main {import_ms:.0f} ms, "
+          f"primera respuesta {first_ms:.0f} ms (HTTP {results[-1]['status']})")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Mantenimiento de Mini-SICE")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("init-db", help=init_db.__doc__).set_defaults(func=init_db)
+
+    commands.add_parser("rebuild-aggregates", help=rebuild_aggregates.__doc__).set_defaults(func=rebuild_aggregates)
+
+    importer = commands.add_parser("import-students", help=import_students.__doc__)
+    importer.add_argument("path", help="Archivo CSV (UTF-8)")
+    importer.add_argument("--batch-size", type=int, default=None, help="Filas por transacción (IMPORT_BATCH_SIZE)")
+    importer.set_defaults(func=import_students)
+
+    benchmark = commands.add_parser("startup-benchmark", help=startup_benchmark.__doc__)
+    benchmark.add_argument("--runs", type=int, default=5, help="Arranques a medir (se informa la mediana)")
+    benchmark.add_argument("--importtime", action="store_true", help="Mostrar los módulos más lentos de importar")
+    benchmark.set_defaults(func=startup_benchmark)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
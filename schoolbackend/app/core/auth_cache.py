@@ -0,0 +1,61 @@
+import time
+from dataclasses import dataclass
+from typing import Optional
+from app.core import config
+from app.core.cache import TTLCache
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """
+    Copia inmutable del usuario autenticado. Se guarda esta copia (y no el
+    objeto ORM) porque el objeto ORM queda ligado a la sesión de la petición
+    que lo cargó y caduca con su commit.
+    """
+    id: int
+    email: str
+    full_name: Optional[str]
+    role: str
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user) -> "AuthenticatedUser":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            role=user.role,
+            is_active=user.is_active,
+        )
+
+
+# Usuarios verificados por token. El TTL acota cuánto tarda en propagarse un
+# cambio hecho desde otro worker; en este proceso crud_user invalida al momento
+_cache = TTLCache(config.AUTH_CACHE_TTL_SECONDS, config.AUTH_CACHE_MAX_SIZE)
+
+
+def get_user(token: str) -> Optional[AuthenticatedUser]:
+    return _cache.get(token)
+
+
+def set_user(token: str, user, expires_at: Optional[float] = None) -> AuthenticatedUser:
+    """Guarda el usuario del token; nunca más allá de la expiración del propio token"""
+    principal = AuthenticatedUser.from_user(user)
+    ttl = None
+    if expires_at is not None:
+        ttl = expires_at - time.time()
+    _cache.set(token, principal, ttl_seconds=ttl)
+    return principal
+
+
+def invalidate_user(user_id: int) -> int:
+    """Descarta todos los tokens cacheados del usuario (tras editarlo o borrarlo)"""
+    return _cache.delete_where(lambda principal: principal.id == user_id)
+
+
+def clear():
+    _cache.clear()
+
+
+def stats() -> dict:
+    return _cache.stats()
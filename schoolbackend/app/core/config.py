@@ -0,0 +1,120 @@
+import os
+from dotenv import load_dotenv
+
+# Carga las variables del archivo .env
+load_dotenv()
+
+
+def _get_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _get_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _get_float(name: str, default):
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _async_url_from(url: str):
+    """Deriva la URL asíncrona a partir de la URL síncrona (mismo servidor, driver async)"""
+    if not url:
+        return None
+    if url.startswith("mysql+pymysql://") or url.startswith("mysql://"):
+        return "mysql+aiomysql://" + url.split("://", 1)[1]
+    if url.startswith("postgresql+psycopg2://") or url.startswith("postgresql://"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url.split("://", 1)[1]
+    return url
+
+
+# --- BASE DE DATOS ------------------------------------------------------------
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+# Capa asíncrona (AsyncSession). Si USE_ASYNC_DB está activo, los routers de
+# app/api/v1_async reemplazan a los síncronos en main.py
+USE_ASYNC_DB = _get_bool("USE_ASYNC_DB")
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_url_from(DATABASE_URL)
+
+# Pool de conexiones (no aplica a SQLite). Dimensionar contra el número de
+# workers: cada proceso abre hasta DB_POOL_SIZE + DB_MAX_OVERFLOW conexiones
+DB_POOL_SIZE = _get_int("DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = _get_int("DB_MAX_OVERFLOW", 10)
+DB_POOL_TIMEOUT = _get_float("DB_POOL_TIMEOUT", 30.0)
+DB_POOL_RECYCLE = _get_int("DB_POOL_RECYCLE", 1800)  # segundos, menor al wait_timeout de MySQL
+DB_POOL_PRE_PING = _get_bool("DB_POOL_PRE_PING", True)
+# Si se define, se registra un warning cuando un checkout espera más de estos ms
+DB_POOL_WAIT_WARN_MS = _get_float("DB_POOL_WAIT_WARN_MS", None)
+
+# --- AUTENTICACIÓN -------------------------------------------------------------
+# Caché en memoria de usuarios ya verificados por token (0 la desactiva)
+AUTH_CACHE_TTL_SECONDS = _get_float("AUTH_CACHE_TTL_SECONDS", 30.0)
+AUTH_CACHE_MAX_SIZE = _get_int("AUTH_CACHE_MAX_SIZE", 1024)
+
+# Pool de hashing bcrypt: hilos dedicados y tamaño máximo de la cola de espera.
+# Con la cola llena (o tras HASH_POOL_TIMEOUT segundos) se responde 503
+HASH_POOL_WORKERS = _get_int("HASH_POOL_WORKERS", max(1, min(4, os.cpu_count() or 1)))
+HASH_POOL_MAX_QUEUE = _get_int("HASH_POOL_MAX_QUEUE", 32)
+HASH_POOL_TIMEOUT = _get_float("HASH_POOL_TIMEOUT", 10.0)
+
+# --- BÚSQUEDA DE ALUMNOS -------------------------------------------------------
+# Índice de prefijos en memoria para /students/search (ver app/core/student_index.py).
+# Se reconstruye desde la BD cada REFRESH segundos para recoger cambios de otros
+# workers (0 = solo en la primera búsqueda)
+STUDENT_PREFIX_INDEX = _get_bool("STUDENT_PREFIX_INDEX")
+STUDENT_PREFIX_INDEX_REFRESH_SECONDS = _get_float("STUDENT_PREFIX_INDEX_REFRESH_SECONDS", 300.0)
+
+# --- ARRANQUE ---------------------------------------------------------------------
+# Por defecto un worker arranca sin tocar la base de datos: el esquema se crea y
+# verifica con python -m app.cli init-db (en el despliegue, antes de levantar los
+# workers). Con INIT_DB_ON_STARTUP=true cada worker lo hace al arrancar, como antes
+# (cómodo en desarrollo con una sola instancia)
+INIT_DB_ON_STARTUP = _get_bool("INIT_DB_ON_STARTUP")
+
+# --- MIGRACIONES (python -m migrations) ------------------------------------------
+# Filas por lote de los backfills y pausa entre lotes para no competir con el
+# tráfico de la API cuando se migra en horario de clases
+MIGRATION_BATCH_SIZE = _get_int("MIGRATION_BATCH_SIZE", 2000)
+MIGRATION_BATCH_PAUSE_SECONDS = _get_float("MIGRATION_BATCH_PAUSE_SECONDS", 0.0)
+
+# --- MÉTRICAS POR PETICIÓN ------------------------------------------------------
+# Conteo de sentencias SQL y tiempos por endpoint (cabecera Server-Timing y GET /metrics)
+REQUEST_METRICS = _get_bool("REQUEST_METRICS", True)
+# GET /metrics exige "Authorization: Bearer <METRICS_TOKEN>"; sin token responde 404
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+# Si se define, se registra un warning por cada sentencia que tarde más de estos ms
+SLOW_QUERY_MS = _get_float("SLOW_QUERY_MS", None)
+
+# --- REPORTES ------------------------------------------------------------------
+# Caché de los contadores del dashboard (0 la desactiva). Con STATS_CACHE_URL
+# (redis://...) la caché se comparte entre workers
+STATS_CACHE_TTL_SECONDS = _get_float("STATS_CACHE_TTL_SECONDS", 60.0)
+STATS_CACHE_URL = os.getenv("STATS_CACHE_URL")
+
+# Calificación mínima aprobatoria para la tasa de aprobación de las estadísticas
+PASS_SCORE = _get_float("PASS_SCORE", 60.0)
+
+# --- EXPORTACIÓN E IMPORTACIÓN --------------------------------------------------
+# Filas que se leen de la BD por lote al exportar (cursor del servidor + yield_per):
+# la memoria del worker queda acotada por este valor, no por el tamaño de la tabla
+EXPORT_BATCH_SIZE = _get_int("EXPORT_BATCH_SIZE", 1000)
+
+# Filas por transacción en la importación masiva de alumnos (CSV)
+IMPORT_BATCH_SIZE = _get_int("IMPORT_BATCH_SIZE", 500)
+
+# --- FOTOS DE PERFIL ---------------------------------------------------------------
+# Variantes (WebP, cuadradas) que se generan al subir una foto y que sirve
+# GET /api/v1/users/{user_id}/photo?size=N. Se calculan en un pool de procesos
+# de PHOTO_POOL_WORKERS procesos, fuera de los workers de la API
+PHOTO_VARIANT_SIZES = tuple(
+    int(size) for size in os.getenv("PHOTO_VARIANT_SIZES", "64,256").split(",") if size.strip()
+)
+PHOTO_POOL_WORKERS = _get_int("PHOTO_POOL_WORKERS", 2)
+PHOTO_WEBP_QUALITY = _get_int("PHOTO_WEBP_QUALITY", 80)
@@ -0,0 +1,59 @@
+import csv
+import io
+import tempfile
+from typing import Iterable, Iterator, Sequence
+
+# Serializadores de exportación que producen el archivo por trozos (bytes) a
+# partir de un iterable de filas, para enviarlo con StreamingResponse.
+
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Filas acumuladas antes de entregar un trozo del CSV
+_CSV_ROWS_PER_CHUNK = 500
+_FILE_CHUNK_BYTES = 64 * 1024
+
+
+def csv_chunks(header: Sequence[str], rows: Iterable[Sequence]) -> Iterator[bytes]:
+    """
+    CSV en UTF-8 con BOM (Excel lo abre con los acentos correctos). Solo se
+    mantiene en memoria el trozo en curso.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(header)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= _CSV_ROWS_PER_CHUNK:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode("utf-8")
+
+
+def xlsx_chunks(header: Sequence[str], rows: Iterable[Sequence], title: str = "Datos") -> Iterator[bytes]:
+    """
+    Libro XLSX de una hoja. openpyxl en modo write_only escribe cada fila a un
+    archivo temporal en vez de guardarla en memoria; el .xlsx (un zip) solo se
+    puede cerrar al final, así que se envía al terminar leyéndolo por bloques.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=title)
+    sheet.append(list(header))
+    for row in rows:
+        sheet.append(list(row))
+
+    with tempfile.TemporaryFile() as tmp:
+        workbook.save(tmp)
+        tmp.seek(0)
+        while True:
+            chunk = tmp.read(_FILE_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+
+class HashingOverloadedError(Exception):
+    """La cola del pool de hashing está llena; el endpoint responde 503"""
+
+
+class BoundedHashPool:
+    """
+    Pool de hilos de tamaño fijo para bcrypt con cola acotada. bcrypt libera el
+    GIL mientras calcula, así que los hilos sí trabajan en paralelo; lo que se
+    limita es cuántos hashes corren a la vez (workers) y cuántos esperan
+    (max_queue). Si la cola está llena se rechaza de inmediato en lugar de
+    acumular peticiones que de todas formas vencerían por timeout.
+    """
+
+    def __init__(self, workers: int, max_queue: int, timeout: float = None):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.wait_total_ms = 0.0
+        self.latency_total_ms = 0.0
+        self.latency_max_ms = 0.0
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="bcrypt"
+                    )
+        return self._executor
+
+    def _reserve(self):
+        with self._lock:
+            if self._queued + self._running >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HashingOverloadedError("Demasiadas solicitudes de autenticación en curso")
+            self._queued += 1
+            self.submitted += 1
+
+    def _wrap(self, fn, args, submitted_at):
+        def task():
+            started_at = time.perf_counter()
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+            try:
+                return fn(*args)
+            finally:
+                finished_at = time.perf_counter()
+                latency_ms = (finished_at - submitted_at) * 1000
+                with self._lock:
+                    self._running -= 1
+                    self.completed += 1
+                    self.wait_total_ms += (started_at - submitted_at) * 1000
+                    self.latency_total_ms += latency_ms
+                    if latency_ms > self.latency_max_ms:
+                        self.latency_max_ms = latency_ms
+        return task
+
+    def submit(self, fn, *args):
+        self._reserve()
+        try:
+            future = self._get_executor().submit(self._wrap(fn, args, time.perf_counter()))
+        except Exception:
+            self._release_queued()
+            raise
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _release_queued(self):
+        with self._lock:
+            self._queued -= 1
+
+    def _on_done(self, future):
+        # Una tarea cancelada antes de empezar nunca pasa por task(): se libera aquí su lugar en la cola
+        if future.cancelled():
+            self._release_queued()
+
+    def run(self, fn, *args):
+        """Ejecuta fn en el pool y bloquea el hilo llamador hasta el resultado"""
+        future = self.submit(fn, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise HashingOverloadedError("Tiempo de espera agotado en el pool de hashing")
+
+    async def run_async(self, fn, *args):
+        """Igual que run() pero sin bloquear el event loop"""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "wait_avg_ms": round(self.wait_total_ms / self.completed, 3) if self.completed else 0.0,
+                "latency_avg_ms": round(self.latency_total_ms / self.completed, 3) if self.completed else 0.0,
+                "latency_max_ms": round(self.latency_max_ms, 3),
+            }
@@ -0,0 +1,47 @@
+import os
+import tempfile
+
+# Funciones que corren en el pool de procesos de app/core/profile_photos.py.
+# Los procesos se crean con spawn e importan solo este módulo, así que no debe
+# importar nada de la app (ni la BD ni FastAPI): el proceso arranca en lo que
+# tarda en cargar Pillow.
+
+
+def variant_name(stem: str, size: int) -> str:
+    return f"{stem}_{size}.webp"
+
+
+def render_variant(source: str, destination: str, size: int, quality: int) -> str:
+    """
+    Recorte cuadrado centrado de a lo más size px por lado, en WebP. Se escribe
+    en un temporal y se renombra: otro proceso nunca ve un archivo a medias y,
+    si dos generan la misma variante, gana cualquiera (el contenido es igual)
+    """
+    from PIL import Image, ImageOps
+
+    if os.path.exists(destination):
+        return destination
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+        # Sin agrandar fotos más chicas que la variante
+        side = min(size, *image.size)
+        image = ImageOps.fit(image, (side, side), Image.LANCZOS)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(destination), suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                image.save(out, "WEBP", quality=quality, method=4)
+            os.replace(temp_path, destination)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+    return destination
+
+
+def render_variants(source: str, directory: str, stem: str, sizes, quality: int) -> list:
+    """Todas las variantes de una foto en una sola tarea del pool"""
+    return [
+        render_variant(source, os.path.join(directory, variant_name(stem, size)), size, quality)
+        for size in sizes
+    ]
@@ -0,0 +1,198 @@
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from starlette.datastructures import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from app.core import config, photo_variants
+
+# Fotos de perfil de los profesores. La subida se copia a disco por trozos
+# (nunca entera en memoria) y el límite de tamaño se revisa en cada trozo; la
+# validación con Pillow y las escrituras corren en el threadpool para no
+# bloquear el event loop mientras llega o se revisa una imagen grande.
+#
+# Los nombres son el SHA-256 del contenido (la misma foto se guarda una vez) y
+# las variantes reducidas (WebP cuadradas, PHOTO_VARIANT_SIZES) se generan en un
+# pool de procesos después de responder. Si al pedir una variante todavía no
+# existe, se genera en ese momento y queda en disco para las siguientes.
+
+UPLOAD_ROOT = Path("app/uploads")  # montado en /uploads (main.py)
+UPLOAD_DIR = UPLOAD_ROOT / "profiles"
+VARIANT_DIR = UPLOAD_DIR / "variants"
+MAX_PHOTO_BYTES = 5 * 1024 * 1024  # 5MB
+CHUNK_SIZE = 64 * 1024
+VALID_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+
+
+class PhotoError(ValueError):
+    """Subida rechazada; el mensaje se devuelve tal cual en el 400"""
+
+
+def _open_temp_file():
+    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    # En el mismo directorio que el destino: store_photo solo renombra
+    return tempfile.NamedTemporaryFile(dir=UPLOAD_DIR, suffix=".part", delete=False)
+
+
+def discard(path: Path) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+async def save_upload(photo: UploadFile, max_bytes: int = MAX_PHOTO_BYTES) -> Tuple[Path, str]:
+    """Copia la subida a un archivo temporal por trozos; devuelve su ruta y el SHA-256"""
+    temp = await run_in_threadpool(_open_temp_file)
+    path = Path(temp.name)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while True:
+            chunk = await photo.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise PhotoError(f"La imagen no puede exceder {max_bytes // (1024 * 1024)}MB")
+            digest.update(chunk)
+            await run_in_threadpool(temp.write, chunk)
+        if size == 0:
+            raise PhotoError("El archivo está vacío")
+    except BaseException:
+        await run_in_threadpool(temp.close)
+        await run_in_threadpool(discard, path)
+        raise
+    await run_in_threadpool(temp.close)
+    return path, digest.hexdigest()
+
+
+def verify_image(path: Path) -> None:
+    """Comprueba con Pillow que el archivo es una imagen real (síncrono: va al threadpool)"""
+    from PIL import Image
+
+    try:
+        with Image.open(path) as image:
+            image.verify()
+    except Exception:
+        raise PhotoError("El archivo no es una imagen válida")
+
+
+def store_photo(temp_path: Path, original_filename: Optional[str], sha256: str) -> str:
+    """Renombra el temporal a su nombre por contenido y devuelve la URL pública"""
+    extension = Path(original_filename).suffix.lower() if original_filename else ".jpg"
+    # Asegurar que la extensión sea válida
+    if extension not in VALID_EXTENSIONS:
+        extension = ".jpg"
+    filename = f"{sha256[:32]}{extension}"
+    target = UPLOAD_DIR / filename
+    if target.exists():
+        discard(temp_path)  # misma foto ya guardada
+    else:
+        os.replace(temp_path, target)
+    return f"/uploads/profiles/{filename}"
+
+
+def photo_path(photo_url: Optional[str]) -> Optional[Path]:
+    """Archivo de una photo_url guardada en el perfil (None si no tiene)"""
+    if not photo_url:
+        return None
+    return UPLOAD_DIR / Path(photo_url).name
+
+
+def remove_photo(photo_url: Optional[str]) -> None:
+    """
+    Elimina la foto anterior y sus variantes; los errores se ignoran (la nueva
+    ya está guardada). Quien llama revisa antes que ningún otro perfil la use
+    """
+    path = photo_path(photo_url)
+    if path is None:
+        return
+    try:
+        discard(path)
+        for variant in VARIANT_DIR.glob(f"{path.stem}_*.webp"):
+            discard(variant)
+    except OSError:
+        pass
+
+
+# --- VARIANTES (pool de procesos) --------------------------------------------------
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# Variantes que se están generando: dos peticiones de la misma esperan el mismo trabajo
+_pending: Dict[Path, asyncio.Future] = {}
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn: los procesos no heredan hilos, conexiones ni sockets del worker
+                _pool = ProcessPoolExecutor(
+                    max_workers=config.PHOTO_POOL_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def _run_in_pool(func, *args):
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_get_pool(), func, *args)
+    except BrokenProcessPool:
+        # Un proceso murió (p. ej. por memoria): se descarta el pool y se reintenta una vez
+        shutdown_pool()
+        return await loop.run_in_executor(_get_pool(), func, *args)
+
+
+def variant_path(source: Path, size: int) -> Path:
+    return VARIANT_DIR / photo_variants.variant_name(source.stem, size)
+
+
+async def generate_variants(photo_url: str) -> None:
+    """Tarea de fondo tras la subida: todas las variantes configuradas"""
+    source = photo_path(photo_url)
+    if source is None:
+        return
+    await run_in_threadpool(VARIANT_DIR.mkdir, parents=True, exist_ok=True)
+    try:
+        await _run_in_pool(
+            photo_variants.render_variants,
+            str(source), str(VARIANT_DIR), source.stem, config.PHOTO_VARIANT_SIZES, config.PHOTO_WEBP_QUALITY,
+        )
+    except Exception as e:
+        # No es grave: ensure_variant la genera cuando se pida
+        print(f"⚠️  No se pudieron generar las variantes de {source.name}: {e}")
+
+
+async def ensure_variant(source: Path, size: int) -> Path:
+    """Ruta de la variante, generándola si todavía no está en disco"""
+    destination = variant_path(source, size)
+    if await run_in_threadpool(destination.exists):
+        return destination
+    future = _pending.get(destination)
+    if future is None:
+        await run_in_threadpool(VARIANT_DIR.mkdir, parents=True, exist_ok=True)
+        future = asyncio.ensure_future(_run_in_pool(
+            photo_variants.render_variant, str(source), str(destination), size, config.PHOTO_WEBP_QUALITY,
+        ))
+        _pending[destination] = future
+        future.add_done_callback(lambda _: _pending.pop(destination, None))
+    await asyncio.shield(future)
+    return destination
@@ -0,0 +1,153 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Tuple
+from app.db import query_metrics
+
+# Métricas por endpoint: peticiones, tiempo total, sentencias SQL y tiempo en BD.
+# El middleware agrega cada petición bajo la plantilla de la ruta (p. ej.
+# /api/v1/students/{student_id}) para que el número de series no crezca con
+# los ids. Se exponen en formato Prometheus en GET /metrics y, por petición,
+# en la cabecera Server-Timing.
+
+# Límites del histograma de sentencias por petición: un endpoint con N+1 se
+# reconoce por tener peticiones en los buckets altos
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class _RouteMetrics:
+    __slots__ = ("requests", "seconds", "statements", "db_seconds", "max_statements", "buckets")
+
+    def __init__(self):
+        self.requests = 0
+        self.seconds = 0.0
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.max_statements = 0
+        self.buckets = [0] * (len(STATEMENT_BUCKETS) + 1)  # el último es +Inf
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[Tuple[str, str, str], _RouteMetrics] = {}
+
+    def record(self, method: str, route: str, status: int, seconds: float, statements: int, db_seconds: float):
+        key = (method, route, str(status))
+        with self._lock:
+            metrics = self._routes.get(key)
+            if metrics is None:
+                metrics = self._routes[key] = _RouteMetrics()
+            metrics.requests += 1
+            metrics.seconds += seconds
+            metrics.statements += statements
+            metrics.db_seconds += db_seconds
+            metrics.max_statements = max(metrics.max_statements, statements)
+            metrics.buckets[bisect_left(STATEMENT_BUCKETS, statements)] += 1
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+    def render_prometheus(self) -> str:
+        """Formato de texto de Prometheus (version 0.0.4)"""
+        with self._lock:
+            items = sorted(self._routes.items())
+            snapshot = [(key, _copy(metrics)) for key, metrics in items]
+
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+
+        def labels(key, **extra):
+            method, route, status = key
+            pairs = {"method": method, "route": route, "status": status, **extra}
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs.items()) + "}"
+
+        family("sice_http_requests_total", "counter", "Peticiones atendidas",
+               [f"sice_http_requests_total{labels(k)} {m.requests}" for k, m in snapshot])
+        family("sice_http_request_duration_seconds_sum", "counter", "Tiempo total de respuesta",
+               [f"sice_http_request_duration_seconds_sum{labels(k)} {m.seconds:.6f}" for k, m in snapshot])
+        family("sice_db_statements_total", "counter", "Sentencias SQL ejecutadas",
+               [f"sice_db_statements_total{labels(k)} {m.statements}" for k, m in snapshot])
+        family("sice_db_duration_seconds_sum", "counter", "Tiempo total en la base de datos",
+               [f"sice_db_duration_seconds_sum{labels(k)} {m.db_seconds:.6f}" for k, m in snapshot])
+        family("sice_db_statements_per_request_max", "gauge", "Máximo de sentencias SQL en una petición",
+               [f"sice_db_statements_per_request_max{labels(k)} {m.max_statements}" for k, m in snapshot])
+
+        histogram = []
+        for key, metrics in snapshot:
+            cumulative = 0
+            for bound, count in zip(STATEMENT_BUCKETS + ("+Inf",), metrics.buckets):
+                cumulative += count
+                histogram.append(f"sice_db_statements_per_request_bucket{labels(key, le=str(bound))} {cumulative}")
+            histogram.append(f"sice_db_statements_per_request_sum{labels(key)} {metrics.statements}")
+            histogram.append(f"sice_db_statements_per_request_count{labels(key)} {metrics.requests}")
+        family("sice_db_statements_per_request", "histogram", "Sentencias SQL por petición", histogram)
+
+        return "\n".join(lines) + "\n"
+
+
+def _copy(metrics: _RouteMetrics) -> _RouteMetrics:
+    copy = _RouteMetrics()
+    for name in _RouteMetrics.__slots__:
+        value = getattr(metrics, name)
+        setattr(copy, name, list(value) if isinstance(value, list) else value)
+    return copy
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = RequestMetrics()
+
+
+class QueryMetricsMiddleware:
+    """
+    Middleware ASGI (no BaseHTTPMiddleware: así no interfiere con StreamingResponse
+    ni con la ContextVar). Agrega Server-Timing a la respuesta:
+        Server-Timing: db;dur=3.2;desc="4 SQL", app;dur=12.5
+    Con respuestas en streaming los valores son los del momento en que empieza
+    el envío; las métricas agregadas sí incluyen la petición completa.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = query_metrics.start_request(scope["path"])
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                timing = (
+                    f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.statements} SQL", '
+                    f"app;dur={elapsed_ms:.1f}"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            route = scope.get("route")
+            registry.record(
+                scope["method"],
+                getattr(route, "path", None) or "<sin ruta>",
+                status,
+                time.perf_counter() - start,
+                stats.statements,
+                stats.db_seconds,
+            )
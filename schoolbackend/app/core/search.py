@@ -0,0 +1,25 @@
+import re
+import unicodedata
+from typing import Optional
+
+# Normalización de texto para búsquedas: minúsculas, sin acentos y con los espacios
+# colapsados, de modo que "José  PEÑA" y "jose pena" se encuentren igual.
+
+SEARCH_TEXT_LENGTH = 400
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_text(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    folded = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _SPACES.sub(" ", folded.casefold()).strip()
+
+
+def student_search_text(first_name: Optional[str], last_name: Optional[str],
+                        last_name2: Optional[str], email: Optional[str]) -> str:
+    """Contenido de la columna students.search_text"""
+    parts = (first_name, last_name, last_name2, email)
+    return normalize_text(" ".join(p for p in parts if p))[:SEARCH_TEXT_LENGTH]
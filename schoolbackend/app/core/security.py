@@ -4,6 +4,8 @@ from jose import jwt
 from passlib.context import CryptContext
 import os
 from dotenv import load_dotenv
+from app.core import config
+from app.core.hashing_pool import BoundedHashPool
 
 load_dotenv()
 
@@ -14,13 +16,27 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 50
 # Configuración para encriptar passwords (usando bcrypt)--------------------------------------------------------------------------------------
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt tarda 100-300 ms por llamada: se ejecuta en un pool acotado para que un
+# pico de logins no acapare todos los hilos del servidor (ver hashing_pool.py)
+hash_pool = BoundedHashPool(
+    workers=config.HASH_POOL_WORKERS,
+    max_queue=config.HASH_POOL_MAX_QUEUE,
+    timeout=config.HASH_POOL_TIMEOUT,
+)
+
 #Función para verificar si la contraseña coincide con el hash
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return hash_pool.run(pwd_context.verify, plain_password, hashed_password)
+
+async def verify_password_async(plain_password, hashed_password):
+    return await hash_pool.run_async(pwd_context.verify, plain_password, hashed_password)
 
 #Función para ENCRIPTAR una contraseña (generar hash)---------------------------------------------------------------------------------
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return hash_pool.run(pwd_context.hash, password)
+
+async def get_password_hash_async(password):
+    return await hash_pool.run_async(pwd_context.hash, password)
 
 #Función para crear el Token JWT-----------------------------------------------------------------------------------------------------------------------------
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -0,0 +1,161 @@
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Optional
+from app.core import config
+from app.core.cache import TTLCache
+
+# Caché de los contadores del dashboard (/reports/stats*). Los crud de alumnos,
+# materias y usuarios invalidan el contador que afectan al crear o eliminar.
+#
+# El backend es intercambiable: por defecto vive en memoria del proceso (cada
+# worker invalida solo su copia y el TTL acota el desfase con los demás); con
+# STATS_CACHE_URL=redis://... se comparte entre workers y la invalidación es global.
+# Se crea en el primer uso: importar el módulo no conecta ni importa redis.
+
+STUDENTS = "students"
+SUBJECTS = "subjects"
+PROFESSORS = "professors"
+
+logger = logging.getLogger(__name__)
+
+
+class StatsBackend(ABC):
+    """Interfaz de almacenamiento de los contadores"""
+
+    @abstractmethod
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[int]]:
+        ...
+
+    @abstractmethod
+    def set_many(self, values: Dict[str, int], ttl_seconds: float) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, *keys: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    def stats(self) -> dict:
+        return {"backend": type(self).__name__}
+
+
+class LocalStatsBackend(StatsBackend):
+    """En memoria del proceso; también sirve de backend falso en pruebas"""
+
+    def __init__(self, ttl_seconds: float, max_size: int = 64):
+        self._cache = TTLCache(ttl_seconds, max_size)
+
+    def get_many(self, keys):
+        return {key: self._cache.get(key) for key in keys}
+
+    def set_many(self, values, ttl_seconds):
+        for key, value in values.items():
+            self._cache.set(key, value, ttl_seconds=ttl_seconds)
+
+    def delete(self, *keys):
+        for key in keys:
+            self._cache.delete(key)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        return {"backend": type(self).__name__, **self._cache.stats()}
+
+
+class RedisStatsBackend(StatsBackend):
+    """Compartido entre workers; requiere el paquete redis"""
+
+    def __init__(self, url: str, prefix: str = "sice:stats:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("STATS_CACHE_URL requiere el paquete 'redis' (pip install redis)")
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get_many(self, keys):
+        keys = list(keys)
+        raw = self._client.mget([self._prefix + key for key in keys])
+        return {key: int(value) if value is not None else None for key, value in zip(keys, raw)}
+
+    def set_many(self, values, ttl_seconds):
+        pipe = self._client.pipeline()
+        for key, value in values.items():
+            pipe.set(self._prefix + key, value, ex=max(1, int(ttl_seconds)))
+        pipe.execute()
+
+    def delete(self, *keys):
+        if keys:
+            self._client.delete(*[self._prefix + key for key in keys])
+
+    def clear(self):
+        self.delete(STUDENTS, SUBJECTS, PROFESSORS)
+
+
+def _default_backend() -> StatsBackend:
+    if config.STATS_CACHE_URL:
+        return RedisStatsBackend(config.STATS_CACHE_URL)
+    return LocalStatsBackend(config.STATS_CACHE_TTL_SECONDS)
+
+
+_backend: Optional[StatsBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> StatsBackend:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _default_backend()
+    return _backend
+
+
+def set_backend(backend: Optional[StatsBackend]) -> None:
+    """Reemplaza el backend (pruebas o configuración explícita); None vuelve al de la configuración"""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+# Un backend compartido caído no debe tumbar los endpoints: se registra y se
+# trata como fallo de caché (los contadores se calculan en la BD)
+
+def get_many(keys: Iterable[str]) -> Dict[str, Optional[int]]:
+    keys = list(keys)
+    if config.STATS_CACHE_TTL_SECONDS <= 0:
+        return {key: None for key in keys}
+    try:
+        return get_backend().get_many(keys)
+    except Exception as e:
+        logger.warning("Caché de estadísticas no disponible: %s", e)
+        return {key: None for key in keys}
+
+
+def set_many(values: Dict[str, int]) -> None:
+    if config.STATS_CACHE_TTL_SECONDS <= 0 or not values:
+        return
+    try:
+        get_backend().set_many(values, config.STATS_CACHE_TTL_SECONDS)
+    except Exception as e:
+        logger.warning("Caché de estadísticas no disponible: %s", e)
+
+
+def invalidate(*keys: str) -> None:
+    try:
+        get_backend().delete(*keys)
+    except Exception as e:
+        logger.warning("No se pudo invalidar la caché de estadísticas %s: %s", keys, e)
+
+
+def clear() -> None:
+    get_backend().clear()
+
+
+def stats() -> dict:
+    return get_backend().stats()
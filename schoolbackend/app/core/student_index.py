@@ -0,0 +1,385 @@
+import functools
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+
+from app.core import config
+from app.core.search import normalize_text
+from app.models.student import Student, student_subject_association
+from app.models.subject import Subject
+
+# Índice de prefijos en memoria para el autocompletado de /students/search.
+# Es un arreglo ordenado de (token, student_id): los tokens que empiezan con un
+# prefijo quedan contiguos y se encuentran con bisect, sin tocar la base de datos.
+#
+# Se construye en la primera búsqueda (STUDENT_PREFIX_INDEX=true) y crud_student/
+# crud_subject (y sus versiones async) lo actualizan al momento en este proceso.
+# Con varios workers los cambios hechos en otro proceso llegan con la
+# reconstrucción periódica (STUDENT_PREFIX_INDEX_REFRESH_SECONDS).
+#
+# La reconstrucción la hace una sola petición a la vez (refresh); las demás
+# siguen leyendo el índice anterior. Los cambios que llegan mientras se leen las
+# tablas se anotan y se vuelven a aplicar sobre el índice nuevo, para que no se
+# pierdan hasta la siguiente reconstrucción.
+
+_EMAIL_PARTS = re.compile(r"[@._+\-]+")
+
+
+class _Entry:
+    __slots__ = ("first_name", "last_name", "last_name2", "email", "subject_ids", "tokens")
+
+    def __init__(self, first_name, last_name, last_name2, email, subject_ids=()):
+        self.first_name = first_name
+        self.last_name = last_name
+        self.last_name2 = last_name2
+        self.email = email
+        self.subject_ids = set(subject_ids)
+        self.tokens = _tokens_for(first_name, last_name, last_name2, email)
+
+
+def _tokens_for(first_name, last_name, last_name2, email) -> Tuple[str, ...]:
+    tokens = set(normalize_text(" ".join(p for p in (first_name, last_name, last_name2) if p)).split())
+    if email:
+        email = email.lower()
+        tokens.add(email)
+        tokens.update(part for part in _EMAIL_PARTS.split(email) if part)
+    return tuple(sorted(tokens))
+
+
+# Tamaño de una llave (token, student_id) sin contar el token
+_KEY_BYTES = sys.getsizeof(("", 0))
+
+
+def _entry_bytes(entry: _Entry) -> int:
+    """Estimación (sys.getsizeof) de una entrada y de sus llaves en el arreglo ordenado"""
+    total = sys.getsizeof(entry) + sys.getsizeof(entry.subject_ids) + sys.getsizeof(entry.tokens)
+    for value in (entry.first_name, entry.last_name, entry.last_name2, entry.email):
+        total += sys.getsizeof(value)
+    for token in entry.tokens:
+        total += _KEY_BYTES + sys.getsizeof(token)
+    return total
+
+
+def _journaled(method):
+    """Actualización incremental: si hay una reconstrucción en curso, también se anota"""
+
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append((method, args))
+            method(self, *args)
+
+    return wrapper
+
+
+class StudentPrefixIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._keys: List[Tuple[str, int]] = []
+        self._entries: Dict[int, _Entry] = {}
+        self._subject_names: Dict[int, str] = {}
+        self.built_at: Optional[float] = None
+        self.hits = 0
+        # Bytes de entradas, llaves y nombres de materias: se calcula en load() y lo
+        # ajusta cada actualización, para que memory_bytes() no recorra el índice
+        self._content_bytes = 0
+        # Cambios recibidos durante una reconstrucción (None si no hay ninguna)
+        self._journal: Optional[list] = None
+
+    # --- construcción -------------------------------------------------------
+
+    def begin_load(self) -> None:
+        """Antes de leer las tablas: desde aquí las actualizaciones se anotan para load()"""
+        with self._lock:
+            self._journal = []
+
+    def abort_load(self) -> None:
+        with self._lock:
+            self._journal = None
+
+    def load(self, students: Iterable[tuple], subjects: Iterable[tuple], enrollments: Iterable[tuple]) -> None:
+        """
+        Reemplaza el contenido del índice.
+        students: (id, first_name, last_name, last_name2, email)
+        subjects: (id, name)      enrollments: (student_id, subject_id)
+        """
+        entries = {row[0]: _Entry(*row[1:]) for row in students}
+        for student_id, subject_id in enrollments:
+            entry = entries.get(student_id)
+            if entry is not None:
+                entry.subject_ids.add(subject_id)
+        keys = sorted((token, student_id) for student_id, entry in entries.items() for token in entry.tokens)
+        subject_names = dict(subjects)
+        content_bytes = sum(_entry_bytes(entry) for entry in entries.values())
+        content_bytes += sum(sys.getsizeof(name) for name in subject_names.values())
+        with self._lock:
+            self._entries = entries
+            self._keys = keys
+            self._subject_names = subject_names
+            self._content_bytes = content_bytes
+            self.built_at = time.monotonic()
+            journal, self._journal = self._journal or [], None
+            # Lo que ya estaba en la lectura se aplica de nuevo sin efecto; lo que llegó
+            # después de leer la tabla correspondiente es lo que se recupera
+            for method, args in journal:
+                method(self, *args)
+
+    def is_stale(self, max_age_seconds: float) -> bool:
+        if self.built_at is None:
+            return True
+        return max_age_seconds > 0 and time.monotonic() - self.built_at > max_age_seconds
+
+    # --- consultas ----------------------------------------------------------
+
+    def search(self, q: str, limit: int = 10) -> List[dict]:
+        """
+        Alumnos cuyo nombre/apellidos/email tienen palabras que empiezan con cada
+        término de q, con la forma de StudentResponse
+        """
+        terms = normalize_text(q).split()
+        if not terms or limit <= 0:
+            return []
+        lead = max(terms, key=len)
+        rest = [term for term in terms if term != lead]
+
+        results = []
+        seen: Set[int] = set()
+        with self._lock:
+            keys = self._keys
+            i = bisect_left(keys, (lead,))
+            while i < len(keys) and keys[i][0].startswith(lead) and len(results) < limit:
+                student_id = keys[i][1]
+                i += 1
+                if student_id in seen:
+                    continue
+                seen.add(student_id)
+                entry = self._entries[student_id]
+                if all(any(token.startswith(term) for token in entry.tokens) for term in rest):
+                    results.append(self._as_response(student_id, entry))
+            self.hits += 1
+        return results
+
+    def _as_response(self, student_id: int, entry: _Entry) -> dict:
+        return {
+            "id": student_id,
+            "first_name": entry.first_name,
+            "last_name": entry.last_name,
+            "last_name2": entry.last_name2,
+            "email": entry.email,
+            "subjects": [
+                {"id": subject_id, "name": self._subject_names[subject_id]}
+                for subject_id in sorted(entry.subject_ids)
+                if subject_id in self._subject_names
+            ],
+        }
+
+    # --- actualizaciones incrementales --------------------------------------
+
+    @_journaled
+    def upsert_student(self, student_id: int, first_name, last_name, last_name2, email) -> None:
+        with self._lock:
+            previous = self._entries.get(student_id)
+            subject_ids = previous.subject_ids if previous is not None else ()
+            if previous is not None:
+                self._drop_keys(student_id, previous.tokens)
+                self._content_bytes -= _entry_bytes(previous)
+            entry = _Entry(first_name, last_name, last_name2, email, subject_ids)
+            self._entries[student_id] = entry
+            self._content_bytes += _entry_bytes(entry)
+            for token in entry.tokens:
+                insort(self._keys, (token, student_id))
+
+    @_journaled
+    def remove_student(self, student_id: int) -> None:
+        with self._lock:
+            entry = self._entries.pop(student_id, None)
+            if entry is not None:
+                self._drop_keys(student_id, entry.tokens)
+                self._content_bytes -= _entry_bytes(entry)
+
+    def _drop_keys(self, student_id: int, tokens: Iterable[str]) -> None:
+        for token in tokens:
+            i = bisect_left(self._keys, (token, student_id))
+            if i < len(self._keys) and self._keys[i] == (token, student_id):
+                del self._keys[i]
+
+    @_journaled
+    def set_enrollment(self, student_id: int, subject_id: int, enrolled: bool) -> None:
+        with self._lock:
+            entry = self._entries.get(student_id)
+            if entry is None:
+                return
+            before = sys.getsizeof(entry.subject_ids)
+            if enrolled:
+                entry.subject_ids.add(subject_id)
+            else:
+                entry.subject_ids.discard(subject_id)
+            self._content_bytes += sys.getsizeof(entry.subject_ids) - before
+
+    @_journaled
+    def set_subject(self, subject_id: int, name: str) -> None:
+        with self._lock:
+            previous = self._subject_names.get(subject_id)
+            if previous is not None:
+                self._content_bytes -= sys.getsizeof(previous)
+            self._subject_names[subject_id] = name
+            self._content_bytes += sys.getsizeof(name)
+
+    @_journaled
+    def remove_subject(self, subject_id: int) -> None:
+        with self._lock:
+            name = self._subject_names.pop(subject_id, None)
+            if name is not None:
+                self._content_bytes -= sys.getsizeof(name)
+            for entry in self._entries.values():
+                if subject_id in entry.subject_ids:
+                    before = sys.getsizeof(entry.subject_ids)
+                    entry.subject_ids.discard(subject_id)
+                    self._content_bytes += sys.getsizeof(entry.subject_ids) - before
+
+    # --- métricas -----------------------------------------------------------
+
+    def memory_bytes(self) -> int:
+        """Estimación (sys.getsizeof) de lo que ocupan las estructuras del índice, sin recorrerlas"""
+        with self._lock:
+            return (
+                sys.getsizeof(self._keys) + sys.getsizeof(self._entries) + sys.getsizeof(self._subject_names)
+                + self._content_bytes
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            age = None if self.built_at is None else round(time.monotonic() - self.built_at, 1)
+            return {
+                "enabled": config.STUDENT_PREFIX_INDEX,
+                "students": len(self._entries),
+                "keys": len(self._keys),
+                "subjects": len(self._subject_names),
+                "searches": self.hits,
+                "age_seconds": age,
+                "memory_bytes": self.memory_bytes(),
+            }
+
+
+index = StudentPrefixIndex()
+
+
+def enabled() -> bool:
+    return config.STUDENT_PREFIX_INDEX
+
+
+_refresh_lock = threading.Lock()
+
+
+def load_queries() -> tuple:
+    """Los tres SELECT de columnas que alimentan load(): alumnos, materias e inscripciones"""
+    return (
+        select(Student.id, Student.first_name, Student.last_name, Student.last_name2, Student.email),
+        select(Subject.id, Subject.name),
+        select(student_subject_association.c.student_id, student_subject_association.c.subject_id),
+    )
+
+
+def build(db) -> None:
+    """Carga el índice desde la base de datos (Session síncrona)"""
+    index.begin_load()
+    try:
+        rows = [db.execute(query).all() for query in load_queries()]
+    except BaseException:
+        index.abort_load()
+        raise
+    index.load(*rows)
+
+
+async def build_async(db) -> None:
+    """
+    Como build() para AsyncSession. Las lecturas van con await y load() (tokens y
+    el sorted de todas las llaves) corre en el threadpool: con run_sync correría
+    en el hilo del event loop y detendría todas las peticiones del worker
+    """
+    index.begin_load()
+    try:
+        rows = [(await db.execute(query)).all() for query in load_queries()]
+    except BaseException:
+        index.abort_load()
+        raise
+    await run_in_threadpool(index.load, *rows)
+
+
+def refresh(db) -> bool:
+    """
+    Reconstruye el índice si está vencido y ninguna otra petición lo está
+    haciendo. Devuelve False sin esperar si ya hay una reconstrucción en curso
+    """
+    if not _refresh_lock.acquire(blocking=False):
+        return False
+    try:
+        # Otra petición pudo terminar la reconstrucción justo antes
+        if needs_refresh():
+            build(db)
+    finally:
+        _refresh_lock.release()
+    return True
+
+
+async def refresh_async(db) -> bool:
+    """refresh() para AsyncSession (ver build_async)"""
+    if not _refresh_lock.acquire(blocking=False):
+        return False
+    try:
+        if needs_refresh():
+            await build_async(db)
+    finally:
+        _refresh_lock.release()
+    return True
+
+
+def is_built() -> bool:
+    return index.built_at is not None
+
+
+def needs_refresh() -> bool:
+    """Sin construir todavía o más viejo que STUDENT_PREFIX_INDEX_REFRESH_SECONDS"""
+    return index.is_stale(config.STUDENT_PREFIX_INDEX_REFRESH_SECONDS)
+
+
+def search(q: str, limit: int = 10) -> List[dict]:
+    return index.search(q, limit=limit)
+
+
+# --- Ganchos para crud_student / crud_subject (no hacen nada si está desactivado) ---
+
+def student_saved(student) -> None:
+    if enabled():
+        index.upsert_student(student.id, student.first_name, student.last_name, student.last_name2, student.email)
+
+
+def student_deleted(student_id: int) -> None:
+    if enabled():
+        index.remove_student(student_id)
+
+
+def enrollment_changed(student_id: int, subject_id: int, enrolled: bool) -> None:
+    if enabled():
+        index.set_enrollment(student_id, subject_id, enrolled)
+
+
+def subject_saved(subject) -> None:
+    if enabled():
+        index.set_subject(subject.id, subject.name)
+
+
+def subject_deleted(subject_id: int) -> None:
+    if enabled():
+        index.remove_subject(subject_id)
+
+
+def stats() -> dict:
+    return index.stats()
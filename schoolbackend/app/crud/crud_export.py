@@ -0,0 +1,63 @@
+from typing import Iterator, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.models.grade import Grade
+from app.models.student import Student, student_subject_association
+from app.models.subject import Subject
+from app.models.user import User
+
+# Consultas de exportación: solo columnas (nunca objetos ORM) y en orden estable,
+# para leerlas por lotes con un cursor del servidor sin cargar la tabla completa.
+
+GRADE_COLUMNS = (
+    "grade_id", "student_id", "first_name", "last_name", "last_name2", "email",
+    "subject_id", "subject_name", "score",
+)
+
+ENROLLMENT_COLUMNS = (
+    "subject_id", "subject_name", "teacher_name",
+    "student_id", "first_name", "last_name", "last_name2", "email",
+)
+
+
+def grades_export_query(subject_id: Optional[int] = None):
+    query = (
+        select(
+            Grade.id, Student.id, Student.first_name, Student.last_name, Student.last_name2, Student.email,
+            Subject.id, Subject.name, Grade.score,
+        )
+        .join(Student, Student.id == Grade.student_id)
+        .join(Subject, Subject.id == Grade.subject_id)
+    )
+    if subject_id is not None:
+        query = query.where(Grade.subject_id == subject_id)
+    return query.order_by(Grade.id)
+
+
+def enrollments_export_query(subject_id: Optional[int] = None):
+    link = student_subject_association
+    query = (
+        select(
+            Subject.id, Subject.name, User.full_name,
+            Student.id, Student.first_name, Student.last_name, Student.last_name2, Student.email,
+        )
+        .select_from(link)
+        .join(Subject, Subject.id == link.c.subject_id)
+        .join(Student, Student.id == link.c.student_id)
+        .outerjoin(User, User.id == Subject.teacher_id)
+    )
+    if subject_id is not None:
+        query = query.where(link.c.subject_id == subject_id)
+    return query.order_by(Subject.id, Student.id)
+
+
+def stream_rows(db: Session, query, batch_size: int) -> Iterator[tuple]:
+    """
+    Recorre el resultado por lotes de batch_size filas. yield_per activa
+    stream_results (SSCursor en MySQL, cursor con nombre en PostgreSQL), así que
+    el driver tampoco trae todo el resultado a memoria.
+    """
+    result = db.execute(query.execution_options(yield_per=batch_size))
+    for partition in result.partitions():
+        for row in partition:
+            yield tuple(row)
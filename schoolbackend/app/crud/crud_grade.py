@@ -1,6 +1,14 @@
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import delete, func, select, insert, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
 from sqlalchemy.orm import Session
 from app.models.grade import Grade
-from app.schemas.grade import GradeCreate, GradeUpdate
+from app.models.grade_aggregate import GradeAggregate
+from app.models.student import Student
+from app.models.subject import Subject
+from app.schemas.grade import GradeCreate, GradeUpdate, GradeBulkItem
+from app.crud.pagination import apply_keyset, split_page
+from app.crud.student_search import dialect_of
 
 def create_grade(db: Session, grade: GradeCreate):
     db_grade = Grade(
@@ -9,6 +17,8 @@ def create_grade(db: Session, grade: GradeCreate):
         score=grade.score
     )
     db.add(db_grade)
+    db.flush()
+    add_to_aggregates(db, [(grade.student_id, grade.subject_id, grade.score)])
     db.commit()
     db.refresh(db_grade)
     return db_grade
@@ -17,7 +27,11 @@ def get_grades_by_student(db: Session, student_id: int):
     return db.query(Grade).filter(Grade.student_id == student_id).all()
 
 def get_all_grades(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Grade).offset(skip).limit(limit).all()
+    return db.query(Grade).order_by(Grade.id).offset(skip).limit(limit).all()
+
+# Listado por cursor: devuelve (calificaciones, next_cursor)
+def get_grades_page(db: Session, cursor: Optional[str] = None, limit: int = 100):
+    return split_page(apply_keyset(db.query(Grade), Grade.id, cursor, limit).all(), limit)
 
 def get_grades_by_subject(db: Session, subject_id: int):
     return db.query(Grade).filter(Grade.subject_id == subject_id).all()
@@ -30,6 +44,394 @@ def update_grade(db: Session, grade_id: int, grade_update: GradeUpdate):
     
     db_grade.score = grade_update.score
     db.add(db_grade)
+    db.flush()
+    refresh_aggregates(db, db_grade.subject_id, [db_grade.student_id])
     db.commit()
     db.refresh(db_grade)
-    return db_grade
\ No newline at end of file
+    return db_grade
+
+
+# ---------------------------------------------------------
+# CARGA MASIVA DE CALIFICACIONES DE UNA MATERIA
+# ---------------------------------------------------------
+def _latest_grade_ids(db: Session, subject_id: int, student_ids) -> dict:
+    """student_id -> id de su calificación más reciente en la materia"""
+    if not student_ids:
+        return {}
+    rows = (
+        db.query(Grade.student_id, func.max(Grade.id))
+        .filter(Grade.subject_id == subject_id, Grade.student_id.in_(student_ids))
+        .group_by(Grade.student_id)
+        .all()
+    )
+    return {student_id: grade_id for student_id, grade_id in rows}
+
+
+def bulk_upsert_grades(db: Session, subject_id: int, items: List[GradeBulkItem]) -> List[dict]:
+    """
+    Registra las calificaciones de muchos alumnos en una materia dentro de una
+    sola transacción. Si el alumno ya tiene calificación en la materia se
+    actualiza la más reciente; si no, se inserta. Las validaciones son consultas
+    por conjunto (IN) y las escrituras van en un INSERT y un UPDATE masivos.
+    Devuelve un resultado por fila, en el mismo orden recibido.
+    """
+    requested_ids = {item.student_id for item in items}
+    existing_students = {
+        student_id for (student_id,) in
+        db.query(Student.id).filter(Student.id.in_(requested_ids)).all()
+    } if requested_ids else set()
+    current_grades = _latest_grade_ids(db, subject_id, existing_students)
+
+    results = []
+    to_insert = []
+    to_update = []
+    seen = set()
+    for item in items:
+        if item.student_id not in existing_students:
+            results.append({"student_id": item.student_id, "status": "error", "detail": "El alumno no existe"})
+        elif item.student_id in seen:
+            results.append({"student_id": item.student_id, "status": "error", "detail": "Alumno repetido en la carga"})
+        elif item.student_id in current_grades:
+            grade_id = current_grades[item.student_id]
+            to_update.append({"id": grade_id, "score": item.score})
+            results.append({"student_id": item.student_id, "status": "updated", "grade_id": grade_id})
+        else:
+            to_insert.append({"student_id": item.student_id, "subject_id": subject_id, "score": item.score})
+            results.append({"student_id": item.student_id, "status": "created"})
+        seen.add(item.student_id)
+
+    try:
+        if to_insert:
+            db.execute(insert(Grade), to_insert)
+            add_to_aggregates(db, [(row["student_id"], subject_id, row["score"]) for row in to_insert])
+        if to_update:
+            db.execute(update(Grade), to_update)
+            refresh_aggregates(db, subject_id, [
+                result["student_id"] for result in results if result["status"] == "updated"
+            ])
+        # ids de las filas recién insertadas (executemany no los devuelve en MySQL)
+        created_ids = _latest_grade_ids(db, subject_id, [row["student_id"] for row in to_insert])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    for result in results:
+        if result["status"] == "created":
+            result["grade_id"] = created_ids.get(result["student_id"])
+    return results
+
+
+# ---------------------------------------------------------
+# AGREGADOS MATERIALIZADOS POR (ALUMNO, MATERIA)
+# ---------------------------------------------------------
+# grade_aggregates guarda count/sum/min/max de cada par y se actualiza antes del
+# commit, así que el agregado y las calificaciones se confirman (o se revierten)
+# juntos. Las escrituras van como upsert (ON CONFLICT / ON DUPLICATE KEY): dos
+# altas simultáneas del primer par no chocan con la llave primaria, la segunda
+# espera a la fila de la primera y la actualiza.
+#   - Alta de calificaciones: se suma el delta (count, sum, min, max) a la fila.
+#   - Edición: se bloquea la fila del par (FOR UPDATE) y se recalcula desde grades;
+#     min/max no se pueden ajustar con un delta cuando cambia el extremo.
+# Los pares se escriben ordenados para que dos lotes no se bloqueen en cruz.
+
+_AGGREGATE_COLUMNS = ["student_id", "subject_id", "count", "sum", "min_score", "max_score"]
+
+
+def _grouped_grades():
+    return (
+        select(
+            Grade.student_id,
+            Grade.subject_id,
+            func.count(Grade.id),
+            func.sum(Grade.score),
+            func.min(Grade.score),
+            func.max(Grade.score),
+        )
+        .where(Grade.student_id.isnot(None), Grade.subject_id.isnot(None))
+        .group_by(Grade.student_id, Grade.subject_id)
+    )
+
+
+def _upsert(dialect: str, stmt_for, set_for):
+    """
+    INSERT del motor con resolución de la llave duplicada. stmt_for(insert) arma
+    la inserción (VALUES o SELECT); set_for(table, new) devuelve las columnas a
+    actualizar, donde new son los valores que se intentaron insertar
+    """
+    table = GradeAggregate.__table__
+    if dialect == "mysql":
+        stmt = stmt_for(mysql.insert(table))
+        return stmt.on_duplicate_key_update(set_for(table, stmt.inserted))
+    stmt = stmt_for((postgresql.insert if dialect == "postgresql" else sqlite.insert)(table))
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.student_id, table.c.subject_id], set_=set_for(table, stmt.excluded)
+    )
+
+
+def aggregate_add_statement(dialect: str, grades: Iterable[Tuple[int, int, float]]):
+    """Upsert que suma calificaciones nuevas (student_id, subject_id, score) a sus pares"""
+    deltas = {}
+    for student_id, subject_id, score in grades:
+        count, total, low, high = deltas.get((student_id, subject_id), (0, 0.0, score, score))
+        deltas[(student_id, subject_id)] = (count + 1, total + score, min(low, score), max(high, score))
+    rows = [
+        dict(zip(_AGGREGATE_COLUMNS, (student_id, subject_id, *delta)))
+        for (student_id, subject_id), delta in sorted(deltas.items())
+    ]
+    # min(a, b) de dos argumentos en SQLite; LEAST/GREATEST en MySQL y PostgreSQL
+    least, greatest = (func.min, func.max) if dialect == "sqlite" else (func.least, func.greatest)
+    return _upsert(dialect, lambda stmt: stmt.values(rows), lambda table, new: {
+        "count": table.c.count + new["count"],
+        "sum": table.c.sum + new["sum"],
+        "min_score": least(table.c.min_score, new["min_score"]),
+        "max_score": greatest(table.c.max_score, new["max_score"]),
+    })
+
+
+def aggregate_refresh_statements(dialect: str, subject_id: int, student_ids: Iterable[int]) -> list:
+    """SELECT ... FOR UPDATE de los pares y upsert que los recalcula desde grades"""
+    student_ids = sorted(set(student_ids))
+    pairs = (GradeAggregate.subject_id == subject_id, GradeAggregate.student_id.in_(student_ids))
+    return [
+        select(GradeAggregate.student_id).where(*pairs).order_by(GradeAggregate.student_id).with_for_update(),
+        _upsert(
+            dialect,
+            lambda stmt: stmt.from_select(
+                _AGGREGATE_COLUMNS,
+                _grouped_grades().where(Grade.subject_id == subject_id, Grade.student_id.in_(student_ids)),
+            ),
+            lambda table, new: {column: new[column] for column in ("count", "sum", "min_score", "max_score")},
+        ),
+    ]
+
+
+def add_to_aggregates(db: Session, grades: Iterable[Tuple[int, int, float]]) -> None:
+    """Suma calificaciones recién insertadas dentro de la transacción en curso (no hace commit)"""
+    grades = list(grades)
+    if grades:
+        db.execute(aggregate_add_statement(dialect_of(db), grades))
+
+
+def refresh_aggregates(db: Session, subject_id: int, student_ids: Iterable[int]) -> None:
+    """Recalcula los pares indicados dentro de la transacción en curso (no hace commit)"""
+    student_ids = list(student_ids)
+    if not student_ids:
+        return
+    for stmt in aggregate_refresh_statements(dialect_of(db), subject_id, student_ids):
+        db.execute(stmt)
+
+
+def rebuild_aggregates(db: Session) -> int:
+    """Reconstruye toda la tabla desde grades; devuelve cuántos pares quedaron"""
+    table = GradeAggregate.__table__
+    try:
+        db.execute(delete(table))
+        db.execute(insert(table).from_select(_AGGREGATE_COLUMNS, _grouped_grades()))
+        total = db.scalar(select(func.count()).select_from(table))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return total
+
+
+def subject_ranking_query(subject_id: int, limit: int = 100):
+    """Alumnos de la materia ordenados por promedio, leyendo solo grade_aggregates"""
+    average = (GradeAggregate.sum / GradeAggregate.count).label("average")
+    return (
+        select(
+            GradeAggregate.student_id,
+            Student.first_name,
+            Student.last_name,
+            Student.last_name2,
+            average,
+            GradeAggregate.count,
+        )
+        .join(Student, Student.id == GradeAggregate.student_id)
+        .where(GradeAggregate.subject_id == subject_id, GradeAggregate.count > 0)
+        .order_by(average.desc(), GradeAggregate.student_id)
+        .limit(limit)
+    )
+
+
+def build_ranking(rows) -> List[dict]:
+    """Posición con empates compartidos (1, 2, 2, 4...)"""
+    ranking = []
+    previous = None
+    for position, row in enumerate(rows, start=1):
+        average = round(float(row.average), 2)
+        rank = ranking[-1]["rank"] if previous == average else position
+        previous = average
+        ranking.append({
+            "rank": rank,
+            "student_id": row.student_id,
+            "student_name": f"{row.first_name} {row.last_name} {row.last_name2 or ''}".strip(),
+            "average": average,
+            "count": row.count,
+        })
+    return ranking
+
+
+def get_subject_ranking(db: Session, subject_id: int, limit: int = 100) -> List[dict]:
+    return build_ranking(db.execute(subject_ranking_query(subject_id, limit)))
+
+
+# ---------------------------------------------------------
+# ESTADÍSTICAS POR MATERIA (NumPy)
+# ---------------------------------------------------------
+# Se leen solo las columnas necesarias y el cálculo se hace en app/core/grade_stats.py.
+# grade_stats (NumPy) se importa al primer uso para no alargar el arranque del worker
+
+def subject_scores_query(subject_id: int):
+    return select(Grade.score).where(Grade.subject_id == subject_id)
+
+
+def all_scores_query():
+    return select(Grade.subject_id, Grade.score).where(Grade.subject_id.isnot(None))
+
+
+def build_term_stats(subjects, score_rows, pass_score: float) -> List[dict]:
+    """subjects: filas (id, name); score_rows: filas (subject_id, score)"""
+    from app.core import grade_stats
+
+    scores = [row[1] for row in score_rows]
+    subject_ids = [row[0] for row in score_rows]
+    by_subject = grade_stats.describe_by_group(
+        subject_ids, scores, pass_score, groups=[subject_id for subject_id, _ in subjects]
+    )
+    return [
+        {"subject_id": subject_id, "subject_name": name, **by_subject[subject_id]}
+        for subject_id, name in subjects
+    ]
+
+
+def describe_subject_scores(scores, pass_score: float) -> dict:
+    from app.core import grade_stats
+
+    return grade_stats.describe_scores(grade_stats.to_array(scores), pass_score)
+
+
+def get_subject_stats(db: Session, subject_id: int, pass_score: float) -> dict:
+    scores = db.execute(subject_scores_query(subject_id)).scalars().all()
+    return describe_subject_scores(scores, pass_score)
+
+
+def get_term_stats(db: Session, pass_score: float) -> List[dict]:
+    subjects = db.execute(select(Subject.id, Subject.name).order_by(Subject.id)).all()
+    score_rows = db.execute(all_scores_query()).all()
+    return build_term_stats(subjects, score_rows, pass_score)
+
+
+# ---------------------------------------------------------
+# RESUMEN DE CALIFICACIONES DE UN ALUMNO (una sola consulta)
+# ---------------------------------------------------------
+def student_grade_summary_query(student_id: int):
+    """
+    Devuelve cada calificación del alumno junto con el promedio/conteo de su
+    materia y el promedio general, leídos de grade_aggregates (una fila por
+    materia en lugar de recorrer todas las calificaciones), en un solo viaje.
+    """
+    per_subject = (
+        select(
+            GradeAggregate.subject_id.label("subject_id"),
+            (GradeAggregate.sum / GradeAggregate.count).label("average"),
+            GradeAggregate.count.label("count"),
+            GradeAggregate.min_score.label("min_score"),
+            GradeAggregate.max_score.label("max_score"),
+        )
+        .where(GradeAggregate.student_id == student_id)
+        .subquery()
+    )
+    total_average = (
+        select(func.sum(GradeAggregate.sum) / func.sum(GradeAggregate.count))
+        .where(GradeAggregate.student_id == student_id)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            Grade.id,
+            Grade.subject_id,
+            Grade.score,
+            Subject.name.label("subject_name"),
+            per_subject.c.average,
+            per_subject.c.count,
+            per_subject.c.min_score,
+            per_subject.c.max_score,
+            total_average.label("total_average"),
+        )
+        .outerjoin(Subject, Subject.id == Grade.subject_id)
+        .outerjoin(per_subject, per_subject.c.subject_id == Grade.subject_id)
+        .where(Grade.student_id == student_id)
+        .order_by(Grade.id)
+    )
+
+
+def _round_average(value) -> float:
+    # None si el alumno no tiene filas en grade_aggregates (BD sin backfill o subject_id NULL)
+    return round(float(value), 2) if value is not None else 0
+
+
+def build_grade_summary(rows) -> dict:
+    """Arma grades / subject_averages / total_average a partir de las filas de student_grade_summary_query"""
+    grades_data = []
+    subject_averages = {}
+    total_average = 0
+    for row in rows:
+        grades_data.append({
+            "id": row.id,
+            "subject_id": row.subject_id,
+            "score": row.score
+        })
+        if row.subject_id not in subject_averages:
+            subject_averages[row.subject_id] = {
+                "subject_id": row.subject_id,
+                "subject_name": row.subject_name,
+                "average": _round_average(row.average),
+                "count": row.count or 0,
+                "min_score": row.min_score,
+                "max_score": row.max_score,
+            }
+        total_average = _round_average(row.total_average)
+
+    return {
+        "grades": grades_data,
+        "subject_averages": list(subject_averages.values()),
+        "total_average": total_average,
+    }
+
+
+def get_student_grade_summary(db: Session, student_id: int) -> dict:
+    return build_grade_summary(db.execute(student_grade_summary_query(student_id)))
+
+
+def student_grade_list_query(student_id: int):
+    """
+    Calificaciones con el nombre de la materia y el promedio general leído de
+    grade_aggregates (sin sumar las calificaciones en Python), en una consulta
+    """
+    total_average = (
+        select(func.sum(GradeAggregate.sum) / func.sum(GradeAggregate.count))
+        .where(GradeAggregate.student_id == student_id)
+        .scalar_subquery()
+    )
+    return (
+        select(Grade.score, Subject.name.label("subject_name"), total_average.label("total_average"))
+        .outerjoin(Subject, Subject.id == Grade.subject_id)
+        .where(Grade.student_id == student_id)
+        .order_by(Grade.id)
+    )
+
+
+def build_grade_list(rows, subject_key: str) -> dict:
+    """{"total_average", "grades": [{subject_key: nombre, "score"}]} a partir de student_grade_list_query"""
+    grades_data = []
+    total_average = 0
+    for row in rows:
+        grades_data.append({subject_key: row.subject_name, "score": row.score})
+        total_average = _round_average(row.total_average)
+    return {"grades": grades_data, "total_average": total_average}
+
+
+def get_student_grade_list(db: Session, student_id: int, subject_key: str = "subject") -> dict:
+    return build_grade_list(db.execute(student_grade_list_query(student_id)), subject_key)
@@ -0,0 +1,99 @@
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.grade import Grade
+from app.schemas.grade import GradeCreate, GradeUpdate
+from app.crud.crud_grade import (
+    aggregate_add_statement,
+    aggregate_refresh_statements,
+    all_scores_query,
+    build_grade_list,
+    build_grade_summary,
+    build_ranking,
+    build_term_stats,
+    describe_subject_scores,
+    student_grade_list_query,
+    student_grade_summary_query,
+    subject_ranking_query,
+    subject_scores_query,
+)
+from app.models.subject import Subject
+from app.crud.pagination import apply_keyset, split_page
+from app.crud.student_search import dialect_of
+
+# Versión asíncrona de crud_grade
+
+async def create_grade(db: AsyncSession, grade: GradeCreate):
+    db_grade = Grade(
+        student_id=grade.student_id,
+        subject_id=grade.subject_id,
+        score=grade.score
+    )
+    db.add(db_grade)
+    await db.flush()
+    await db.execute(aggregate_add_statement(dialect_of(db), [(grade.student_id, grade.subject_id, grade.score)]))
+    await db.commit()
+    return db_grade
+
+async def get_grades_by_student(db: AsyncSession, student_id: int):
+    result = await db.execute(select(Grade).where(Grade.student_id == student_id))
+    return result.scalars().all()
+
+async def get_all_grades(db: AsyncSession, skip: int = 0, limit: int = 100):
+    result = await db.execute(select(Grade).order_by(Grade.id).offset(skip).limit(limit))
+    return result.scalars().all()
+
+# Listado por cursor: devuelve (calificaciones, next_cursor)
+async def get_grades_page(db: AsyncSession, cursor: Optional[str] = None, limit: int = 100):
+    result = await db.execute(apply_keyset(select(Grade), Grade.id, cursor, limit))
+    return split_page(result.scalars().all(), limit)
+
+async def get_grades_by_subject(db: AsyncSession, subject_id: int):
+    result = await db.execute(select(Grade).where(Grade.subject_id == subject_id))
+    return result.scalars().all()
+
+
+async def update_grade(db: AsyncSession, grade_id: int, grade_update: GradeUpdate):
+    db_grade = await db.get(Grade, grade_id)
+    if not db_grade:
+        return None
+
+    db_grade.score = grade_update.score
+    await db.flush()
+    await refresh_aggregates(db, db_grade.subject_id, [db_grade.student_id])
+    await db.commit()
+    return db_grade
+
+
+async def get_student_grade_summary(db: AsyncSession, student_id: int) -> dict:
+    result = await db.execute(student_grade_summary_query(student_id))
+    return build_grade_summary(result)
+
+
+async def get_student_grade_list(db: AsyncSession, student_id: int, subject_key: str = "subject") -> dict:
+    result = await db.execute(student_grade_list_query(student_id))
+    return build_grade_list(result, subject_key)
+
+
+async def refresh_aggregates(db: AsyncSession, subject_id: int, student_ids) -> None:
+    student_ids = list(student_ids)
+    if not student_ids:
+        return
+    for stmt in aggregate_refresh_statements(dialect_of(db), subject_id, student_ids):
+        await db.execute(stmt)
+
+
+async def get_subject_ranking(db: AsyncSession, subject_id: int, limit: int = 100):
+    result = await db.execute(subject_ranking_query(subject_id, limit))
+    return build_ranking(result)
+
+
+async def get_subject_stats(db: AsyncSession, subject_id: int, pass_score: float) -> dict:
+    scores = (await db.execute(subject_scores_query(subject_id))).scalars().all()
+    return describe_subject_scores(scores, pass_score)
+
+
+async def get_term_stats(db: AsyncSession, pass_score: float):
+    subjects = (await db.execute(select(Subject.id, Subject.name).order_by(Subject.id))).all()
+    score_rows = (await db.execute(all_scores_query())).all()
+    return build_term_stats(subjects, score_rows, pass_score)
@@ -0,0 +1,39 @@
+from typing import Dict, Iterable
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.core import stats_cache
+from app.models.student import Student
+from app.models.subject import Subject
+from app.models.user import User
+
+# Contadores del dashboard. Se leen de stats_cache y los que falten se calculan
+# juntos en un solo SELECT con una subconsulta escalar por contador.
+
+STAT_KEYS = (stats_cache.STUDENTS, stats_cache.SUBJECTS, stats_cache.PROFESSORS)
+
+_COUNT_QUERIES = {
+    stats_cache.STUDENTS: lambda: select(func.count(Student.id)),
+    stats_cache.SUBJECTS: lambda: select(func.count(Subject.id)),
+    stats_cache.PROFESSORS: lambda: select(func.count(User.id)).where(User.role == "profesor"),
+}
+
+
+def stats_query(keys: Iterable[str]):
+    return select(*[_COUNT_QUERIES[key]().scalar_subquery().label(key) for key in keys])
+
+
+def merge_counts(cached: Dict[str, int], missing, row) -> Dict[str, int]:
+    computed = dict(zip(missing, row))
+    stats_cache.set_many(computed)
+    cached.update(computed)
+    return cached
+
+
+def get_stats(db: Session, keys: Iterable[str] = STAT_KEYS) -> Dict[str, int]:
+    keys = list(keys)
+    values = stats_cache.get_many(keys)
+    missing = [key for key in keys if values.get(key) is None]
+    if missing:
+        row = db.execute(stats_query(missing)).one()
+        values = merge_counts(values, missing, row)
+    return {key: values[key] for key in keys}
@@ -0,0 +1,16 @@
+from typing import Dict, Iterable
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import stats_cache
+from app.crud.crud_stats import STAT_KEYS, merge_counts, stats_query
+
+# Versión asíncrona de crud_stats
+
+
+async def get_stats(db: AsyncSession, keys: Iterable[str] = STAT_KEYS) -> Dict[str, int]:
+    keys = list(keys)
+    values = stats_cache.get_many(keys)
+    missing = [key for key in keys if values.get(key) is None]
+    if missing:
+        row = (await db.execute(stats_query(missing))).one()
+        values = merge_counts(values, missing, row)
+    return {key: values[key] for key in keys}
@@ -1,8 +1,12 @@
-from sqlalchemy.orm import Session,joinedload
-from app.models.student import Student
+from sqlalchemy import exists, insert, select
+from sqlalchemy.orm import Session, selectinload
+from app.models.student import Student, student_subject_association
 from app.schemas.student import StudentCreate, StudentUpdate
 from app.models.subject import Subject
-from typing import List
+from typing import List, Optional, Tuple
+from app.crud.pagination import apply_keyset, split_page
+from app.crud.student_search import check_index, dialect_of, needs_index_check, search_students_query
+from app.core import stats_cache, student_index
 
 # Función para obtener un alumno por ID
 def get_student(db: Session, student_id: int):
@@ -12,10 +16,6 @@ def get_student(db: Session, student_id: int):
 def get_student_by_email(db: Session, email: str):
     return db.query(Student).filter(Student.email == email).first()
 
-# Función para listar alumnos (con paginación: skip y limit)
-def get_students(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Student).offset(skip).limit(limit).all()
-
 # Función para CREAR un alumno nuevo
 def create_student(db: Session, student: StudentCreate):
     # 1. Convertimos el Schema (datos JSON) a Modelo (Tabla SQL)
@@ -30,6 +30,8 @@ def create_student(db: Session, student: StudentCreate):
     db.add(db_student)
     db.commit()
     db.refresh(db_student)
+    student_index.student_saved(db_student)
+    stats_cache.invalidate(stats_cache.STUDENTS)
     return db_student
 
 # Función para ACTUALIZAR
@@ -47,6 +49,7 @@ def update_student(db: Session, student_id: int, student_update: StudentUpdate):
     db.add(db_student)
     db.commit()
     db.refresh(db_student)
+    student_index.student_saved(db_student)
     return db_student
 
 def delete_student(db: Session, student_id: int):
@@ -56,27 +59,89 @@ def delete_student(db: Session, student_id: int):
         
     db.delete(db_student)
     db.commit()
+    student_index.student_deleted(student_id)
+    stats_cache.invalidate(stats_cache.STUDENTS)
     return db_student
 
 
 
-def enroll_student_to_subject(db: Session, student_id: int, subject_id: int):
+# Función para validar existencia sin cargar la entidad completa
+def student_exists(db: Session, student_id: int) -> bool:
+    return db.query(exists().where(Student.id == student_id)).scalar()
 
-    student = db.query(Student).filter(Student.id == student_id).first()
-    subject = db.query(Subject).filter(Subject.id == subject_id).first()
-    if not student or not subject:
-        return None 
-    student.subjects.append(subject) 
-    db.commit()
-    db.refresh(student)
-    return student
+
+def teacher_student_ids_query(teacher_id: int):
+    """Subconsulta con los ids de los alumnos inscritos en alguna materia del profesor"""
+    return (
+        select(student_subject_association.c.student_id)
+        .join(Subject, Subject.id == student_subject_association.c.subject_id)
+        .where(Subject.teacher_id == teacher_id)
+    )
 
 
+def enrollment_check_query(student_id: int, subject_id: int):
+    """Un solo SELECT que responde: ¿existe el alumno?, ¿existe la materia?, ¿ya está inscrito?"""
+    return select(
+        exists().where(Student.id == student_id),
+        exists().where(Subject.id == subject_id),
+        exists().where(
+            student_subject_association.c.student_id == student_id,
+            student_subject_association.c.subject_id == subject_id,
+        ),
+    )
+
+
+def enroll_student_to_subject(db: Session, student_id: int, subject_id: int):
+    student_ok, subject_ok, enrolled = db.execute(enrollment_check_query(student_id, subject_id)).one()
+    if not student_ok or not subject_ok:
+        return None
+    # Se inserta directo en la tabla de asociación: no hace falta cargar el
+    # alumno, la materia ni la colección de materias ya inscritas
+    if not enrolled:
+        db.execute(
+            insert(student_subject_association).values(student_id=student_id, subject_id=subject_id)
+        )
+        db.commit()
+        student_index.enrollment_changed(student_id, subject_id, True)
+    return get_student(db, student_id)
+
+
+# Función para listar alumnos (paginación clásica con skip y limit).
+# selectinload en lugar de joinedload: el JOIN con LIMIT obliga a envolver la
+# consulta en una subconsulta y repite cada alumno por materia; así LIMIT se
+# aplica sobre alumnos y las materias llegan en un segundo SELECT ... IN
 def get_students(db: Session, skip: int = 0, limit: int = 100) -> List[Student]:
-   
     return db.query(Student)\
-             .options(joinedload(Student.subjects))\
+             .options(selectinload(Student.subjects))\
+             .order_by(Student.id)\
              .offset(skip)\
              .limit(limit)\
              .all()
 
+
+# Función para listar alumnos por cursor: devuelve (alumnos, next_cursor)
+def get_students_page(db: Session, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[Student], Optional[str]]:
+    query = db.query(Student).options(selectinload(Student.subjects))
+    rows = apply_keyset(query, Student.id, cursor, limit).all()
+    return split_page(rows, limit)
+
+
+# Búsqueda indexada por nombre/apellidos/email (ver app/crud/student_search.py)
+def search_students(db: Session, q: str, limit: int = 10, within=None) -> List[Student]:
+    if needs_index_check(db):
+        check_index(db)
+    query = search_students_query(dialect_of(db), q, limit=limit, within=within)
+    if query is None:
+        return []
+    return db.execute(query).scalars().all()
+
+
+# Sugerencias del autocompletado: índice en memoria si está activo, si no la búsqueda SQL
+def suggest_students(db: Session, q: str, limit: int = 10):
+    if not student_index.enabled():
+        return search_students(db, q, limit=limit)
+    # Una sola petición reconstruye; las demás siguen con el índice anterior
+    if student_index.needs_refresh() and not student_index.refresh(db) and not student_index.is_built():
+        # Primera construcción en curso en otra petición: mientras tanto, SQL
+        return search_students(db, q, limit=limit)
+    return student_index.search(q, limit=limit)
@@ -0,0 +1,123 @@
+from typing import List, Optional, Tuple
+from sqlalchemy import exists, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.models.student import Student, student_subject_association
+from app.crud.crud_student import enrollment_check_query
+from app.crud.pagination import apply_keyset, split_page
+from app.crud.student_search import check_index, dialect_of, needs_index_check, search_students_query
+from app.core import stats_cache, student_index
+from app.schemas.student import StudentCreate, StudentUpdate
+
+# Versión asíncrona de crud_student. En AsyncSession no existe la carga perezosa,
+# así que toda relación que se serializa en la respuesta (Student.subjects) se
+# carga explícitamente con selectinload.
+
+# Función para obtener un alumno por ID
+async def get_student(db: AsyncSession, student_id: int):
+    result = await db.execute(
+        select(Student)
+        .options(selectinload(Student.subjects))
+        .where(Student.id == student_id)
+    )
+    return result.scalars().first()
+
+# Función para obtener un alumno por Email (útil para validaciones)
+async def get_student_by_email(db: AsyncSession, email: str):
+    result = await db.execute(select(Student).where(Student.email == email))
+    return result.scalars().first()
+
+# Función para listar alumnos (con paginación: skip y limit)
+async def get_students(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Student]:
+    result = await db.execute(
+        select(Student)
+        .options(selectinload(Student.subjects))
+        .order_by(Student.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+# Función para listar alumnos por cursor: devuelve (alumnos, next_cursor)
+async def get_students_page(db: AsyncSession, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[Student], Optional[str]]:
+    query = select(Student).options(selectinload(Student.subjects))
+    result = await db.execute(apply_keyset(query, Student.id, cursor, limit))
+    return split_page(result.scalars().all(), limit)
+
+# Función para CREAR un alumno nuevo
+async def create_student(db: AsyncSession, student: StudentCreate):
+    db_student = Student(
+        first_name=student.first_name,
+        last_name=student.last_name,
+        last_name2=student.last_name2,
+        email=student.email,
+    )
+
+    db.add(db_student)
+    await db.commit()
+    student_index.student_saved(db_student)
+    stats_cache.invalidate(stats_cache.STUDENTS)
+    return await get_student(db, db_student.id)
+
+# Función para ACTUALIZAR
+async def update_student(db: AsyncSession, student_id: int, student_update: StudentUpdate):
+    db_student = await get_student(db, student_id)
+
+    if not db_student:
+        return None
+
+    update_data = student_update.model_dump(exclude_unset=True)
+    for key, value in update_data.items():
+        setattr(db_student, key, value)
+
+    await db.commit()
+    student_index.student_saved(db_student)
+    return db_student
+
+async def delete_student(db: AsyncSession, student_id: int):
+    db_student = await get_student(db, student_id)
+    if not db_student:
+        return None
+
+    await db.delete(db_student)
+    await db.commit()
+    student_index.student_deleted(student_id)
+    stats_cache.invalidate(stats_cache.STUDENTS)
+    return db_student
+
+
+async def student_exists(db: AsyncSession, student_id: int) -> bool:
+    return await db.scalar(select(exists().where(Student.id == student_id)))
+
+
+async def enroll_student_to_subject(db: AsyncSession, student_id: int, subject_id: int):
+    result = await db.execute(enrollment_check_query(student_id, subject_id))
+    student_ok, subject_ok, enrolled = result.one()
+    if not student_ok or not subject_ok:
+        return None
+    if not enrolled:
+        await db.execute(
+            insert(student_subject_association).values(student_id=student_id, subject_id=subject_id)
+        )
+        await db.commit()
+        student_index.enrollment_changed(student_id, subject_id, True)
+    return await get_student(db, student_id)
+
+
+async def search_students(db: AsyncSession, q: str, limit: int = 10, within=None) -> List[Student]:
+    if needs_index_check(db):
+        await db.run_sync(check_index)
+    query = search_students_query(dialect_of(db), q, limit=limit, within=within)
+    if query is None:
+        return []
+    return (await db.execute(query)).scalars().all()
+
+
+async def suggest_students(db: AsyncSession, q: str, limit: int = 10):
+    if not student_index.enabled():
+        return await search_students(db, q, limit=limit)
+    # Una sola petición reconstruye; las demás siguen con el índice anterior
+    if student_index.needs_refresh() and not await student_index.refresh_async(db) and not student_index.is_built():
+        # Primera construcción en curso en otra petición: mientras tanto, SQL
+        return await search_students(db, q, limit=limit)
+    return student_index.search(q, limit=limit)
@@ -0,0 +1,218 @@
+import csv
+import re
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from app.core import stats_cache, student_index
+from app.core.search import student_search_text
+from app.models.student import Student, student_subject_association
+from app.models.subject import Subject
+from app.schemas.student import StudentCreate
+
+# Importación masiva de alumnos (y sus inscripciones) desde CSV.
+# El archivo se lee fila por fila y se procesa por lotes: por cada lote hay un
+# SELECT ... IN para los emails ya registrados, otro para las materias, los
+# INSERT masivos y un commit. Un lote que falla se revierte solo a sí mismo.
+#
+# Columnas: first_name, last_name, email (obligatorias), last_name2 y
+# subject_ids (opcionales; ids separados por ";", "|" o espacios).
+
+REQUIRED_COLUMNS = ("first_name", "last_name", "email")
+_SUBJECT_SEPARATORS = re.compile(r"[;|\s]+")
+
+# Cuántos errores se devuelven como máximo (el conteo sí es completo)
+MAX_REPORTED_ERRORS = 1000
+
+
+class _Row:
+    __slots__ = ("line", "student", "subject_ids")
+
+    def __init__(self, line: int, student: StudentCreate, subject_ids: List[int]):
+        self.line = line
+        self.student = student
+        self.subject_ids = subject_ids
+
+
+def read_csv(stream: TextIO) -> Iterator[Tuple[int, dict]]:
+    """(número de línea, fila) por cada registro; valida el encabezado antes de empezar"""
+    reader = csv.DictReader(stream)
+    header = [name.strip() for name in reader.fieldnames or []]
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if missing:
+        raise ValueError(f"Faltan columnas obligatorias en el CSV: {', '.join(missing)}")
+    reader.fieldnames = header
+    for record in reader:
+        yield reader.line_num, record
+
+
+def _parse_row(line: int, record: dict) -> _Row:
+    """Valida la fila con StudentCreate; lanza ValueError con un mensaje legible"""
+    data = {
+        key: (record.get(key) or "").strip() or None
+        for key in ("first_name", "last_name", "last_name2", "email")
+    }
+    try:
+        student = StudentCreate(**data)
+    except ValidationError as e:
+        raise ValueError("; ".join(
+            f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+        ))
+    raw_subjects = (record.get("subject_ids") or "").strip()
+    try:
+        subject_ids = sorted({int(value) for value in _SUBJECT_SEPARATORS.split(raw_subjects) if value})
+    except ValueError:
+        raise ValueError(f"subject_ids inválido: {raw_subjects!r}")
+    return _Row(line, student, subject_ids)
+
+
+class ImportReport:
+    def __init__(self):
+        self.total = 0
+        self.created = 0
+        self.existing = 0
+        self.enrollments = 0
+        self.error_count = 0
+        self.errors: List[dict] = []
+        self.started = time.perf_counter()
+
+    def error(self, line: int, email: Optional[str], detail: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "email": email, "detail": detail})
+
+    def as_dict(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "total": self.total,
+            "created": self.created,
+            "existing": self.existing,
+            "enrollments": self.enrollments,
+            "errors": self.error_count,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.total / elapsed, 1) if elapsed > 0 else None,
+            "error_rows": self.errors,
+        }
+
+
+def _import_batch(db: Session, batch: List[_Row], report: ImportReport) -> None:
+    # Todo se indexa por email en minúsculas, igual que seen_emails en import_students:
+    # "Ana@x.com" en el CSV es la alumna ya registrada como "ana@x.com".
+    # Se busca el email tal cual y en minúsculas (sin lower() sobre la columna,
+    # que impediría usar el índice único de students.email); en MySQL la
+    # collation sin distinción de mayúsculas cubre el resto de combinaciones
+    emails = sorted(
+        {row.student.email for row in batch} | {row.student.email.lower() for row in batch}
+    )
+    existing_ids: Dict[str, int] = {
+        email.lower(): student_id
+        for email, student_id in db.execute(
+            select(Student.email, Student.id).where(Student.email.in_(emails))
+        ).all()
+    }
+    requested_subjects = {subject_id for row in batch for subject_id in row.subject_ids}
+    valid_subjects = set(
+        db.scalars(select(Subject.id).where(Subject.id.in_(requested_subjects))).all()
+    ) if requested_subjects else set()
+
+    accepted: List[_Row] = []
+    for row in batch:
+        unknown = [subject_id for subject_id in row.subject_ids if subject_id not in valid_subjects]
+        if unknown:
+            report.error(row.line, row.student.email, f"Materias inexistentes: {unknown}")
+        else:
+            accepted.append(row)
+
+    new_rows = [row for row in accepted if row.student.email.lower() not in existing_ids]
+    try:
+        if new_rows:
+            db.execute(insert(Student), [
+                {
+                    "first_name": s.first_name,
+                    "last_name": s.last_name,
+                    "last_name2": s.last_name2,
+                    "email": s.email,
+                    # insert() de Core no dispara el evento before_insert del modelo
+                    "search_text": student_search_text(s.first_name, s.last_name, s.last_name2, s.email),
+                }
+                for s in (row.student for row in new_rows)
+            ])
+            # ids de los recién insertados (executemany no los devuelve en MySQL)
+            created_ids = {
+                email.lower(): student_id
+                for email, student_id in db.execute(
+                    select(Student.email, Student.id).where(Student.email.in_([row.student.email for row in new_rows]))
+                ).all()
+            }
+        else:
+            created_ids = {}
+        ids = {**existing_ids, **created_ids}
+
+        # Inscripciones: solo los pares que todavía no existen
+        pairs = {(ids[row.student.email.lower()], subject_id) for row in accepted for subject_id in row.subject_ids}
+        if pairs:
+            link = student_subject_association
+            already = set(db.execute(
+                select(link.c.student_id, link.c.subject_id).where(
+                    link.c.student_id.in_({student_id for student_id, _ in pairs}),
+                    link.c.subject_id.in_({subject_id for _, subject_id in pairs}),
+                )
+            ).all())
+            pairs = sorted(pairs - already)
+            if pairs:
+                db.execute(insert(link), [{"student_id": s, "subject_id": c} for s, c in pairs])
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        for row in accepted:
+            report.error(row.line, row.student.email, f"Lote revertido: {e.__class__.__name__}: {e}")
+        return
+
+    report.created += len(new_rows)
+    report.existing += len(accepted) - len(new_rows)
+    report.enrollments += len(pairs)
+
+    # Índice de búsqueda en memoria (si está activo) con objetos transitorios
+    for row in new_rows:
+        s = row.student
+        student_index.student_saved(Student(
+            id=created_ids[s.email.lower()], first_name=s.first_name, last_name=s.last_name,
+            last_name2=s.last_name2, email=s.email,
+        ))
+    for student_id, subject_id in pairs:
+        student_index.enrollment_changed(student_id, subject_id, True)
+
+
+def import_students(db: Session, records: Iterable[Tuple[int, dict]], batch_size: int = 500) -> dict:
+    """
+    Crea los alumnos de records (ver read_csv) que no existan por email e
+    inscribe a todos (nuevos o ya registrados) en sus subject_ids. Devuelve
+    conteos, rendimiento (filas/s) y los errores por línea.
+    """
+    report = ImportReport()
+    seen_emails = set()
+    batch: List[_Row] = []
+
+    for line, record in records:
+        report.total += 1
+        try:
+            row = _parse_row(line, record)
+        except ValueError as e:
+            report.error(line, (record.get("email") or "").strip() or None, str(e))
+            continue
+        key = row.student.email.lower()
+        if key in seen_emails:
+            report.error(line, row.student.email, "Email repetido en el archivo")
+            continue
+        seen_emails.add(key)
+        batch.append(row)
+        if len(batch) >= batch_size:
+            _import_batch(db, batch, report)
+            batch = []
+    if batch:
+        _import_batch(db, batch, report)
+
+    if report.created:
+        stats_cache.invalidate(stats_cache.STUDENTS)
+    return report.as_dict()
@@ -1,7 +1,11 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from fastapi import HTTPException
+from sqlalchemy import delete, exists, func, insert, select
 from sqlalchemy.orm import Session, joinedload
-from app.models.subject import Subject
+from app.models.subject import Subject, student_subject_association
 from app.models.student import Student
+from app.models.user import User
+from app.core import stats_cache, student_index
 from app.schemas.subject import SubjectCreate,SubjectUpdate
 
 def get_subjects(db: Session, skip: int = 0, limit: int = 100):
@@ -25,6 +29,183 @@ def get_subject(db: Session, subject_id: int):
     )
 
 
+# ---------------------------------------------------------
+# LISTADO COMPACTO DE MATERIAS
+# ---------------------------------------------------------
+# El listado se arma con columnas (sin instanciar objetos ORM ni validar cada fila
+# con Pydantic): materia + profesor + conteo de alumnos en una sola consulta, y la
+# lista de alumnos solo cuando se pide, en una segunda consulta para todas las materias.
+# Los constructores de sentencias se comparten con crud_subject_async.
+
+def subject_listing_query(teacher_id: Optional[int] = None, subject_id: Optional[int] = None):
+    student_count_subquery = select(
+        student_subject_association.c.subject_id,
+        func.count(student_subject_association.c.student_id).label("student_count")
+    ).group_by(student_subject_association.c.subject_id).subquery()
+
+    query = (
+        select(
+            Subject.id,
+            Subject.name,
+            Subject.teacher_id,
+            student_count_subquery.c.student_count,
+            User.email.label("teacher_email"),
+            User.full_name.label("teacher_full_name"),
+            User.role.label("teacher_role"),
+            User.is_active.label("teacher_is_active"),
+        )
+        .outerjoin(student_count_subquery, Subject.id == student_count_subquery.c.subject_id)
+        .outerjoin(User, User.id == Subject.teacher_id)
+        .order_by(Subject.id)
+    )
+    if teacher_id is not None:
+        query = query.where(Subject.teacher_id == teacher_id)
+    if subject_id is not None:
+        query = query.where(Subject.id == subject_id)
+    return query
+
+
+def subject_roster_query(subject_ids: List[int]):
+    return (
+        select(
+            student_subject_association.c.subject_id,
+            Student.id,
+            Student.first_name,
+            Student.last_name,
+            Student.last_name2,
+            Student.email,
+        )
+        .join(Student, Student.id == student_subject_association.c.student_id)
+        .where(student_subject_association.c.subject_id.in_(subject_ids))
+        .order_by(student_subject_association.c.subject_id, Student.id)
+    )
+
+
+def build_rosters(rows) -> Dict[int, List[dict]]:
+    rosters: Dict[int, List[dict]] = {}
+    for subject_id, student_id, first_name, last_name, last_name2, email in rows:
+        rosters.setdefault(subject_id, []).append({
+            "id": student_id,
+            "first_name": first_name,
+            "last_name": last_name,
+            "last_name2": last_name2,
+            "email": email,
+        })
+    return rosters
+
+
+def build_subject_listing(rows, rosters: Optional[Dict[int, List[dict]]] = None) -> List[dict]:
+    """Arma los dicts con la forma de SubjectResponse a partir de filas de subject_listing_query"""
+    listing = []
+    for row in rows:
+        teacher = None
+        if row.teacher_email is not None:
+            teacher = {
+                "id": row.teacher_id,
+                "email": row.teacher_email,
+                "full_name": row.teacher_full_name,
+                "role": row.teacher_role,
+                "is_active": row.teacher_is_active,
+            }
+        listing.append({
+            "id": row.id,
+            "name": row.name,
+            "teacher_id": row.teacher_id,
+            "teacher": teacher,
+            "student_count": row.student_count or 0,
+            "students": rosters.get(row.id, []) if rosters is not None else [],
+        })
+    return listing
+
+
+def get_subject_listing(db: Session, teacher_id: Optional[int] = None, include_students: bool = False):
+    rows = db.execute(subject_listing_query(teacher_id)).all()
+
+    rosters = None
+    if include_students and rows:
+        roster_rows = db.execute(subject_roster_query([row.id for row in rows])).all()
+        rosters = build_rosters(roster_rows)
+
+    return build_subject_listing(rows, rosters)
+
+
+# ---------------------------------------------------------
+# REEMPLAZO DE LA LISTA DE ALUMNOS POR DIFERENCIA
+# ---------------------------------------------------------
+# En vez de asignar subject.students (carga la colección vieja y borra/reinserta
+# filas de student_subject), se compara contra la tabla de asociación y solo se
+# ejecutan un DELETE ... IN con los que salen y un INSERT masivo con los que entran.
+# Los ids que no corresponden a un alumno existente se ignoran, como antes.
+
+def roster_ids_query(subject_id: int):
+    return select(student_subject_association.c.student_id).where(
+        student_subject_association.c.subject_id == subject_id
+    )
+
+
+def existing_student_ids_query(student_ids: Iterable[int]):
+    return select(Student.id).where(Student.id.in_(set(student_ids)))
+
+
+def roster_changes(current: Set[int], target: Set[int]) -> Tuple[List[int], List[int]]:
+    """(ids a inscribir, ids a dar de baja), ordenados"""
+    return sorted(target - current), sorted(current - target)
+
+
+def roster_change_statements(subject_id: int, added: List[int], removed: List[int]) -> list:
+    """(sentencia, parámetros) para aplicar la diferencia; vacío si no hay cambios"""
+    link = student_subject_association
+    statements = []
+    if removed:
+        statements.append((
+            delete(link).where(link.c.subject_id == subject_id, link.c.student_id.in_(removed)),
+            None,
+        ))
+    if added:
+        statements.append((
+            insert(link),
+            [{"student_id": student_id, "subject_id": subject_id} for student_id in added],
+        ))
+    return statements
+
+
+def roster_changed(subject_id: int, added: List[int], removed: List[int]) -> None:
+    """Aplica la diferencia (ya confirmada) al índice de alumnos en memoria"""
+    for student_id in added:
+        student_index.enrollment_changed(student_id, subject_id, True)
+    for student_id in removed:
+        student_index.enrollment_changed(student_id, subject_id, False)
+
+
+def replace_subject_roster(db: Session, subject_id: int, student_ids: List[int]) -> dict:
+    """
+    Deja inscritos en la materia exactamente a student_ids (los que existan).
+    Devuelve la materia con la forma de SubjectResponse más added/removed.
+    """
+    target = set(db.scalars(existing_student_ids_query(student_ids)).all()) if student_ids else set()
+    current = set(db.scalars(roster_ids_query(subject_id)).all())
+    added, removed = roster_changes(current, target)
+
+    if added or removed:
+        try:
+            for stmt, params in roster_change_statements(subject_id, added, removed):
+                db.execute(stmt, params)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        roster_changed(subject_id, added, removed)
+
+    rows = db.execute(subject_listing_query(subject_id=subject_id)).all()
+    rosters = build_rosters(db.execute(subject_roster_query([subject_id])).all())
+    return {**build_subject_listing(rows, rosters)[0], "added": len(added), "removed": len(removed)}
+
+
+# Validación de existencia con un SELECT EXISTS (sin cargar alumnos ni profesor)
+def subject_exists(db: Session, subject_id: int) -> bool:
+    return db.query(exists().where(Subject.id == subject_id)).scalar()
+
+
 def create_subject(db: Session, subject: SubjectCreate):
     db_subject = Subject(
         name=subject.name,
@@ -33,6 +214,8 @@ def create_subject(db: Session, subject: SubjectCreate):
     db.add(db_subject)
     db.commit()
     db.refresh(db_subject)
+    student_index.subject_saved(db_subject)
+    stats_cache.invalidate(stats_cache.SUBJECTS)
     return db_subject
 
 
@@ -54,6 +237,7 @@ def remove_student_from_subject(db: Session, subject_id: int, student_id: int):
     subject.students.remove(student)
     db.commit()
     db.refresh(subject)
+    student_index.enrollment_changed(student_id, subject_id, False)
 
     return subject
 def update_subject(db: Session, subject_id: int, subject_update: SubjectUpdate):
@@ -69,6 +253,7 @@ def update_subject(db: Session, subject_id: int, subject_update: SubjectUpdate):
     db.add(db_subject)
     db.commit()
     db.refresh(db_subject)
+    student_index.subject_saved(db_subject)
     return db_subject
 
 
@@ -93,4 +278,7 @@ def delete_subject(db: Session, subject_id: int):
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error al eliminar materia: {str(e)}")
 
+    student_index.subject_deleted(subject_id)
+    stats_cache.invalidate(stats_cache.SUBJECTS)
+
     return db_subject
\ No newline at end of file
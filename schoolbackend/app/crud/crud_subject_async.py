@@ -0,0 +1,150 @@
+from typing import List, Optional
+from fastapi import HTTPException
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.models.subject import Subject
+from app.models.student import Student
+from app.schemas.subject import SubjectCreate, SubjectUpdate
+from app.core import stats_cache, student_index
+from app.crud.crud_subject import (
+    build_rosters,
+    build_subject_listing,
+    existing_student_ids_query,
+    roster_change_statements,
+    roster_changed,
+    roster_changes,
+    roster_ids_query,
+    subject_listing_query,
+    subject_roster_query,
+)
+
+# Versión asíncrona de crud_subject. SubjectResponse serializa teacher y students,
+# por eso las consultas que devuelven materias cargan ambas relaciones.
+
+async def get_subjects(db: AsyncSession, skip: int = 0, limit: int = 100):
+    result = await db.execute(
+        select(Subject)
+        .options(selectinload(Subject.students), selectinload(Subject.teacher))
+        .order_by(Subject.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+
+async def get_subject_listing(db: AsyncSession, teacher_id: Optional[int] = None, include_students: bool = False):
+    rows = (await db.execute(subject_listing_query(teacher_id))).all()
+
+    rosters = None
+    if include_students and rows:
+        roster_rows = (await db.execute(subject_roster_query([row.id for row in rows]))).all()
+        rosters = build_rosters(roster_rows)
+
+    return build_subject_listing(rows, rosters)
+
+
+async def replace_subject_roster(db: AsyncSession, subject_id: int, student_ids: List[int]) -> dict:
+    target = set((await db.scalars(existing_student_ids_query(student_ids))).all()) if student_ids else set()
+    current = set((await db.scalars(roster_ids_query(subject_id))).all())
+    added, removed = roster_changes(current, target)
+
+    if added or removed:
+        try:
+            for stmt, params in roster_change_statements(subject_id, added, removed):
+                await db.execute(stmt, params)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        roster_changed(subject_id, added, removed)
+
+    rows = (await db.execute(subject_listing_query(subject_id=subject_id))).all()
+    rosters = build_rosters((await db.execute(subject_roster_query([subject_id]))).all())
+    return {**build_subject_listing(rows, rosters)[0], "added": len(added), "removed": len(removed)}
+
+
+async def get_subject(db: AsyncSession, subject_id: int):
+    result = await db.execute(
+        select(Subject)
+        .options(
+            selectinload(Subject.students).selectinload(Student.subjects),
+            selectinload(Subject.teacher),
+        )
+        .where(Subject.id == subject_id)
+    )
+    return result.scalars().first()
+
+
+async def subject_exists(db: AsyncSession, subject_id: int) -> bool:
+    return await db.scalar(select(exists().where(Subject.id == subject_id)))
+
+
+async def create_subject(db: AsyncSession, subject: SubjectCreate):
+    db_subject = Subject(
+        name=subject.name,
+        teacher_id=subject.teacher_id
+    )
+    db.add(db_subject)
+    await db.commit()
+    student_index.subject_saved(db_subject)
+    stats_cache.invalidate(stats_cache.SUBJECTS)
+    return await get_subject(db, db_subject.id)
+
+
+async def remove_student_from_subject(db: AsyncSession, subject_id: int, student_id: int):
+    subject = await get_subject(db, subject_id)
+
+    if not subject:
+        raise HTTPException(status_code=404, detail="Materia no encontrada")
+
+    student = await db.get(Student, student_id)
+
+    if not student:
+        raise HTTPException(status_code=404, detail="Alumno no encontrado")
+
+    if student not in subject.students:
+        raise HTTPException(status_code=400, detail="El alumno no está asignado a esta materia")
+
+    subject.students.remove(student)
+    await db.commit()
+    student_index.enrollment_changed(student_id, subject_id, False)
+
+    return subject
+
+
+async def update_subject(db: AsyncSession, subject_id: int, subject_update: SubjectUpdate):
+    db_subject = await get_subject(db, subject_id)
+
+    if not db_subject:
+        return None
+
+    update_data = subject_update.model_dump(exclude_unset=True)
+    for key, value in update_data.items():
+        setattr(db_subject, key, value)
+
+    await db.commit()
+    # teacher_id pudo cambiar: se recarga la relación teacher
+    await db.refresh(db_subject, attribute_names=["teacher"])
+    student_index.subject_saved(db_subject)
+    return db_subject
+
+
+async def delete_subject(db: AsyncSession, subject_id: int):
+    db_subject = await get_subject(db, subject_id)
+    if not db_subject:
+        return None
+
+    db_subject.students = []
+    await db.commit()
+
+    try:
+        await db.delete(db_subject)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error al eliminar materia: {str(e)}")
+
+    student_index.subject_deleted(subject_id)
+    stats_cache.invalidate(stats_cache.SUBJECTS)
+    return db_subject
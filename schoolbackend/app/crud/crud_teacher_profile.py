@@ -40,3 +40,7 @@ def update_teacher_profile(db: Session, user_id: int, profile_update: TeacherPro
     db.refresh(db_profile)
     return db_profile
 
+
+def photo_in_use(db: Session, photo_url: str) -> bool:
+    """Con nombres por contenido dos perfiles pueden compartir archivo: solo se borra si nadie más lo usa"""
+    return db.query(TeacherProfile.id).filter(TeacherProfile.photo_url == photo_url).first() is not None
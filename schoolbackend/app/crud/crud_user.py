@@ -1,7 +1,10 @@
+from typing import Optional
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
-from app.core.security import get_password_hash 
+from app.core.security import get_password_hash
+from app.core import auth_cache, stats_cache
+from app.crud.pagination import apply_keyset, split_page
 
 # Buscar usuario por email 
 def get_user_by_email(db: Session, email: str):
@@ -24,6 +27,7 @@ def create_user(db: Session, user: UserCreate):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    stats_cache.invalidate(stats_cache.PROFESSORS)
     return db_user
 
 def get_user(db: Session, user_id: int):
@@ -36,7 +40,15 @@ def get_users(db: Session, skip: int = 0, limit: int = 100, role: str = None):
     query = db.query(User)
     if role:
         query = query.filter(User.role == role)
-    return query.offset(skip).limit(limit).all()
+    return query.order_by(User.id).offset(skip).limit(limit).all()
+
+
+# Listado por cursor: devuelve (usuarios, next_cursor)
+def get_users_page(db: Session, cursor: Optional[str] = None, limit: int = 100, role: str = None):
+    query = db.query(User)
+    if role:
+        query = query.filter(User.role == role)
+    return split_page(apply_keyset(query, User.id, cursor, limit).all(), limit)
 
 
 def update_user(db: Session, user_id: int, user_update: UserUpdate):
@@ -56,6 +68,10 @@ def update_user(db: Session, user_id: int, user_update: UserUpdate):
 
     db.add(db_user)
     db.commit()
+    # Rol, estado o email pudieron cambiar: los tokens cacheados dejan de valer
+    auth_cache.invalidate_user(user_id)
+    # El rol pudo cambiar: el conteo de profesores se recalcula
+    stats_cache.invalidate(stats_cache.PROFESSORS)
     db.refresh(db_user)
     return db_user
 
@@ -67,4 +83,6 @@ def delete_user(db: Session, user_id: int):
         
     db.delete(db_user)
     db.commit()
+    auth_cache.invalidate_user(user_id)
+    stats_cache.invalidate(stats_cache.PROFESSORS)
     return db_user
\ No newline at end of file
@@ -0,0 +1,85 @@
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user import User
+from app.schemas.user import UserCreate, UserUpdate
+from app.core.security import get_password_hash_async
+from app.core import auth_cache, stats_cache
+from app.crud.pagination import apply_keyset, split_page
+
+# Versión asíncrona de crud_user
+
+# Buscar usuario por email
+async def get_user_by_email(db: AsyncSession, email: str):
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
+
+# Crear usuario nuevo
+async def create_user(db: AsyncSession, user: UserCreate):
+    hashed_password = await get_password_hash_async(user.password)
+
+    db_user = User(
+        email=user.email,
+        hashed_password=hashed_password,
+        full_name=user.full_name,
+        role=user.role,
+        is_active=user.is_active
+    )
+
+    db.add(db_user)
+    await db.commit()
+    stats_cache.invalidate(stats_cache.PROFESSORS)
+    return db_user
+
+async def get_user(db: AsyncSession, user_id: int):
+    return await db.get(User, user_id)
+
+
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100, role: str = None):
+    query = select(User)
+    if role:
+        query = query.where(User.role == role)
+    result = await db.execute(query.order_by(User.id).offset(skip).limit(limit))
+    return result.scalars().all()
+
+
+# Listado por cursor: devuelve (usuarios, next_cursor)
+async def get_users_page(db: AsyncSession, cursor: Optional[str] = None, limit: int = 100, role: str = None):
+    query = select(User)
+    if role:
+        query = query.where(User.role == role)
+    result = await db.execute(apply_keyset(query, User.id, cursor, limit))
+    return split_page(result.scalars().all(), limit)
+
+
+async def update_user(db: AsyncSession, user_id: int, user_update: UserUpdate):
+    db_user = await db.get(User, user_id)
+
+    if not db_user:
+        return None
+
+    update_data = user_update.model_dump(exclude_unset=True)
+
+    if "password" in update_data:
+        update_data["hashed_password"] = await get_password_hash_async(update_data.pop("password"))
+
+    for key, value in update_data.items():
+        setattr(db_user, key, value)
+
+    await db.commit()
+    # Rol, estado o email pudieron cambiar: los tokens cacheados dejan de valer
+    auth_cache.invalidate_user(user_id)
+    stats_cache.invalidate(stats_cache.PROFESSORS)
+    return db_user
+
+
+async def delete_user(db: AsyncSession, user_id: int):
+    db_user = await db.get(User, user_id)
+    if not db_user:
+        return None
+
+    await db.delete(db_user)
+    await db.commit()
+    auth_cache.invalidate_user(user_id)
+    stats_cache.invalidate(stats_cache.PROFESSORS)
+    return db_user
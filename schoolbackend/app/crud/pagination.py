@@ -0,0 +1,45 @@
+import base64
+import json
+from typing import Optional
+
+# Paginación por cursor (keyset) sobre la llave primaria: en lugar de
+# OFFSET n, cada página pide "id > último id visto", que usa el índice de la PK
+# y cuesta lo mismo en la primera página que en la milésima.
+
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    """Devuelve el id del cursor; ValueError si el cursor no es válido"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))["id"]
+    except Exception:
+        raise ValueError("Cursor inválido")
+    if not isinstance(last_id, int):
+        raise ValueError("Cursor inválido")
+    return last_id
+
+
+def apply_keyset(query, id_column, cursor: Optional[str], limit: int):
+    """Agrega el filtro/orden por id; pide limit + 1 filas para saber si hay otra página"""
+    after_id = decode_cursor(cursor)
+    if after_id is not None:
+        query = query.filter(id_column > after_id)
+    return query.order_by(id_column).limit(limit + 1)
+
+
+def split_page(rows, limit: int):
+    """Separa la fila extra de apply_keyset y calcula el cursor de la siguiente página"""
+    rows = list(rows)
+    if limit <= 0:
+        return [], None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].id)
+    return rows, None
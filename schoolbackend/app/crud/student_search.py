@@ -0,0 +1,76 @@
+from sqlalchemy import case, column, func, select, table
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import selectinload
+
+from app.core.search import normalize_text
+from app.db import search_index
+from app.models.student import Student
+
+# Búsqueda de alumnos por nombre/apellidos/email sobre students.search_text.
+# search_students_query arma la consulta para el motor de la sesión; las versiones
+# síncrona (crud_student) y asíncrona (crud_student_async) solo la ejecutan.
+
+# Longitud mínima del término para usar el índice: trigramas en SQLite/PostgreSQL,
+# ngram_token_size (2 por defecto) en MySQL. Con menos caracteres (o sin índice) se
+# busca la subcadena con LIKE '%q%' sobre search_text, recorriendo la tabla; los que
+# empiezan con el término van primero.
+_MIN_INDEXED_LENGTH = {"sqlite": 3, "postgresql": 3, "mysql": 2}
+
+_fts = table(search_index.FTS_TABLE, column("rowid"), column("rank"), column("search_text"))
+
+
+def search_students_query(dialect_name: str, q: str, limit: int = 10, within=None):
+    """
+    Devuelve el SELECT de alumnos que coinciden con q, ordenados por relevancia,
+    o None si el término queda vacío al normalizarlo.
+    within: colección o subconsulta de ids para acotar la búsqueda.
+    """
+    needle = normalize_text(q)
+    if not needle:
+        return None
+
+    query = select(Student).options(selectinload(Student.subjects))
+    if within is not None:
+        query = query.where(Student.id.in_(within))
+
+    # Coincidencia exacta de email primero (sin distinguir mayúsculas, como la
+    # importación de alumnos), luego la relevancia de cada motor
+    order_by = [case((func.lower(Student.email) == q.strip().lower(), 0), else_=1)]
+
+    indexed = (
+        search_index.index_ready(dialect_name)
+        and len(needle) >= _MIN_INDEXED_LENGTH.get(dialect_name, 0)
+    )
+
+    if indexed and dialect_name == "sqlite":
+        phrase = '"' + needle.replace('"', '""') + '"'
+        query = query.join(_fts, _fts.c.rowid == Student.id).where(_fts.c.search_text.op("MATCH")(phrase))
+        order_by.append(_fts.c.rank)
+    elif indexed and dialect_name == "mysql":
+        phrase = '"' + needle.replace('"', " ") + '"'
+        score = match(Student.search_text, against=phrase).in_boolean_mode()
+        query = query.where(score)
+        order_by.append(score.desc())
+    elif indexed and dialect_name == "postgresql":
+        query = query.where(Student.search_text.contains(needle, autoescape=True))
+        order_by.append(func.similarity(Student.search_text, needle).desc())
+    else:
+        query = query.where(Student.search_text.contains(needle, autoescape=True))
+        order_by.append(case((Student.search_text.startswith(needle, autoescape=True), 0), else_=1))
+
+    return query.order_by(*order_by, Student.id).limit(limit)
+
+
+def dialect_of(db) -> str:
+    """Nombre del motor de una Session o AsyncSession"""
+    return db.get_bind().dialect.name
+
+
+def needs_index_check(db) -> bool:
+    """True hasta que este proceso revisó si el índice del motor existe"""
+    return not search_index.index_checked(dialect_of(db))
+
+
+def check_index(session) -> None:
+    """Para Session síncrona (o AsyncSession.run_sync)"""
+    search_index.detect_student_search(session.connection())
@@ -0,0 +1,32 @@
+from sqlalchemy import inspect
+from app.db.base import Base
+from app.core import config
+from app.models import load_all
+from migrations import runner as migration_runner
+
+# Creación y verificación del esquema. Antes corría en el startup de cada
+# worker (create_all refleja todas las tablas contra la BD); ahora se ejecuta
+# una vez con python -m app.cli init-db, o al arrancar con INIT_DB_ON_STARTUP=true.
+# Los cambios sobre datos existentes (columnas nuevas, índices, backfills) van
+# solo por migrations/: init-db nunca los corre sobre una base con datos.
+
+
+def init_db(engine) -> None:
+    load_all()
+
+    new_database = "students" not in inspect(engine).get_table_names()
+    Base.metadata.create_all(bind=engine)
+    print("✅ Tablas de base de datos creadas/verificadas correctamente")
+    if new_database:
+        # Base vacía: las migraciones (índice de búsqueda incluido) terminan al
+        # instante y quedan registradas en schema_migrations
+        migration_runner.upgrade(engine, batch_size=config.MIGRATION_BATCH_SIZE)
+        return
+
+    # En una base existente nada se reconstruye aquí (backfills largos que bloquean
+    # tablas): solo se avisa. Se aplican con python -m migrations
+    pending = migration_runner.pending(engine)
+    if pending:
+        print(f"⚠️  {len(pending)} migraciones pendientes: ejecutar python -m migrations")
+        for migration in pending:
+            print(f"   - {migration.version} {migration.name}")
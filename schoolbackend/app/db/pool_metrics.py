@@ -0,0 +1,114 @@
+import logging
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    """Contadores del pool de conexiones (protegidos con lock, los usan varios hilos)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.wait_warn_ms = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.connects = 0
+            self.overflow_events = 0
+            self.timeouts = 0
+            self.invalidations = 0
+            self.wait_total_ms = 0.0
+            self.wait_max_ms = 0.0
+
+    def record_wait(self, wait_ms: float, overflowed: bool):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total_ms += wait_ms
+            if wait_ms > self.wait_max_ms:
+                self.wait_max_ms = wait_ms
+            if overflowed:
+                self.overflow_events += 1
+        if self.wait_warn_ms is not None and wait_ms >= self.wait_warn_ms:
+            logger.warning("Espera de %.1f ms para obtener una conexión del pool", wait_ms)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+        logger.warning("Timeout al obtener una conexión del pool")
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def record_invalidation(self):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self, pool=None) -> dict:
+        with self._lock:
+            data = {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "overflow_events": self.overflow_events,
+                "timeouts": self.timeouts,
+                "invalidations": self.invalidations,
+                "wait_total_ms": round(self.wait_total_ms, 3),
+                "wait_max_ms": round(self.wait_max_ms, 3),
+                "wait_avg_ms": round(self.wait_total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+            }
+        if isinstance(pool, QueuePool):
+            data.update({
+                "pool_size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+            })
+        return data
+
+
+class _WaitTimingMixin:
+    """Mide cuánto espera cada checkout antes de obtener una conexión del pool"""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        overflow_before = self._overflow
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        wait_ms = (time.perf_counter() - start) * 1000
+        overflowed = self._overflow > overflow_before and self._overflow > 0
+        self.metrics.record_wait(wait_ms, overflowed)
+        return record
+
+
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    metrics = PoolMetrics()
+
+
+class InstrumentedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    metrics = PoolMetrics()
+
+
+def instrument_engine(engine, metrics: PoolMetrics):
+    """Registra los eventos del pool que no pasan por _do_get (conexiones nuevas e invalidaciones)"""
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.record_connect()
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.record_invalidation()
+
+    @event.listens_for(engine, "soft_invalidate")
+    def _on_soft_invalidate(dbapi_connection, connection_record, exception):
+        metrics.record_invalidation()
@@ -0,0 +1,78 @@
+import contextvars
+import logging
+import time
+from typing import Optional
+from sqlalchemy import event
+
+# Conteo y tiempo de las sentencias SQL de cada petición. El middleware de
+# app/core/request_metrics.py abre un RequestQueryStats por petición en una
+# ContextVar; los eventos del motor suman en él cada sentencia ejecutada.
+#
+# La ContextVar llega a los endpoints síncronos (el threadpool copia el contexto)
+# y a los asíncronos (SQLAlchemy ejecuta el driver en un greenlet con el mismo
+# contexto). Como se modifica el objeto y no la variable, lo sumado en el hilo o
+# en el greenlet lo ve el middleware.
+
+logger = logging.getLogger("app.db.slow_query")
+
+_SLOW_QUERY_TEXT_LENGTH = 500
+
+
+class RequestQueryStats:
+    __slots__ = ("statements", "db_seconds", "path")
+
+    def __init__(self, path: str):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.path = path
+
+
+_current: contextvars.ContextVar[Optional[RequestQueryStats]] = contextvars.ContextVar(
+    "request_query_stats", default=None
+)
+
+# Umbral del log de consultas lentas en segundos (None = desactivado)
+slow_query_seconds: Optional[float] = None
+
+
+def start_request(path: str) -> RequestQueryStats:
+    stats = RequestQueryStats(path)
+    _current.set(stats)
+    return stats
+
+
+def current() -> Optional[RequestQueryStats]:
+    return _current.get()
+
+
+def instrument_queries(engine) -> None:
+    """Registra before/after_cursor_execute en el motor (síncrono o sync_engine del async)"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        stats = _current.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_seconds += elapsed
+        if slow_query_seconds is not None and elapsed >= slow_query_seconds:
+            logger.warning(
+                "Consulta lenta (%.1f ms) en %s: %s",
+                elapsed * 1000,
+                stats.path if stats is not None else "-",
+                " ".join(statement.split())[:_SLOW_QUERY_TEXT_LENGTH],
+            )
+
+    # Si la sentencia falla no llega after_cursor_execute: se descarta su inicio
+    @event.listens_for(engine, "handle_error")
+    def _on_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
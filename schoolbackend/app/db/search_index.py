@@ -0,0 +1,141 @@
+import logging
+from sqlalchemy import bindparam, inspect, select, text, update
+
+from app.core.search import student_search_text
+from app.models.student import Student
+
+logger = logging.getLogger(__name__)
+
+# Índice de búsqueda de alumnos sobre students.search_text, según el motor:
+#   - MySQL:      índice FULLTEXT con parser ngram (subcadenas, sin depender de espacios)
+#   - PostgreSQL: índice GIN con pg_trgm (acelera LIKE '%texto%' y permite similarity())
+#   - SQLite:     tabla virtual FTS5 con tokenizer trigram, sincronizada por triggers
+# La columna, su relleno y el índice los crea la migración 0003 (runner de
+# migrations/). Si no se pudo crear (permisos, versión del motor) la búsqueda
+# sigue funcionando con LIKE sobre search_text, solo que sin índice.
+
+FTS_TABLE = "students_fts"
+MYSQL_INDEX = "ix_students_search_text_ft"
+POSTGRES_INDEX = "ix_students_search_text_trgm"
+
+# Motores (dialect.name) cuyo índice quedó listo / ya se revisó en este proceso
+_ready_dialects = set()
+_checked_dialects = set()
+
+
+def index_ready(dialect_name: str) -> bool:
+    return dialect_name in _ready_dialects
+
+
+def index_checked(dialect_name: str) -> bool:
+    return dialect_name in _checked_dialects
+
+
+def detect_student_search(connection) -> bool:
+    """
+    Revisa (una vez por proceso y motor) si el índice ya existe en la base, sin
+    crearlo: lo crea la migración 0003 (python -m migrations)
+    """
+    dialect = connection.dialect.name
+    if dialect not in _checked_dialects:
+        inspector = inspect(connection)
+        if dialect == "sqlite":
+            ready = FTS_TABLE in inspector.get_table_names()
+        elif dialect in ("mysql", "postgresql"):
+            name = MYSQL_INDEX if dialect == "mysql" else POSTGRES_INDEX
+            ready = any(index["name"] == name for index in inspector.get_indexes("students"))
+        else:
+            ready = False
+        if ready:
+            _ready_dialects.add(dialect)
+        _checked_dialects.add(dialect)
+    return dialect in _ready_dialects
+
+
+def fill_search_text(connection, low_id: int, high_id: int) -> int:
+    """Calcula search_text de los alumnos low_id < id <= high_id que aún no lo tienen (un lote de la migración 0003)"""
+    rows = connection.execute(
+        select(Student.id, Student.first_name, Student.last_name, Student.last_name2, Student.email)
+        .where(Student.id > low_id, Student.id <= high_id, Student.search_text.is_(None))
+    ).all()
+    if rows:
+        connection.execute(
+            update(Student.__table__)
+            .where(Student.__table__.c.id == bindparam("row_id"))
+            .values(search_text=bindparam("text_value")),
+            [
+                {"row_id": row.id, "text_value": student_search_text(
+                    row.first_name, row.last_name, row.last_name2, row.email)}
+                for row in rows
+            ],
+        )
+    return len(rows)
+
+
+def create_search_index(engine) -> bool:
+    """
+    Crea el índice del motor si falta (migración 0003). Si no se puede (permisos,
+    versión del motor) solo se avisa: la búsqueda sigue con LIKE, sin índice
+    """
+    dialect = engine.dialect.name
+    try:
+        if dialect == "mysql":
+            _ensure_mysql(engine, inspect(engine))
+        elif dialect == "postgresql":
+            _ensure_postgres(engine)
+        elif dialect == "sqlite":
+            _ensure_sqlite(engine, inspect(engine))
+        else:
+            return False
+    except Exception as e:
+        logger.warning("No se pudo crear el índice de búsqueda de alumnos (%s): %s", dialect, e)
+        return False
+    _ready_dialects.add(dialect)
+    _checked_dialects.add(dialect)
+    return True
+
+
+def _ensure_mysql(engine, inspector) -> None:
+    if any(index["name"] == MYSQL_INDEX for index in inspector.get_indexes("students")):
+        return
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"ALTER TABLE students ADD FULLTEXT INDEX {MYSQL_INDEX} (search_text) WITH PARSER ngram"
+        ))
+
+
+def _ensure_postgres(engine) -> None:
+    # CONCURRENTLY no bloquea escrituras, pero no puede ir dentro de una transacción
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {POSTGRES_INDEX} "
+            "ON students USING gin (search_text gin_trgm_ops)"
+        ))
+
+
+def _ensure_sqlite(engine, inspector) -> None:
+    # Tabla FTS5 de contenido externo: guarda solo el índice y lee el texto de students
+    created = FTS_TABLE not in inspector.get_table_names()
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "search_text, content='students', content_rowid='id', tokenize='trigram')"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS students_fts_ai AFTER INSERT ON students BEGIN "
+            f"INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS students_fts_ad AFTER DELETE ON students BEGIN "
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_text) "
+            "VALUES ('delete', old.id, old.search_text); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS students_fts_au AFTER UPDATE OF search_text ON students BEGIN "
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_text) "
+            "VALUES ('delete', old.id, old.search_text); "
+            f"INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text); END"
+        ))
+        if created:
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
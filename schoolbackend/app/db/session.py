@@ -1,19 +1,75 @@
+import threading
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-import os
-from dotenv import load_dotenv
+from app.core import config
+from app.db.pool_metrics import InstrumentedQueuePool, InstrumentedAsyncQueuePool, instrument_engine
+from app.db import query_metrics
 
-# Carga las variables del archivo .env
-load_dotenv()
+# Los motores se crean en el primer uso (primera sesión o primer acceso a
+# session.engine), no al importar: importar la app no exige DATABASE_URL ni el
+# driver, y un worker nuevo arranca sin tocar la base de datos.
 
-#Obtiene la URL de conexión
-DATABASE_URL = os.getenv("DATABASE_URL")
+_lock = threading.Lock()
+_engine = None
+_async_engine = None
+_AsyncSessionLocal = None
 
-if not DATABASE_URL:
-    raise ValueError("No se encontró DATABASE_URL en el archivo .env")
+pool_metrics = InstrumentedQueuePool.metrics
+pool_metrics.wait_warn_ms = config.DB_POOL_WAIT_WARN_MS
+async_pool_metrics = InstrumentedAsyncQueuePool.metrics if config.USE_ASYNC_DB else None
+if async_pool_metrics is not None:
+    async_pool_metrics.wait_warn_ms = config.DB_POOL_WAIT_WARN_MS
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+if config.SLOW_QUERY_MS is not None:
+    query_metrics.slow_query_seconds = config.SLOW_QUERY_MS / 1000
+
+
+def _pool_options(url: str, poolclass) -> dict:
+    """Parámetros del pool tomados de la configuración (SQLite usa su pool por defecto)"""
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+    }
+
+
+def _instrument_queries(sync_engine) -> None:
+    if config.REQUEST_METRICS or config.SLOW_QUERY_MS is not None:
+        query_metrics.instrument_queries(sync_engine)
+
+
+def get_engine():
+    """Motor síncrono (se crea una sola vez por proceso)"""
+    global _engine
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                if not config.DATABASE_URL:
+                    raise ValueError("No se encontró DATABASE_URL en el archivo .env")
+                engine = create_engine(config.DATABASE_URL, **_pool_options(config.DATABASE_URL, InstrumentedQueuePool))
+                instrument_engine(engine, pool_metrics)
+                _instrument_queries(engine)
+                SessionLocal.configure(bind=engine)
+                _engine = engine
+    return _engine
+
+
+class _LazySessionmaker(sessionmaker):
+    """sessionmaker que crea el motor en la primera sesión"""
+
+    def __call__(self, **local_kw):
+        # sessionmaker guarda bind=None en kw hasta que se configura
+        if self.kw.get("bind") is None and local_kw.get("bind") is None:
+            get_engine()
+        return super().__call__(**local_kw)
+
+
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
 
 #Dependencia para obtener la DB
 def get_db():
@@ -21,4 +77,56 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# --- SESIÓN ASÍNCRONA ----------------------------------------------------------
+# Solo se crea el motor async si está habilitado, para no exigir el driver
+# (aiomysql / aiosqlite) en instalaciones que usan únicamente la capa síncrona.
+
+def get_async_sessionmaker():
+    global _async_engine, _AsyncSessionLocal
+    if not config.USE_ASYNC_DB:
+        raise RuntimeError("La capa asíncrona está deshabilitada (USE_ASYNC_DB=false)")
+    if _AsyncSessionLocal is None:
+        with _lock:
+            if _AsyncSessionLocal is None:
+                from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+                if not config.ASYNC_DATABASE_URL:
+                    raise ValueError("No se encontró DATABASE_URL en el archivo .env")
+                engine = create_async_engine(
+                    config.ASYNC_DATABASE_URL,
+                    **_pool_options(config.ASYNC_DATABASE_URL, InstrumentedAsyncQueuePool)
+                )
+                instrument_engine(engine.sync_engine, async_pool_metrics)
+                _instrument_queries(engine.sync_engine)
+                # expire_on_commit=False: tras el commit los objetos se serializan en la
+                # respuesta sin volver a consultar (la carga perezosa no existe en async)
+                _AsyncSessionLocal = async_sessionmaker(
+                    bind=engine,
+                    class_=AsyncSession,
+                    autoflush=False,
+                    expire_on_commit=False,
+                )
+                _async_engine = engine
+    return _AsyncSessionLocal
+
+
+#Dependencia para obtener la DB asíncrona
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+# session.engine / session.async_engine / session.AsyncSessionLocal se siguen
+# pudiendo leer como atributos del módulo: se resuelven al primer acceso
+def __getattr__(name):
+    if name == "engine":
+        return get_engine()
+    if name == "async_engine":
+        # None si la capa async está deshabilitada o todavía no se usó
+        return _async_engine
+    if name == "AsyncSessionLocal":
+        return get_async_sessionmaker() if config.USE_ASYNC_DB else None
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,68 +1,122 @@
-from fastapi import FastAPI
+import os
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from app.db.session import engine
-from app.db.base import Base
-
-#  Modelos
-from app.models.student import Student
-from app.models.user import User
-from app.models.subject import Subject
-from app.models.grade import Grade
-from app.models.teacher_profile import TeacherProfile
-
-# Rutas
-from app.api.v1 import students
-from app.api.v1 import users
-from app.api.v1 import auth
-from app.api.v1 import subjects
-from app.api.v1 import grades
-from app.api.v1 import reports 
-from app.api.v1 import teacher
-
-app = FastAPI(title="Mini-SICE API")
-
-# Crear tablas en BD (solo si la conexión está disponible)
-@app.on_event("startup")
-async def startup_event():
+from app.core import config, profile_photos
+from app.core.hashing_pool import HashingOverloadedError
+from app.core.request_metrics import QueryMetricsMiddleware
+from app.models import load_all
+
+# Importar este módulo no toca la base de datos ni crea directorios: el motor se
+# crea en la primera sesión y el esquema se verifica con python -m app.cli init-db
+# (o al arrancar, con INIT_DB_ON_STARTUP=true). Así un worker nuevo atiende en
+# cuanto termina de importar.
+
+
+class UploadsStaticFiles(StaticFiles):
+    """Archivos subidos. El directorio lo crea la primera subida, no el arranque:
+    mientras no exista se responde 404 en vez del error de configuración de StaticFiles"""
+
+    async def check_config(self) -> None:
+        if os.path.isdir(self.directory):
+            await super().check_config()
+
+
+# Pool de bcrypt saturado (login, alta o cambio de contraseña): 503 para que el cliente reintente
+async def hashing_overloaded_handler(request: Request, exc: HashingOverloadedError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "El servidor está ocupado, intenta de nuevo en unos segundos"},
+        headers={"Retry-After": "1"},
+    )
+
+
+# Crear/verificar tablas al arrancar (solo con INIT_DB_ON_STARTUP)
+async def init_db_on_startup():
+    from app.core import student_index
+    from app.db.init_db import init_db
+    from app.db.session import SessionLocal, get_engine
+
     try:
-        Base.metadata.create_all(bind=engine)
-        print("✅ Tablas de base de datos creadas/verificadas correctamente")
+        init_db(get_engine())
+        if student_index.enabled():
+            db = SessionLocal()
+            try:
+                student_index.refresh(db)
+                print("✅ Índice de búsqueda de alumnos en memoria construido")
+            finally:
+                db.close()
     except Exception as e:
         print(f"⚠️  Advertencia: No se pudo conectar a la base de datos: {e}")
         print("   El servidor continuará funcionando, pero las operaciones de BD fallarán.")
 
-# --- CONFIGURACIÓN CORS------------------------------------------------------
-origins = [
-    "http://localhost:5173", # Puerto común de Vite/React
-    "http://localhost:3000", # Puerto común de Create-React-App
-    "*" 
-]
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"], 
-    allow_headers=["*"],
-)
-# ---------------------------------------------------------------------------------------
-
-# Rutas-----------------------------------------------------------------------------------
-app.include_router(students.router, prefix="/api/v1/students", tags=["Students"])
-app.include_router(users.router, prefix="/api/v1/users", tags=["Users"])
-app.include_router(auth.router, prefix="/api/v1/auth", tags=["Auth"])
-app.include_router(subjects.router, prefix="/api/v1/subjects", tags=["Subjects"])
-app.include_router(grades.router, prefix="/api/v1/grades", tags=["Grades"])
-app.include_router(reports.router, prefix="/api/v1/reports", tags=["Reports"])
-app.include_router(teacher.router, prefix="/api/v1/teacher", tags=["Teacher"])
-
-# Montar directorio de archivos estáticos para servir fotos de perfil
-from pathlib import Path
-upload_dir = Path("uploads")
-upload_dir.mkdir(exist_ok=True)
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
-
-@app.get("/")
-def root():
-    return {"message": "El sistema está funcionando 0o0"}
\ No newline at end of file
+
+def create_app() -> FastAPI:
+    load_all()
+
+    # Rutas
+    from app.api.v1 import auth, teacher, monitoring, exports
+
+    # Capa asíncrona: con USE_ASYNC_DB=true estos routers reemplazan a los síncronos
+    if config.USE_ASYNC_DB:
+        from app.api.v1_async import students, users, subjects, grades, reports
+    else:
+        from app.api.v1 import students, users, subjects, grades, reports
+
+    app = FastAPI(title="Mini-SICE API")
+
+    if config.INIT_DB_ON_STARTUP:
+        app.add_event_handler("startup", init_db_on_startup)
+
+    # Procesos de variantes de fotos (solo existen si se subió o pidió alguna)
+    app.add_event_handler("shutdown", profile_photos.shutdown_pool)
+
+    app.add_exception_handler(HashingOverloadedError, hashing_overloaded_handler)
+
+    # --- CONFIGURACIÓN CORS------------------------------------------------------
+    origins = [
+        "http://localhost:5173", # Puerto común de Vite/React
+        "http://localhost:3000", # Puerto común de Create-React-App
+        "*"
+    ]
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        # cursor de paginación y nombre de archivo de las exportaciones, legibles desde el frontend
+        expose_headers=["X-Next-Cursor", "Content-Disposition", "Server-Timing"],
+    )
+
+    # Sentencias SQL y tiempos por petición (Server-Timing y GET /metrics)
+    if config.REQUEST_METRICS:
+        app.add_middleware(QueryMetricsMiddleware)
+    # ---------------------------------------------------------------------------------------
+
+    # Rutas-----------------------------------------------------------------------------------
+    app.include_router(students.router, prefix="/api/v1/students", tags=["Students"])
+    app.include_router(users.router, prefix="/api/v1/users", tags=["Users"])
+    app.include_router(auth.router, prefix="/api/v1/auth", tags=["Auth"])
+    app.include_router(subjects.router, prefix="/api/v1/subjects", tags=["Subjects"])
+    app.include_router(grades.router, prefix="/api/v1/grades", tags=["Grades"])
+    app.include_router(reports.router, prefix="/api/v1/reports", tags=["Reports"])
+    app.include_router(teacher.router, prefix="/api/v1/teacher", tags=["Teacher"])
+    app.include_router(monitoring.router, prefix="/api/v1/monitoring", tags=["Monitoring"])
+    app.include_router(monitoring.prometheus_router)
+    app.include_router(exports.router, prefix="/api/v1/exports", tags=["Exports"])
+
+    # Montar directorio de archivos estáticos para servir fotos de perfil
+    # (photo_url = /uploads/profiles/<archivo>, guardado en app/uploads/profiles)
+    app.mount("/uploads", UploadsStaticFiles(directory=profile_photos.UPLOAD_ROOT, check_dir=False), name="uploads")
+
+    @app.get("/")
+    def root():
+        return {"message": "El sistema está funcionando 0o0"}
+
+    return app
+
+
+app = create_app()
@@ -0,0 +1,7 @@
+# Los modelos se refieren entre sí por nombre ("Grade", "Subject"...): antes de
+# crear tablas o hacer la primera consulta tienen que estar todos importados.
+
+
+def load_all() -> None:
+    """Registra todos los modelos en Base.metadata para que sus relaciones se resuelvan"""
+    from app.models import student, user, subject, grade, grade_aggregate, teacher_profile  # noqa: F401
@@ -1,9 +1,14 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey
+from sqlalchemy import Column, Integer, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
 class Grade(Base):  
     __tablename__ = "grades"
+    # Las bases existentes los reciben con migrations/versions/0001_grade_enrollment_indexes.py
+    __table_args__ = (
+        Index("ix_grades_student_subject", "student_id", "subject_id"),
+        Index("ix_grades_subject_id", "subject_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     score = Column(Float, nullable=False)
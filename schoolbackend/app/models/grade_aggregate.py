@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey
+from app.db.base import Base
+
+# Agregado materializado de calificaciones por (alumno, materia). Lo mantiene
+# crud_grade en la misma transacción que cada alta/edición de calificaciones y se
+# puede reconstruir desde cero con: python -m app.cli rebuild-aggregates
+class GradeAggregate(Base):
+    __tablename__ = "grade_aggregates"
+
+    student_id = Column(Integer, ForeignKey("students.id"), primary_key=True)
+    subject_id = Column(Integer, ForeignKey("subjects.id"), primary_key=True, index=True)
+    count = Column(Integer, nullable=False, default=0)
+    sum = Column(Float, nullable=False, default=0)
+    min_score = Column(Float, nullable=True)
+    max_score = Column(Float, nullable=True)
@@ -1,15 +1,22 @@
-from sqlalchemy import Column, Integer, String, Table, ForeignKey
+from sqlalchemy import Column, Integer, String, Table, ForeignKey, Index, event
 from app.db.base import Base
 from sqlalchemy.orm import relationship
-from app.models.grade import Grade
+# Registran las clases de las relaciones "Grade" y "GradeAggregate" de Student
+from app.models.grade import Grade  # noqa: F401
+from app.models.grade_aggregate import GradeAggregate  # noqa: F401
+from app.core.search import SEARCH_TEXT_LENGTH, student_search_text
 
 
 
+# La PK (student_id, subject_id) impide inscripciones repetidas; el índice por
+# subject_id sirve a las listas de clase. Las bases existentes los reciben con
+# migrations/versions/0001_grade_enrollment_indexes.py
 student_subject_association = Table(
     'student_subject',
     Base.metadata,
-    Column('student_id', Integer, ForeignKey('students.id')),
-    Column('subject_id', Integer, ForeignKey('subjects.id'))
+    Column('student_id', Integer, ForeignKey('students.id'), primary_key=True),
+    Column('subject_id', Integer, ForeignKey('subjects.id'), primary_key=True),
+    Index('ix_student_subject_subject_id', 'subject_id'),
 )
 class Student(Base):
     __tablename__ = "students"
@@ -19,6 +26,9 @@ class Student(Base):
     last_name = Column(String(100), nullable=False)
     last_name2 = Column(String(100), nullable=True)
     email = Column(String(100), unique=True, index=True)
+    # Nombre completo + email normalizados (ver app/core/search.py). El índice de
+    # búsqueda depende del motor y lo crea app/db/search_index.py
+    search_text = Column(String(SEARCH_TEXT_LENGTH), nullable=True)
     grades = relationship(
         "Grade", 
         back_populates="student", 
@@ -28,4 +38,16 @@ class Student(Base):
         "Subject", 
         secondary=student_subject_association, 
         back_populates="students"
-    )
\ No newline at end of file
+    )
+    # Se borran junto con el alumno, igual que sus calificaciones
+    grade_aggregates = relationship("GradeAggregate", cascade="all, delete-orphan")
+
+
+# search_text se recalcula en cada INSERT/UPDATE hecho por el ORM. Las cargas
+# masivas con insert()/update() de Core deben calcularlo con student_search_text.
+@event.listens_for(Student, "before_insert")
+@event.listens_for(Student, "before_update")
+def _refresh_search_text(mapper, connection, target):
+    target.search_text = student_search_text(
+        target.first_name, target.last_name, target.last_name2, target.email
+    )
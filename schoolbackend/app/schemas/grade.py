@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 
 # Base común
 class GradeBase(BaseModel):
@@ -17,4 +17,29 @@ class GradeUpdate(BaseModel):
     score: float
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# -----------------------
+# CARGA MASIVA DE CALIFICACIONES
+# -----------------------
+
+class GradeBulkItem(BaseModel):
+    student_id: int
+    score: float
+
+class GradeBulkCreate(BaseModel):
+    subject_id: int
+    grades: List[GradeBulkItem]
+
+class GradeBulkRowResult(BaseModel):
+    student_id: int
+    status: str  # "created", "updated" o "error"
+    grade_id: Optional[int] = None
+    detail: Optional[str] = None
+
+class GradeBulkResponse(BaseModel):
+    subject_id: int
+    created: int
+    updated: int
+    errors: int
+    results: List[GradeBulkRowResult]
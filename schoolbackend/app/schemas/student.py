@@ -46,3 +46,24 @@ class StudentResponse(StudentBase):
 
     class Config:
         from_attributes = True
+
+
+# -----------------------
+# IMPORTACIÓN MASIVA (CSV)
+# -----------------------
+
+class StudentImportError(BaseModel):
+    line: int
+    email: Optional[str] = None
+    detail: str
+
+
+class StudentImportResponse(BaseModel):
+    total: int
+    created: int
+    existing: int  # ya registrados: no se crean, pero sí se inscriben
+    enrollments: int
+    errors: int
+    elapsed_seconds: float
+    rows_per_second: Optional[float] = None
+    error_rows: List[StudentImportError]
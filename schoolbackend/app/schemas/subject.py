@@ -51,3 +51,8 @@ class SubjectUpdate(BaseModel):
 
 class SubjectStudentAssignment(BaseModel):
     student_ids: List[int]
+
+
+class SubjectRosterUpdateResponse(SubjectResponse):
+    added: int    # alumnos inscritos por este reemplazo
+    removed: int  # alumnos dados de baja por este reemplazo
@@ -0,0 +1,86 @@
+"""
+Migraciones versionadas. Ejecutar desde schoolbackend/:
+
+    python -m migrations                 # aplica las pendientes
+    python -m migrations upgrade [--to 0002] [--batch-size 2000] [--pause 0.5]
+    python -m migrations status          # aplicadas, pendientes y backfills a medias
+    python -m migrations explain         # plan de las consultas frecuentes
+"""
+import argparse
+import sys
+
+from sqlalchemy import text
+
+from migrations import runner
+
+# Consultas frecuentes para confirmar con EXPLAIN que usan los índices
+HOT_QUERIES = {
+    "calificaciones de un alumno en una materia":
+        "SELECT id, score FROM grades WHERE student_id = 1 AND subject_id = 1",
+    "calificaciones de una materia":
+        "SELECT score FROM grades WHERE subject_id = 1",
+    "lista de clase":
+        "SELECT student_id FROM student_subject WHERE subject_id = 1",
+    "inscripción de un alumno":
+        "SELECT 1 FROM student_subject WHERE student_id = 1 AND subject_id = 1",
+}
+
+
+def upgrade(engine, args) -> int:
+    from app.core import config
+
+    batch_size = args.batch_size or config.MIGRATION_BATCH_SIZE
+    pause = args.pause if args.pause is not None else config.MIGRATION_BATCH_PAUSE_SECONDS
+    try:
+        applied = runner.upgrade(engine, batch_size=batch_size, pause_seconds=pause, target=args.to)
+    except KeyboardInterrupt:
+        print("⏸️  Interrumpido: los backfills continúan desde el último lote al volver a ejecutar")
+        return 130
+    except Exception as e:
+        print(f"❌ Error al ejecutar las migraciones: {e}")
+        return 1
+    print("✅ Base de datos al día" if applied == 0 else f"✅ {applied} migraciones aplicadas")
+    return 0
+
+
+def status(engine, args) -> int:
+    for item in runner.status(engine):
+        state = f"aplicada {item['applied_at']:%Y-%m-%d %H:%M}" if item["applied_at"] else "pendiente"
+        print(f"{item['version']} {item['name']}: {state}")
+        for backfill in item["backfills"]:
+            print(f"    backfill {backfill['step']}: hasta id {backfill['last_id']}, {backfill['rows']} filas")
+    return 0
+
+
+def explain(engine, args) -> int:
+    prefix = "EXPLAIN QUERY PLAN" if engine.dialect.name == "sqlite" else "EXPLAIN"
+    with engine.connect() as connection:
+        for label, sql in HOT_QUERIES.items():
+            print(f"-- {label}: {sql}")
+            for row in connection.execute(text(f"{prefix} {sql}")):
+                print("   ", " | ".join(str(value) for value in row))
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m migrations", description="Migraciones de Mini-SICE")
+    commands = parser.add_subparsers(dest="command")
+
+    up = commands.add_parser("upgrade", help="Aplica las migraciones pendientes")
+    up.add_argument("--to", default=None, help="Última versión a aplicar (p. ej. 0001)")
+    up.add_argument("--batch-size", type=int, default=None, help="Filas por lote de backfill (MIGRATION_BATCH_SIZE)")
+    up.add_argument("--pause", type=float, default=None, help="Segundos de pausa entre lotes (MIGRATION_BATCH_PAUSE_SECONDS)")
+    up.set_defaults(func=upgrade)
+    commands.add_parser("status", help="Estado de cada migración").set_defaults(func=status)
+    commands.add_parser("explain", help="EXPLAIN de las consultas frecuentes").set_defaults(func=explain)
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        args = parser.parse_args(["upgrade"])
+
+    from app.db.session import engine
+    return args.func(engine, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
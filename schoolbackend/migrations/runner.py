@@ -0,0 +1,231 @@
+"""
+Runner de migraciones versionadas.
+
+Cada archivo de migrations/versions/ se llama NNNN_descripcion.py y define
+upgrade(ctx). Se aplican en orden y se registran en schema_migrations, así que
+cada una corre una sola vez por base de datos. Las migraciones deben ser
+idempotentes (revisar el esquema antes de cambiarlo): una base creada con
+create_all ya tiene el esquema final y la migración no debe fallar sobre ella.
+
+Para cambios de datos sobre tablas grandes, ctx.backfill() procesa la tabla por
+rangos de id en transacciones cortas (sin bloquear la tabla minutos) y guarda
+el último id procesado en schema_migration_progress: si se interrumpe, la
+siguiente ejecución continúa desde ahí.
+"""
+import importlib
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+
+from sqlalchemy import (
+    Column, DateTime, Integer, MetaData, String, Table, inspect, select, text,
+)
+
+VERSIONS_DIR = Path(__file__).parent / "versions"
+_VERSION_FILE = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+# Tablas propias del runner (fuera de Base.metadata: no las crea create_all)
+metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    metadata,
+    Column("version", String(16), primary_key=True),
+    Column("name", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+    Column("duration_seconds", Integer, nullable=False, default=0),
+)
+
+migration_progress = Table(
+    "schema_migration_progress",
+    metadata,
+    Column("version", String(16), primary_key=True),
+    Column("step", String(100), primary_key=True),
+    Column("last_id", Integer, nullable=False),
+    Column("rows", Integer, nullable=False, default=0),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+
+class Migration:
+    def __init__(self, version: str, name: str, module_name: str):
+        self.version = version
+        self.name = name
+        self.module_name = module_name
+
+    def load(self):
+        return importlib.import_module(self.module_name)
+
+
+def discover() -> List[Migration]:
+    """Migraciones de versions/ ordenadas por número"""
+    migrations = []
+    for path in sorted(VERSIONS_DIR.glob("*.py")):
+        match = _VERSION_FILE.match(path.name)
+        if match:
+            version, name = match.groups()
+            migrations.append(Migration(version, name, f"{__package__}.versions.{path.stem}"))
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Números de migración repetidos en {VERSIONS_DIR}")
+    return migrations
+
+
+class MigrationContext:
+    """Lo que recibe upgrade(ctx): el motor y utilidades que dependen del dialecto"""
+
+    def __init__(self, engine, version: str, batch_size: int, pause_seconds: float):
+        self.engine = engine
+        self.dialect = engine.dialect.name
+        self.version = version
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+
+    def inspector(self):
+        # Uno nuevo en cada llamada: el inspector guarda en caché lo que ya leyó
+        return inspect(self.engine)
+
+    def begin(self):
+        return self.engine.begin()
+
+    def create_index(self, name: str, table: str, columns: Sequence[str], unique: bool = False) -> bool:
+        """
+        Crea el índice si no existe, sin bloquear escrituras donde el motor lo
+        permite (MySQL: ALGORITHM=INPLACE, LOCK=NONE; PostgreSQL: CONCURRENTLY).
+        Devuelve False si ya existía.
+        """
+        if name in {index["name"] for index in self.inspector().get_indexes(table)}:
+            return False
+        kind = "UNIQUE INDEX" if unique else "INDEX"
+        cols = ", ".join(columns)
+        if self.dialect == "postgresql":
+            # CONCURRENTLY no puede ir dentro de una transacción
+            with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.execute(text(f"CREATE {kind} CONCURRENTLY IF NOT EXISTS {name} ON {table} ({cols})"))
+        else:
+            online = " ALGORITHM=INPLACE LOCK=NONE" if self.dialect == "mysql" else ""
+            with self.begin() as conn:
+                conn.execute(text(f"CREATE {kind} {name} ON {table} ({cols}){online}"))
+        return True
+
+    def backfill(
+        self,
+        step: str,
+        table: str,
+        apply: Callable[[object, int, int], int],
+        id_column: str = "id",
+        batch_size: Optional[int] = None,
+    ) -> int:
+        """
+        Recorre table por rangos de id_column (keyset, sin OFFSET) y llama a
+        apply(connection, id_desde_exclusivo, id_hasta_inclusivo) en una
+        transacción por lote, que también guarda el avance. Devuelve las filas
+        procesadas en esta ejecución.
+        """
+        batch_size = batch_size or self.batch_size
+        key = {"version": self.version, "step": step}
+        with self.engine.connect() as conn:
+            progress = conn.execute(
+                select(migration_progress.c.last_id, migration_progress.c.rows).where(
+                    migration_progress.c.version == self.version, migration_progress.c.step == step
+                )
+            ).first()
+            max_id = conn.scalar(text(f"SELECT MAX({id_column}) FROM {table}"))
+        last_id, total_rows = progress if progress else (0, 0)
+        if progress:
+            print(f"   ↪ {step}: se reanuda desde {id_column} > {last_id}")
+        if max_id is None or last_id >= max_id:
+            return 0
+
+        start_id = last_id
+        processed = 0
+        next_high = text(
+            f"SELECT MAX({id_column}) FROM (SELECT {id_column} FROM {table} "
+            f"WHERE {id_column} > :last ORDER BY {id_column} LIMIT :n) AS batch"
+        )
+        while True:
+            with self.begin() as conn:
+                high = conn.scalar(next_high, {"last": last_id, "n": batch_size})
+                if high is None:
+                    break
+                rows = apply(conn, last_id, high) or 0
+                values = {"last_id": high, "rows": total_rows + rows, "updated_at": datetime.utcnow()}
+                if progress is None:
+                    conn.execute(migration_progress.insert().values(**key, **values))
+                    progress = True
+                else:
+                    conn.execute(migration_progress.update().where(
+                        migration_progress.c.version == self.version, migration_progress.c.step == step
+                    ).values(**values))
+            last_id, total_rows, processed = high, total_rows + rows, processed + rows
+            done = min(100.0, (high - start_id) * 100 / max(1, max_id - start_id))
+            print(f"   … {step}: {id_column} ≤ {high} ({done:.0f}%), {total_rows} filas")
+            if self.pause_seconds > 0:
+                time.sleep(self.pause_seconds)
+        return processed
+
+
+def _ensure_tables(engine) -> None:
+    metadata.create_all(bind=engine)
+
+
+def applied_versions(engine) -> set:
+    if "schema_migrations" not in inspect(engine).get_table_names():
+        return set()
+    with engine.connect() as conn:
+        return set(conn.scalars(select(schema_migrations.c.version)).all())
+
+
+def pending(engine) -> List[Migration]:
+    applied = applied_versions(engine)
+    return [m for m in discover() if m.version not in applied]
+
+
+def upgrade(engine, batch_size: int, pause_seconds: float = 0.0, target: Optional[str] = None) -> int:
+    """Aplica las migraciones pendientes (hasta target, inclusive). Devuelve cuántas aplicó"""
+    _ensure_tables(engine)
+    count = 0
+    for migration in pending(engine):
+        if target is not None and migration.version > target:
+            break
+        print(f"🔄 {migration.version} {migration.name}")
+        started = time.perf_counter()
+        module = migration.load()
+        module.upgrade(MigrationContext(engine, migration.version, batch_size, pause_seconds))
+        duration = time.perf_counter() - started
+        with engine.begin() as conn:
+            conn.execute(schema_migrations.insert().values(
+                version=migration.version,
+                name=migration.name,
+                applied_at=datetime.utcnow(),
+                duration_seconds=int(duration),
+            ))
+            # El avance de los backfills ya no hace falta una vez aplicada
+            conn.execute(migration_progress.delete().where(migration_progress.c.version == migration.version))
+        print(f"✅ {migration.version} aplicada en {duration:.1f} s")
+        count += 1
+    return count
+
+
+def status(engine) -> List[dict]:
+    """Estado de cada migración y el avance de los backfills a medio camino"""
+    applied = {}
+    progress = {}
+    if "schema_migrations" in inspect(engine).get_table_names():
+        with engine.connect() as conn:
+            applied = {row.version: row for row in conn.execute(select(schema_migrations))}
+            for row in conn.execute(select(migration_progress)):
+                progress.setdefault(row.version, []).append(
+                    {"step": row.step, "last_id": row.last_id, "rows": row.rows}
+                )
+    return [
+        {
+            "version": m.version,
+            "name": m.name,
+            "applied_at": applied[m.version].applied_at if m.version in applied else None,
+            "backfills": progress.get(m.version, []),
+        }
+        for m in discover()
+    ]
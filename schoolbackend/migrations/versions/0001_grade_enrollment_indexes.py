@@ -0,0 +1,89 @@
+"""
+Índices de grades y llave primaria de student_subject
+
+- grades(student_id, subject_id) y grades(subject_id): reportes, rankings,
+  estadísticas y cargas masivas filtran por alumno y/o materia
+- student_subject: primero se eliminan las filas repetidas y las que tienen
+  NULL; después se agrega la llave primaria (student_id, subject_id) y un
+  índice por subject_id para las listas de clase y los conteos por materia.
+  SQLite no permite agregar una PK con ALTER TABLE: ahí se crea un índice
+  UNIQUE equivalente.
+"""
+from sqlalchemy import text
+
+GRADE_INDEXES = {
+    "ix_grades_student_subject": ("student_id", "subject_id"),
+    "ix_grades_subject_id": ("subject_id",),
+}
+ENROLLMENT_SUBJECT_INDEX = "ix_student_subject_subject_id"
+ENROLLMENT_UNIQUE_INDEX = "ux_student_subject"  # solo SQLite, en lugar de la PK
+
+
+def deduplicate_enrollments(connection) -> int:
+    """Deja una sola fila por (student_id, subject_id) y borra las que tienen NULL"""
+    removed = connection.execute(text(
+        "DELETE FROM student_subject WHERE student_id IS NULL OR subject_id IS NULL"
+    )).rowcount or 0
+
+    duplicates = connection.execute(text(
+        "SELECT student_id, subject_id, COUNT(*) FROM student_subject "
+        "GROUP BY student_id, subject_id HAVING COUNT(*) > 1"
+    )).all()
+    if duplicates:
+        pairs = [{"student_id": s, "subject_id": c} for s, c, _ in duplicates]
+        # Sin PK no se puede borrar "todas menos una": se borran todas y se reinserta una
+        connection.execute(text(
+            "DELETE FROM student_subject WHERE student_id = :student_id AND subject_id = :subject_id"
+        ), pairs)
+        connection.execute(text(
+            "INSERT INTO student_subject (student_id, subject_id) VALUES (:student_id, :subject_id)"
+        ), pairs)
+        removed += sum(count - 1 for _, _, count in duplicates)
+    return removed
+
+
+def _add_enrollment_key(connection, dialect: str) -> str:
+    if dialect == "mysql":
+        connection.execute(text(
+            "ALTER TABLE student_subject "
+            "MODIFY student_id INTEGER NOT NULL, "
+            "MODIFY subject_id INTEGER NOT NULL, "
+            "ADD PRIMARY KEY (student_id, subject_id)"
+        ))
+        return "llave primaria"
+    if dialect == "postgresql":
+        connection.execute(text(
+            "ALTER TABLE student_subject "
+            "ALTER COLUMN student_id SET NOT NULL, "
+            "ALTER COLUMN subject_id SET NOT NULL, "
+            "ADD PRIMARY KEY (student_id, subject_id)"
+        ))
+        return "llave primaria"
+    connection.execute(text(
+        f"CREATE UNIQUE INDEX {ENROLLMENT_UNIQUE_INDEX} ON student_subject (student_id, subject_id)"
+    ))
+    return f"índice único {ENROLLMENT_UNIQUE_INDEX}"
+
+
+def upgrade(ctx) -> None:
+    tables = set(ctx.inspector().get_table_names())
+
+    if "grades" in tables:
+        for name, columns in GRADE_INDEXES.items():
+            if ctx.create_index(name, "grades", columns):
+                print(f"✅ Índice {name} creado")
+
+    if "student_subject" in tables:
+        with ctx.begin() as connection:
+            removed = deduplicate_enrollments(connection)
+        if removed:
+            print(f"✅ {removed} inscripciones repetidas o incompletas eliminadas")
+
+        inspector = ctx.inspector()
+        has_key = bool(inspector.get_pk_constraint("student_subject").get("constrained_columns"))
+        existing = {index["name"] for index in inspector.get_indexes("student_subject")}
+        if not has_key and ENROLLMENT_UNIQUE_INDEX not in existing:
+            with ctx.begin() as connection:
+                print(f"✅ student_subject: {_add_enrollment_key(connection, ctx.dialect)} (student_id, subject_id)")
+        if ctx.create_index(ENROLLMENT_SUBJECT_INDEX, "student_subject", ["subject_id"]):
+            print(f"✅ Índice {ENROLLMENT_SUBJECT_INDEX} creado")
@@ -0,0 +1,43 @@
+"""
+Llena grade_aggregates a partir de grades por lotes de alumnos
+
+Reemplaza, para bases grandes, al rebuild de un solo golpe (app.cli
+rebuild-aggregates, un INSERT ... SELECT sobre toda la tabla): cada lote recalcula los pares de un rango de
+students.id en su propia transacción y el avance queda guardado, así que se
+puede correr en horario de clases (con --pause) o interrumpir y reanudar.
+Las altas y ediciones de calificaciones durante el backfill no se pierden:
+crud_grade recalcula el par completo que toca y el lote hace lo mismo.
+"""
+from sqlalchemy import text
+
+_DELETE = text(
+    "DELETE FROM grade_aggregates WHERE student_id > :low AND student_id <= :high"
+)
+_INSERT = text(
+    "INSERT INTO grade_aggregates (student_id, subject_id, count, sum, min_score, max_score) "
+    "SELECT student_id, subject_id, COUNT(id), SUM(score), MIN(score), MAX(score) FROM grades "
+    "WHERE student_id > :low AND student_id <= :high AND subject_id IS NOT NULL "
+    "GROUP BY student_id, subject_id"
+)
+
+
+def _refresh_students(connection, low: int, high: int) -> int:
+    params = {"low": low, "high": high}
+    connection.execute(_DELETE, params)
+    return connection.execute(_INSERT, params).rowcount or 0
+
+
+def upgrade(ctx) -> None:
+    # La tabla puede no existir todavía si la base es anterior a grade_aggregates
+    from app.models import load_all
+    from app.models.grade_aggregate import GradeAggregate
+
+    load_all()  # resuelve la FK subjects.id y las relaciones de Student
+
+    tables = set(ctx.inspector().get_table_names())
+    if "grades" not in tables or "students" not in tables:
+        return
+    GradeAggregate.__table__.create(bind=ctx.engine, checkfirst=True)
+
+    pairs = ctx.backfill("grade_aggregates", "students", _refresh_students)
+    print(f"✅ {pairs} pares alumno/materia recalculados en esta ejecución")
@@ -0,0 +1,45 @@
+"""
+Columna students.search_text y su índice de búsqueda por motor
+
+Antes lo hacía el arranque con DDL suelto (ensure_student_search). Aquí:
+- la columna se agrega en línea donde el motor lo permite (MySQL:
+  ALGORITHM=INPLACE, LOCK=NONE),
+- se rellena por lotes de students.id con ctx.backfill (reanudable),
+- y se crea el índice del motor (ver app/db/search_index.py; en PostgreSQL
+  con CREATE INDEX CONCURRENTLY). Si el índice no se puede crear solo se
+  avisa: la búsqueda sigue funcionando con LIKE.
+"""
+from sqlalchemy import text
+
+
+def _add_search_column(ctx) -> None:
+    from app.core.search import SEARCH_TEXT_LENGTH
+
+    online = ", ALGORITHM=INPLACE, LOCK=NONE" if ctx.dialect == "mysql" else ""
+    with ctx.begin() as connection:
+        connection.execute(text(
+            f"ALTER TABLE students ADD COLUMN search_text VARCHAR({SEARCH_TEXT_LENGTH}){online}"
+        ))
+
+
+def upgrade(ctx) -> None:
+    from app.db import search_index
+    from app.models import load_all
+
+    # search_index usa el modelo Student: sus relaciones necesitan los demás modelos
+    load_all()
+
+    if "students" not in ctx.inspector().get_table_names():
+        return
+    columns = {column["name"] for column in ctx.inspector().get_columns("students")}
+    if "search_text" not in columns:
+        _add_search_column(ctx)
+        print("✅ Columna students.search_text agregada")
+
+    rows = ctx.backfill("search_text", "students", search_index.fill_search_text)
+    print(f"✅ search_text calculado para {rows} alumnos en esta ejecución")
+
+    if search_index.create_search_index(ctx.engine):
+        print(f"✅ Índice de búsqueda de alumnos ({ctx.dialect}) listo")
+    else:
+        print("⚠️  Sin índice de búsqueda: /students/search usará LIKE")
@@ -0,0 +1 @@
+# Versiones de migración: NNNN_descripcion.py con upgrade(ctx) (ver migrations/runner.py)
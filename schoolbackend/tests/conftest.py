@@ -0,0 +1,79 @@
+import os
+
+# Antes de importar la app: config lee el entorno al importarse y no debe tomar
+# la base de datos del .env
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ.setdefault("SECRET_KEY", "pruebas")
+os.environ.setdefault("ALGORITHM", "HS256")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api import dependencies
+from app.core import stats_cache
+from app.db.base import Base
+from app.db.session import get_db
+from app.models import load_all
+from app.models.user import User
+
+load_all()
+
+
+@pytest.fixture(autouse=True)
+def stats_backend():
+    """Caché de contadores en memoria y vacía en cada prueba (las BD de prueba se recrean)"""
+    backend = stats_cache.LocalStatsBackend(ttl_seconds=60)
+    stats_cache.set_backend(backend)
+    yield backend
+    stats_cache.set_backend(None)
+
+
+@pytest.fixture
+def engine():
+    # Una sola conexión en memoria compartida por la sesión de la prueba y el TestClient
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine, autoflush=False)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def teacher(db):
+    teacher = User(email="profesor@pruebas.com", hashed_password="-", full_name="Profesor", role="profesor")
+    db.add(teacher)
+    db.commit()
+    return teacher
+
+
+@pytest.fixture
+def client(db, teacher):
+    from app.main import create_app
+
+    app = create_app()
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[dependencies.get_current_user] = lambda: teacher
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def statements(engine):
+    """Sentencias SQL ejecutadas en el motor de la prueba (se vacía con .clear())"""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
@@ -0,0 +1,30 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Lo que queda importado después de cargar app.main, en un proceso aparte
+_CHECK = (
+    "import sys, app.main; "
+    "print(sorted(m for m in sys.modules if m == 'sqlalchemy.ext.asyncio' or m.startswith('app.') and 'async' in m))"
+)
+
+
+def test_sync_app_does_not_import_the_async_layer():
+    env = {**os.environ, "DATABASE_URL": "sqlite://", "USE_ASYNC_DB": "false"}
+    result = subprocess.run(
+        [sys.executable, "-c", _CHECK],
+        cwd=Path(__file__).resolve().parents[1], env=env, capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_importing_the_app_does_not_build_the_stats_backend():
+    check = "import app.main; from app.core import stats_cache; print(stats_cache._backend)"
+    # Con STATS_CACHE_URL el backend sería un cliente de Redis: se crea en el primer uso
+    env = {**os.environ, "DATABASE_URL": "sqlite://", "STATS_CACHE_URL": "redis://localhost:1/0"}
+    result = subprocess.run(
+        [sys.executable, "-c", check],
+        cwd=Path(__file__).resolve().parents[1], env=env, capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip() == "None"
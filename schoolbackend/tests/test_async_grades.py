@@ -0,0 +1,66 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.api import dependencies
+from app.core import config
+from app.db.base import Base
+from app.db.session import get_async_db
+from app.models.grade import Grade
+from app.models.student import Student
+from app.models.subject import Subject
+
+
+@pytest.fixture
+def async_client(tmp_path, monkeypatch, teacher):
+    """App con USE_ASYNC_DB=true sobre SQLite en archivo (aiosqlite)"""
+    from app.main import create_app
+
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        student = Student(first_name="Ana", last_name="Ruiz", email="ana@pruebas.com")
+        subject = Subject(name="Matemáticas")
+        db.add_all([student, subject])
+        db.flush()
+        db.add_all([Grade(student_id=student.id, subject_id=subject.id, score=60 + i) for i in range(5)])
+        db.commit()
+    engine.dispose()
+
+    async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"))
+
+    async def async_db():
+        async with AsyncSession(async_engine) as db:
+            yield db
+
+    monkeypatch.setattr(config, "USE_ASYNC_DB", True)
+    app = create_app()
+    app.dependency_overrides[get_async_db] = async_db
+    app.dependency_overrides[dependencies.get_current_user_async] = lambda: teacher
+    with TestClient(app) as client:
+        yield client
+
+
+def test_grade_listing_is_served_by_the_async_router(async_client):
+    route = next(
+        route for route in async_client.app.routes
+        if getattr(route, "path", None) == "/api/v1/grades/" and "GET" in route.methods
+    )
+    assert route.endpoint.__module__ == "app.api.v1_async.grades"
+
+
+def test_async_grade_listing_pages_by_cursor(async_client):
+    scores, cursor = [], None
+    while True:
+        response = async_client.get("/api/v1/grades/", params={"limit": 2, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        scores += [grade["score"] for grade in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert scores == [60.0, 61.0, 62.0, 63.0, 64.0]
+    assert async_client.get("/api/v1/grades/", params={"cursor": "no-es-un-cursor"}).status_code == 400
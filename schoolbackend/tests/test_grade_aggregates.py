@@ -0,0 +1,63 @@
+import pytest
+
+from app.crud import crud_grade
+from app.models.grade_aggregate import GradeAggregate
+from app.models.student import Student
+from app.models.subject import Subject
+from app.schemas.grade import GradeBulkItem, GradeCreate, GradeUpdate
+
+
+@pytest.fixture
+def pair(db, teacher):
+    student = Student(first_name="Ana", last_name="Ruiz", email="ana@pruebas.com")
+    subject = Subject(name="Matemáticas", teacher_id=teacher.id)
+    db.add_all([student, subject])
+    db.commit()
+    return student.id, subject.id
+
+
+def _aggregates(db):
+    db.expire_all()
+    return [
+        (row.student_id, row.subject_id, row.count, row.sum, row.min_score, row.max_score)
+        for row in db.query(GradeAggregate).order_by(GradeAggregate.student_id)
+    ]
+
+
+def test_two_grades_for_a_new_pair_leave_one_row(db, pair):
+    student_id, subject_id = pair
+
+    # La segunda alta encuentra la fila que dejó la primera (lo que ve la
+    # transacción que pierde la carrera) y le suma su delta
+    crud_grade.create_grade(db, GradeCreate(student_id=student_id, subject_id=subject_id, score=80))
+    crud_grade.create_grade(db, GradeCreate(student_id=student_id, subject_id=subject_id, score=60))
+
+    assert _aggregates(db) == [(student_id, subject_id, 2, 140.0, 60.0, 80.0)]
+
+
+def test_updating_the_extreme_grade_recomputes_min_and_max(db, pair):
+    student_id, subject_id = pair
+    high = crud_grade.create_grade(db, GradeCreate(student_id=student_id, subject_id=subject_id, score=90))
+    crud_grade.create_grade(db, GradeCreate(student_id=student_id, subject_id=subject_id, score=70))
+
+    crud_grade.update_grade(db, high.id, GradeUpdate(score=50))
+
+    assert _aggregates(db) == [(student_id, subject_id, 2, 120.0, 50.0, 70.0)]
+
+
+def test_bulk_upsert_adds_new_grades_and_recomputes_updated_ones(db, teacher, pair):
+    student_id, subject_id = pair
+    other = Student(first_name="Luis", last_name="Pérez", email="luis@pruebas.com")
+    db.add(other)
+    db.commit()
+    crud_grade.create_grade(db, GradeCreate(student_id=student_id, subject_id=subject_id, score=90))
+
+    crud_grade.bulk_upsert_grades(db, subject_id, [
+        GradeBulkItem(student_id=student_id, score=75),
+        GradeBulkItem(student_id=other.id, score=85),
+    ])
+
+    assert _aggregates(db) == [
+        (student_id, subject_id, 1, 75.0, 75.0, 75.0),
+        (other.id, subject_id, 1, 85.0, 85.0, 85.0),
+    ]
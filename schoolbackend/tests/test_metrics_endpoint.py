@@ -0,0 +1,22 @@
+import pytest
+
+from app.core import config
+
+
+def test_metrics_are_not_exposed_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(config, "METRICS_TOKEN", None)
+
+    assert client.get("/metrics").status_code == 404
+    assert client.get("/metrics", headers={"Authorization": "Bearer "}).status_code == 404
+
+
+@pytest.mark.parametrize("authorization, expected", [
+    (None, 401),
+    ("Bearer otro", 401),
+    ("Bearer secreto", 200),
+])
+def test_metrics_require_the_configured_token(client, monkeypatch, authorization, expected):
+    monkeypatch.setattr(config, "METRICS_TOKEN", "secreto")
+    headers = {"Authorization": authorization} if authorization else {}
+
+    assert client.get("/metrics", headers=headers).status_code == expected
@@ -0,0 +1,169 @@
+import asyncio
+import io
+import os
+import random
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import Request
+from PIL import Image
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.datastructures import UploadFile
+
+from app.api import dependencies
+from app.api.v1.users import MAX_PROFILE_BODY_BYTES
+from app.core import profile_photos
+from app.db.base import Base
+from app.db.session import get_db
+from app.models.user import User
+
+BOUNDARY = "limite-de-prueba"
+UPLOADS = 4
+UPLOAD_CHUNK = 64 * 1024
+# Pausa entre trozos de cada subida: clientes lentos que tardan ~0.5 s en enviar la foto
+CHUNK_DELAY = 0.01
+# Latencia máxima de GET / mientras llegan las subidas
+CHEAP_REQUEST_BOUND = 0.25
+
+
+def _photo(seed: int) -> bytes:
+    """PNG de ruido (~3MB, no se comprime): grande pero dentro del límite"""
+    rng = random.Random(seed)
+    image = Image.frombytes("RGB", (1000, 1000), rng.randbytes(1000 * 1000 * 3))
+    out = io.BytesIO()
+    image.save(out, "PNG", compress_level=0)
+    return out.getvalue()
+
+
+def _multipart(photo: bytes) -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="photo"; filename="foto.png"\r\n'
+        "Content-Type: image/png\r\n\r\n"
+    ).encode() + photo + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+async def _slow_body(body: bytes, sent: list):
+    for start in range(0, len(body), UPLOAD_CHUNK):
+        await asyncio.sleep(CHUNK_DELAY)
+        sent.append(UPLOAD_CHUNK)
+        yield body[start:start + UPLOAD_CHUNK]
+
+
+@pytest.fixture
+def upload_app(tmp_path, monkeypatch):
+    """
+    App con una BD SQLite en archivo (una sesión por petición, como en producción)
+    y las fotos en tmp_path. El usuario actual sale del encabezado X-Teacher
+    """
+    from app.main import create_app
+
+    monkeypatch.setattr(profile_photos, "UPLOAD_DIR", tmp_path / "profiles")
+    monkeypatch.setattr(profile_photos, "VARIANT_DIR", tmp_path / "profiles" / "variants")
+
+    async def no_variants(photo_url):
+        return None
+
+    monkeypatch.setattr(profile_photos, "generate_variants", no_variants)
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'uploads.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    make_session = sessionmaker(bind=engine, autoflush=False)
+    with make_session() as db:
+        db.add_all([
+            User(id=i, email=f"profesor{i}@pruebas.com", hashed_password="-", full_name=f"Profesor {i}", role="profesor")
+            for i in range(1, UPLOADS + 1)
+        ])
+        db.commit()
+
+    def session_per_request():
+        db = make_session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def teacher_from_header(request: Request):
+        return SimpleNamespace(id=int(request.headers["x-teacher"]), role="profesor")
+
+    app = create_app()
+    app.dependency_overrides[get_db] = session_per_request
+    app.dependency_overrides[dependencies.get_current_user] = teacher_from_header
+    yield app
+    engine.dispose()
+
+
+def _client(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", timeout=30)
+
+
+def test_cheap_requests_stay_fast_during_slow_uploads(upload_app):
+    bodies = [_multipart(_photo(seed)) for seed in range(UPLOADS)]
+
+    async def scenario():
+        async with _client(upload_app) as client:
+            async def upload(teacher_id: int, body: bytes):
+                return await client.put(
+                    "/api/v1/users/profile",
+                    content=_slow_body(body, []),
+                    headers={
+                        "content-type": f"multipart/form-data; boundary={BOUNDARY}",
+                        "content-length": str(len(body)),
+                        "x-teacher": str(teacher_id),
+                    },
+                )
+
+            uploads = [asyncio.create_task(upload(i + 1, body)) for i, body in enumerate(bodies)]
+            # GET / mientras dure cualquier subida (lectura del cuerpo, Pillow y guardado)
+            latencies = []
+            while not all(task.done() for task in uploads):
+                start = time.perf_counter()
+                response = await client.get("/")
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200
+                await asyncio.sleep(0.02)
+            return await asyncio.gather(*uploads), latencies
+
+    responses, latencies = asyncio.run(scenario())
+
+    assert [r.status_code for r in responses] == [200] * UPLOADS
+    assert len({r.json()["photo_url"] for r in responses}) == UPLOADS
+    assert max(latencies) < CHEAP_REQUEST_BOUND, f"GET / tardó {max(latencies):.3f} s durante las subidas"
+
+
+def test_oversized_upload_is_rejected_before_reading_the_body(upload_app):
+    size = MAX_PROFILE_BODY_BYTES + 1
+    sent = []
+
+    async def scenario():
+        async with _client(upload_app) as client:
+            return await client.put(
+                "/api/v1/users/profile",
+                content=_slow_body(b"x" * size, sent),
+                headers={
+                    "content-type": f"multipart/form-data; boundary={BOUNDARY}",
+                    "content-length": str(size),
+                    "x-teacher": "1",
+                },
+            )
+
+    response = asyncio.run(scenario())
+
+    assert response.status_code == 400
+    assert sent == []
+
+
+def test_save_upload_stops_reading_at_the_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(profile_photos, "UPLOAD_DIR", tmp_path)
+    limit = 256 * 1024
+    source = io.BytesIO(b"x" * (limit * 4))
+
+    with pytest.raises(profile_photos.PhotoError):
+        asyncio.run(profile_photos.save_upload(UploadFile(source, filename="foto.png"), max_bytes=limit))
+
+    # Se deja de leer en el primer trozo que pasa del límite y el temporal se borra
+    assert source.tell() <= limit + profile_photos.CHUNK_SIZE
+    assert os.listdir(tmp_path) == []
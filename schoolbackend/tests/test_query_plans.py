@@ -0,0 +1,27 @@
+import pytest
+from sqlalchemy import text
+
+from migrations.__main__ import HOT_QUERIES
+
+# Índice que debe usar cada consulta de python -m migrations explain
+# (la inscripción de un alumno va por la llave primaria de student_subject)
+EXPECTED_INDEX = {
+    "calificaciones de un alumno en una materia": "ix_grades_student_subject",
+    "calificaciones de una materia": "ix_grades_subject_id",
+    "lista de clase": "ix_student_subject_subject_id",
+    "inscripción de un alumno": "sqlite_autoindex_student_subject",
+}
+
+
+def test_every_hot_query_has_an_expected_index():
+    assert set(EXPECTED_INDEX) == set(HOT_QUERIES)
+
+
+@pytest.mark.parametrize("label", sorted(EXPECTED_INDEX))
+def test_hot_query_uses_index(engine, label):
+    with engine.connect() as connection:
+        plan = " ".join(
+            row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {HOT_QUERIES[label]}"))
+        )
+    assert "SCAN" not in plan
+    assert EXPECTED_INDEX[label] in plan
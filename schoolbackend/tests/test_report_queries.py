@@ -0,0 +1,77 @@
+import pytest
+
+from app.crud import crud_grade
+from app.models.student import Student
+from app.models.subject import Subject
+from app.schemas.grade import GradeCreate
+
+
+def _student_with_grades(db, teacher, email: str, grades: int) -> Student:
+    student = Student(first_name="Ana", last_name="Ruiz", last_name2="Sosa", email=email)
+    subjects = [Subject(name=f"{email} {i}", teacher_id=teacher.id) for i in range(grades)]
+    student.subjects = subjects
+    db.add(student)
+    db.commit()
+    for i, subject in enumerate(subjects):
+        crud_grade.create_grade(db, GradeCreate(student_id=student.id, subject_id=subject.id, score=70 + i))
+    return student
+
+
+# Las consultas de los reportes no deben crecer con el número de calificaciones (N+1)
+@pytest.mark.parametrize("path", [
+    "/api/v1/reports/student/{id}",
+    "/api/v1/reports/student-full/{id}",
+])
+def test_student_report_statement_count_is_constant(client, db, teacher, statements, path):
+    one = _student_with_grades(db, teacher, "uno@pruebas.com", grades=1)
+    many = _student_with_grades(db, teacher, "varios@pruebas.com", grades=8)
+
+    counts = []
+    for student, expected in ((one, 1), (many, 8)):
+        db.expire_all()  # sin objetos en caché de la petición anterior
+        statements.clear()
+        response = client.get(path.format(id=student.id))
+        assert response.status_code == 200
+        assert len(response.json()["grades"]) == expected
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1], f"1 calificación: {counts[0]} sentencias, 8: {counts[1]}"
+
+
+def test_student_report_average_comes_from_aggregates(client, db, teacher):
+    student = _student_with_grades(db, teacher, "promedio@pruebas.com", grades=3)
+
+    response = client.get(f"/api/v1/reports/student/{student.id}")
+
+    assert response.json()["total_average"] == 71.0
+
+
+def _enroll_students(db, teacher, prefix: str, subjects: int, students: int) -> None:
+    subject_rows = [Subject(name=f"{prefix} {i}", teacher_id=teacher.id) for i in range(subjects)]
+    for i in range(students):
+        # Cada alumno en varias materias del profesor: el alcance no debe repetirlos
+        db.add(Student(
+            first_name="Ana", last_name=prefix, email=f"{prefix}{i}@pruebas.com",
+            subjects=subject_rows[i % subjects:] or subject_rows,
+        ))
+    db.commit()
+
+
+# El alcance del profesor va como subconsulta: las consultas no crecen con su lista de clase
+def test_search_my_students_statement_count_is_constant(client, db, teacher, statements):
+    def search():
+        db.expire_all()
+        statements.clear()
+        response = client.get("/api/v1/students/search-my-students", params={"q": "ana"})
+        assert response.status_code == 200
+        return len(response.json()), len(statements)
+
+    _enroll_students(db, teacher, "uno", subjects=1, students=1)
+    search()  # la primera búsqueda además revisa el índice de search_text
+    small = search()
+
+    _enroll_students(db, teacher, "varios", subjects=6, students=40)
+    large = search()
+
+    assert small[0] == 1 and large[0] == 10
+    assert small[1] == large[1], f"1 alumno: {small[1]} sentencias, 41 alumnos: {large[1]}"
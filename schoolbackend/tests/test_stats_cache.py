@@ -0,0 +1,35 @@
+from app.core import stats_cache
+from app.crud import crud_student, crud_subject
+from app.schemas.student import StudentCreate
+from app.schemas.subject import SubjectCreate
+
+
+def _cached(backend):
+    return backend.get_many([stats_cache.STUDENTS, stats_cache.SUBJECTS, stats_cache.PROFESSORS])
+
+
+def test_dashboard_stats_are_served_from_the_cache(client, statements, stats_backend):
+    first = client.get("/api/v1/reports/stats").json()
+    assert statements, "la primera llamada calcula los contadores en la BD"
+    assert _cached(stats_backend) == first == {"students": 0, "subjects": 0, "professors": 1}
+
+    statements.clear()
+    assert client.get("/api/v1/reports/stats").json() == first
+    assert client.get("/api/v1/reports/stats/professors").json() == {"total": 1}
+    assert statements == []
+
+
+def test_writes_invalidate_only_their_counter(client, db, teacher, stats_backend):
+    client.get("/api/v1/reports/stats")
+
+    student = crud_student.create_student(db, StudentCreate(first_name="Ana", last_name="Ruiz", email="ana@pruebas.com"))
+    assert _cached(stats_backend) == {"students": None, "subjects": 0, "professors": 1}
+    assert client.get("/api/v1/reports/stats/students").json() == {"total": 1}
+
+    crud_student.delete_student(db, student.id)
+    assert _cached(stats_backend)["students"] is None
+    assert client.get("/api/v1/reports/stats/students").json() == {"total": 0}
+
+    crud_subject.create_subject(db, SubjectCreate(name="Historia", teacher_id=teacher.id))
+    assert _cached(stats_backend) == {"students": 0, "subjects": None, "professors": 1}
+    assert client.get("/api/v1/reports/stats").json() == {"students": 0, "subjects": 1, "professors": 1}
@@ -0,0 +1,39 @@
+import io
+
+from app.crud import crud_student_import
+from app.models.student import Student
+
+
+def _import(db, text):
+    return crud_student_import.import_students(db, crud_student_import.read_csv(io.StringIO(text)))
+
+
+def test_existing_email_is_matched_case_insensitively(db):
+    db.add(Student(first_name="Ana", last_name="López", email="ana@pruebas.com"))
+    db.commit()
+
+    report = _import(db, "first_name,last_name,email\nAna,López,Ana@Pruebas.com\n")
+
+    assert report["created"] == 0
+    assert report["existing"] == 1
+    assert report["errors"] == 0
+    assert db.query(Student).count() == 1
+
+
+def test_new_email_keeps_its_case(db):
+    report = _import(db, "first_name,last_name,email\nLuis,Pérez,Luis@pruebas.com\n")
+
+    assert report["created"] == 1
+    assert db.query(Student.email).scalar() == "Luis@pruebas.com"
+
+
+def test_email_lookup_can_use_the_unique_index(db, statements):
+    db.add(Student(first_name="Ana", last_name="López", email="Ana@pruebas.com"))
+    db.commit()
+    statements.clear()
+
+    report = _import(db, "first_name,last_name,email\nAna,López,Ana@Pruebas.com\n")
+
+    assert report["existing"] == 1
+    # Comparar lower(email) obliga a recorrer toda la tabla students
+    assert not [s for s in statements if "lower(students.email)" in s.lower()]
@@ -0,0 +1,87 @@
+import asyncio
+import sys
+import threading
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.core import student_index
+from app.db.base import Base
+from app.models.student import Student
+from app.models.subject import Subject
+from app.models.user import User
+
+
+def _walked_bytes(index: student_index.StudentPrefixIndex) -> int:
+    """Recorrido completo de las estructuras: lo que memory_bytes() estima sin recorrerlas"""
+    total = sys.getsizeof(index._keys) + sys.getsizeof(index._entries) + sys.getsizeof(index._subject_names)
+    for key in index._keys:
+        total += sys.getsizeof(key) + sys.getsizeof(key[0])
+    for entry in index._entries.values():
+        total += sys.getsizeof(entry) + sys.getsizeof(entry.subject_ids) + sys.getsizeof(entry.tokens)
+        for value in (entry.first_name, entry.last_name, entry.last_name2, entry.email):
+            total += sys.getsizeof(value)
+    for name in index._subject_names.values():
+        total += sys.getsizeof(name)
+    return total
+
+
+def test_memory_estimate_follows_incremental_updates():
+    index = student_index.StudentPrefixIndex()
+    index.load(
+        [(i, f"Ana{i}", "Ruiz", "Sosa" if i % 2 else None, f"ana{i}@pruebas.com") for i in range(1, 51)],
+        [(1, "Matemáticas"), (2, "Historia")],
+        [(i, 1 + i % 2) for i in range(1, 51)],
+    )
+    assert index.memory_bytes() == _walked_bytes(index)
+
+    index.upsert_student(51, "Luis", "Pérez", None, "luis@pruebas.com")
+    index.upsert_student(3, "Ana María", "Ruiz", "Sosa", "ana.maria@pruebas.com")
+    index.remove_student(4)
+    for subject_id in range(3, 12):
+        index.set_enrollment(5, subject_id, True)
+    index.set_enrollment(6, 1, False)
+    index.set_subject(2, "Historia Universal")
+    index.set_subject(3, "Física")
+    index.remove_subject(1)
+
+    assert index.memory_bytes() == _walked_bytes(index)
+
+
+def test_async_build_loads_the_index_outside_the_event_loop(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'indice.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        teacher = User(email="profesor@pruebas.com", hashed_password="-", full_name="Profesor", role="profesor")
+        subject = Subject(name="Matemáticas", teacher=teacher)
+        db.add_all([teacher, Student(first_name="Ana", last_name="Ruiz", email="ana@pruebas.com", subjects=[subject])])
+        db.commit()
+    engine.dispose()
+
+    index = student_index.StudentPrefixIndex()
+    monkeypatch.setattr(student_index, "index", index)
+    load_threads = []
+    original_load = index.load
+
+    def recording_load(*rows):
+        load_threads.append(threading.get_ident())
+        original_load(*rows)
+
+    monkeypatch.setattr(index, "load", recording_load)
+
+    async def scenario():
+        async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"))
+        try:
+            async with AsyncSession(async_engine) as db:
+                await student_index.build_async(db)
+        finally:
+            await async_engine.dispose()
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(scenario())
+
+    assert load_threads and load_threads[0] != loop_thread
+    assert [student["email"] for student in index.search("ana")] == ["ana@pruebas.com"]
+    assert index.search("ana")[0]["subjects"] == [{"id": 1, "name": "Matemáticas"}]
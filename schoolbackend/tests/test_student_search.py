@@ -0,0 +1,15 @@
+from app.crud import crud_student
+from app.models.student import Student
+
+
+def test_exact_email_match_ranks_first_regardless_of_case(db):
+    # Mariana se registra antes y su email también contiene el término
+    db.add_all([
+        Student(first_name="Mariana", last_name="Gil", email="mariana@pruebas.com"),
+        Student(first_name="Ana", last_name="Ruiz", email="Ana@Pruebas.com"),
+    ])
+    db.commit()
+
+    results = crud_student.search_students(db, "ana@pruebas.com")
+
+    assert [student.email for student in results] == ["Ana@Pruebas.com", "mariana@pruebas.com"]